@@ -0,0 +1,88 @@
+# ================================================================
+# File: benchmarks/bench_feedback_tail.py
+# Purpose: readlines()[-N:] vs backwards tail read vs in-memory ring
+#          for ThresholdTuner.recent_feedback_stats on a large feedback log
+# Usage:   python -m benchmarks.bench_feedback_tail [--lines 10000000] [--window 30] [--repeat 5]
+# ================================================================
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bot.engines.threshold_tuner import ThresholdTuner
+from bot.utils.jsonl_tail import JsonlRing, tail_jsonl
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _write_log(path: str, n_lines: int, chunk: int = 1_000_000, seed: int = 7) -> None:
+    """Synthetic feedback_log.jsonl rows (same keys as AdaptiveFeedback.update)."""
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        for start in range(0, n_lines, chunk):
+            m = min(chunk, n_lines - start)
+            win = rng.random(m) < 0.52
+            conf = rng.uniform(0.4, 0.8, m)
+            vol = rng.uniform(0.0, 0.3, m)
+            f.writelines(
+                f'{{"timestamp": "2025-01-01T00:00:00", "symbol": "XAUUSD", "win": {"true" if w else "false"}, '
+                f'"confidence": {c:.4f}, "volatility": {v:.4f}, "a": 50.0, "b": 50.0}}\n'
+                for w, c, v in zip(win.tolist(), conf.tolist(), vol.tolist())
+            )
+
+
+def _readlines_stats(path: str, window: int):
+    """The previous implementation: read the whole file to keep `window` lines."""
+    wins, confs = 0, []
+    with open(path, "r") as f:
+        for line in f.readlines()[-window:]:
+            rec = json.loads(line)
+            confs.append(rec.get("confidence", 0.5))
+            wins += bool(rec.get("win", False))
+    return wins / len(confs), sum(confs) / len(confs)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=10_000_000)
+    ap.add_argument("--window", type=int, default=30)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "feedback_log.jsonl")
+        t0 = time.perf_counter()
+        _write_log(path, args.lines)
+        size_mb = os.path.getsize(path) / 2**20
+        print(f"Wrote {args.lines:,} lines ({size_mb:,.0f} MB) in {time.perf_counter() - t0:.1f}s")
+
+        tuner = ThresholdTuner(bayes_state_path=os.path.join(root, "bayes_state.json"), feedback_path=path)
+        ref = _readlines_stats(path, args.window)
+        assert np.allclose(tuner.recent_feedback_stats(args.window), ref)
+
+        t_old = _best_of(lambda: _readlines_stats(path, args.window), min(args.repeat, 2))
+        t_tail = _best_of(lambda: tail_jsonl(path, args.window), args.repeat * 20)
+        t_seed = _best_of(lambda: JsonlRing(path), args.repeat)
+        t_ring = _best_of(lambda: tuner.recent_feedback_stats(args.window), args.repeat * 200)
+
+    print(f"\n{'last ' + str(args.window) + ' records':<26}{'ms':>12}{'speedup':>10}")
+    print(f"{'readlines()[-N:]':<26}{t_old * 1e3:>12.1f}{1:>9.0f}x")
+    print(f"{'tail_jsonl (seek EOF)':<26}{t_tail * 1e3:>12.3f}{t_old / max(t_tail, 1e-12):>9.0f}x")
+    print(f"{'JsonlRing seed (1024)':<26}{t_seed * 1e3:>12.3f}{t_old / max(t_seed, 1e-12):>9.0f}x")
+    print(f"{'tuner stats (ring)':<26}{t_ring * 1e3:>12.4f}{t_old / max(t_ring, 1e-12):>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# ================================================================
+# File: benchmarks/bench_tick_store.py
+# Purpose: pd.read_csv vs columnar TickStore (full load + range query)
+# Usage:   python -m benchmarks.bench_tick_store [--csv PATH] [--repeat 5] [--price-dtype float32]
+# ================================================================
+
+from __future__ import annotations
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bot.data.tick_store import TickStore
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", default="data/raw_ticks/XAUUSD_ticks.csv")
+    ap.add_argument("--symbol", default="XAUUSD")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--price-dtype", default="float64", choices=["float32", "float64"])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root, price_dtype=args.price_dtype)
+        t0 = time.perf_counter()
+        n = store.import_csv(args.symbol, args.csv)
+        t_import = time.perf_counter() - t0
+        days = store.days(args.symbol)
+        print(f"Imported {n:,} ticks into {len(days)} day partitions in {t_import:.2f}s")
+
+        msc = store.read(args.symbol, columns=["time_msc"])["time_msc"]
+        # one-hour window in the middle of the data
+        mid = int(msc[len(msc) // 2])
+        start, end = mid - 1_800_000, mid + 1_800_000
+
+        def csv_full():
+            return pd.read_csv(args.csv)
+
+        def csv_range():
+            df = pd.read_csv(args.csv)
+            return df[(df["time_msc"] >= start) & (df["time_msc"] < end)]
+
+        def store_full():
+            cols = store.read(args.symbol)
+            return float(cols["bid"].sum())      # touch the pages
+
+        def store_range():
+            cols = store.read(args.symbol, start, end)
+            return float(cols["bid"].sum())
+
+        t_csv = _best_of(csv_full, args.repeat)
+        t_csv_rng = _best_of(csv_range, args.repeat)
+        t_st = _best_of(store_full, args.repeat)
+        t_st_rng = _best_of(store_range, args.repeat)
+        t_frame = _best_of(lambda: store.read_frame(args.symbol), args.repeat)
+
+        # every CSV row is kept, same-ms repeats included
+        assert n == store.count(args.symbol) == len(csv_full())
+        rng = store.read(args.symbol, start, end)
+        ref = csv_range()
+        assert np.array_equal(rng["time_msc"], ref["time_msc"].to_numpy())
+
+    print(f"\n{'':<22}{'read_csv':>12}{'TickStore':>12}{'speedup':>10}")
+    print(f"{'full load (ms)':<22}{t_csv * 1e3:>12.2f}{t_st * 1e3:>12.3f}{t_csv / max(t_st, 1e-12):>9.0f}x")
+    print(f"{'1h range (ms)':<22}{t_csv_rng * 1e3:>12.2f}{t_st_rng * 1e3:>12.3f}{t_csv_rng / max(t_st_rng, 1e-12):>9.0f}x")
+    print(f"{'full DataFrame (ms)':<22}{t_csv * 1e3:>12.2f}{t_frame * 1e3:>12.3f}{t_csv / max(t_frame, 1e-12):>9.0f}x")
+    print(f"\nRange rows: {len(rng['time_msc']):,} (matches read_csv filter)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-import json
 import logging
 from pathlib import Path
 from datetime import datetime
 
+from bot.utils.bayes_state import get_bayes_state
+from bot.utils.jsonl_tail import get_jsonl_ring
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,7 @@ class AdaptiveFeedback:
         self.bayes_path = Path(bayes_path)
         self.log_path = Path(log_path)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._svc = get_bayes_state(self.bayes_path)
         self.state = self._load_bayes()
 
         # Feedback scaling (safe defaults if not in config)
@@ -36,27 +39,24 @@ class AdaptiveFeedback:
 
     # ------------------------------------------------------------------
     def _load_bayes(self) -> dict:
-        if not self.bayes_path.exists():
+        """Shared in-memory state (bot/utils/bayes_state.py); no disk read on reuse."""
+        if not self._svc.state:
             logger.warning("⚠️ %s not found; initializing new Bayesian state.", self.bayes_path)
-            return {}
-        try:
-            with open(self.bayes_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error("❌ Failed to load %s → %s", self.bayes_path, e)
-            return {}
+        return self._svc.state
 
-    def _save_bayes(self):
+    def _save_bayes(self, symbol: str | None = None):
+        """Mark the symbol for the next coalesced flush; no symbol → full snapshot."""
         try:
-            with open(self.bayes_path, "w", encoding="utf-8") as f:
-                json.dump(self.state, f, indent=2)
+            if symbol is None:
+                self._svc.save_all()
+            else:
+                self._svc.mark_dirty(symbol)
         except Exception as e:
             logger.error("❌ Failed to save %s → %s", self.bayes_path, e)
 
     def _append_log(self, row: dict):
         try:
-            with open(self.log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(row) + "\n")
+            get_jsonl_ring(self.log_path).append(row)
         except Exception as e:
             logger.error("❌ Failed to write %s → %s", self.log_path, e)
 
@@ -105,35 +105,37 @@ class AdaptiveFeedback:
           If provided, each component Beta prior nudged too.
         - volatility optional (for logging only)
         """
-        self._ensure_symbol(symbol)
-
-        # Convert outcome to weighted success/failure in [0.1..0.9]
-        # Higher confidence should amplify both win and loss learning.
-        conf = _clamp(float(confidence), 0.0, 1.0)
-        conf_boost = _clamp(0.5 + (conf - 0.5) * self.k_conf, 0.1, 0.9)
-
-        is_win = pnl > 0.0
-        success_w = conf_boost if is_win else (1.0 - conf_boost)
-        failure_w = (1.0 - success_w)
-
-        # 1) Update global prior for the symbol
-        self._nudge_beta(self.state[symbol]["prior"], success_w, failure_w)
-
-        # 2) Update component priors if provided
-        if components and isinstance(components, dict):
-            for key, comp_conf in components.items():
-                if key not in self.state[symbol]["signals"]:
-                    self.state[symbol]["signals"][key] = {"a": 50.0, "b": 50.0}
-
-                # If component had its own confidence, weight by that too (optional)
-                c = float(comp_conf) if isinstance(comp_conf, (int, float)) else conf
-                c_boost = _clamp(0.5 + (c - 0.5) * self.k_conf, 0.1, 0.9)
-                succ = c_boost if is_win else (1.0 - c_boost)
-                fail = 1.0 - succ
-                self._nudge_beta(self.state[symbol]["signals"][key], succ, fail)
+        with self._svc.lock(symbol):
+            self._ensure_symbol(symbol)
+
+            # Convert outcome to weighted success/failure in [0.1..0.9]
+            # Higher confidence should amplify both win and loss learning.
+            conf = _clamp(float(confidence), 0.0, 1.0)
+            conf_boost = _clamp(0.5 + (conf - 0.5) * self.k_conf, 0.1, 0.9)
+
+            is_win = pnl > 0.0
+            success_w = conf_boost if is_win else (1.0 - conf_boost)
+            failure_w = (1.0 - success_w)
+
+            # 1) Update global prior for the symbol
+            self._nudge_beta(self.state[symbol]["prior"], success_w, failure_w)
+
+            # 2) Update component priors if provided
+            if components and isinstance(components, dict):
+                for key, comp_conf in components.items():
+                    if key not in self.state[symbol]["signals"]:
+                        self.state[symbol]["signals"][key] = {"a": 50.0, "b": 50.0}
+
+                    # If component had its own confidence, weight by that too (optional)
+                    c = float(comp_conf) if isinstance(comp_conf, (int, float)) else conf
+                    c_boost = _clamp(0.5 + (c - 0.5) * self.k_conf, 0.1, 0.9)
+                    succ = c_boost if is_win else (1.0 - c_boost)
+                    fail = 1.0 - succ
+                    node = self._svc.materialize(symbol, self.state[symbol]["signals"][key])
+                    self._nudge_beta(node, succ, fail)
 
         # Persist & log
-        self._save_bayes()
+        self._save_bayes(symbol)
         self._append_log({
             "t": timestamp or datetime.utcnow().isoformat(),
             "symbol": symbol,
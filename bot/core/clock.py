@@ -0,0 +1,83 @@
+# D:\XAU_Bot\bot\core\clock.py
+"""
+Injectable time source for schedulers, guards, cooldowns and pollers.
+
+    Clock            – wall time (default everywhere)
+    SimulatedClock   – replay time: sleep() advances the clock instead of
+                       blocking, optionally throttled to `speed` x real time
+
+Components take `clock=None` and fall back to get_clock(), so a replay run only
+needs set_clock(SimulatedClock(...)) before the bot modules are imported.
+"""
+
+from __future__ import annotations
+import time
+from datetime import date, datetime, timezone
+from typing import Optional
+
+
+class StopReplay(BaseException):
+    """Raised by SimulatedClock.sleep() at stop_at. BaseException so the
+    scheduler loops' `except Exception` handlers do not swallow it."""
+
+
+class Clock:
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(max(0.0, seconds))
+
+    def utcnow(self) -> datetime:
+        """Naive UTC datetime, drop-in for datetime.utcnow()."""
+        return datetime.fromtimestamp(self.time(), tz=timezone.utc).replace(tzinfo=None)
+
+    def today(self) -> date:
+        return date.fromtimestamp(self.time())
+
+
+class SimulatedClock(Clock):
+    """
+    speed=0   → sleep() returns immediately (as fast as the CPU allows)
+    speed=1000 → sleep(120) blocks 0.12 s of wall time
+    stop_at   → epoch seconds; the sleep that reaches it raises StopReplay
+    """
+
+    def __init__(self, start: float, speed: float = 0.0, stop_at: Optional[float] = None):
+        self._t = float(start)
+        self.speed = float(speed)
+        self.stop_at = stop_at
+
+    def time(self) -> float:
+        return self._t
+
+    def monotonic(self) -> float:
+        return self._t
+
+    def advance(self, seconds: float):
+        self._t += max(0.0, float(seconds))
+
+    def sleep(self, seconds: float):
+        seconds = max(0.0, float(seconds))
+        if self.stop_at is not None and self._t + seconds >= self.stop_at:
+            self._t = float(self.stop_at)
+            raise StopReplay()
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+        self._t += seconds
+
+
+_clock: Clock = Clock()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    global _clock
+    _clock = clock
+    return clock
@@ -1,11 +1,12 @@
 # D:\XAU_Bot\bot\core\scheduler.py
-import time
+from bot.core.clock import get_clock
 from bot.core.session_logger import SessionLogger
 
 class ContinuousScheduler:
-    def __init__(self, task_fn, interval_sec=300):
+    def __init__(self, task_fn, interval_sec=300, clock=None):
         self.task_fn = task_fn
         self.interval_sec = interval_sec
+        self.clock = clock or get_clock()
         self.logger = SessionLogger()
         self.running = True
 
@@ -13,14 +14,14 @@ class ContinuousScheduler:
         self.logger.log_event("SCHEDULER_START", f"🕒 Interval: {self.interval_sec}s")
         try:
             while self.running:
-                cycle_start = time.time()
+                cycle_start = self.clock.monotonic()
                 self.logger.log_event("CYCLE_START", "🔁 New cycle triggered")
                 try:
                     self.task_fn()
                     self.logger.log_event("CYCLE_END", "✅ Cycle completed successfully")
                 except Exception as e:
                     self.logger.log_event("ERROR", str(e))
-                time.sleep(max(0, self.interval_sec - (time.time() - cycle_start)))
+                self.clock.sleep(max(0, self.interval_sec - (self.clock.monotonic() - cycle_start)))
         except KeyboardInterrupt:
             self.logger.log_event("INTERRUPT", "🛑 Stopped by user")
         finally:
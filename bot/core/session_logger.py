@@ -54,3 +54,8 @@ class SessionLogger:
         error_text = f"{message} | ERROR: {error}"
         print(f"{event_type} ❌ | {error_text}")
         self.logger.error(f"{event_type} | {error_text}")
+
+    def close(self):
+        """Flush file handlers at the end of a scheduler run."""
+        for handler in self.logger.handlers:
+            handler.flush()
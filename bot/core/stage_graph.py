@@ -0,0 +1,163 @@
+# D:\XAU_Bot\bot\core\stage_graph.py
+"""
+Per-cycle stage graph: independent stages run concurrently, joins only where
+a stage consumes another's result.
+
+    g = StageGraph(max_workers=4)
+    g.add("positions",  lambda: pm.get_open_positions(symbol))
+    g.add("confidence", lambda: router.compute_confidence(symbol))
+    g.add("volatility", lambda: router.compute_volatility(symbol))
+    g.add("execute", decide, deps=("positions", "confidence", "volatility"))
+    rep = g.run()             # decide(positions, confidence, volatility)
+    rep.results["execute"], rep.summary()
+
+A stage is called with its dependencies' results as positional arguments, in
+`deps` order. A stage that raises is recorded in `errors`; everything
+downstream of it is skipped. The pool is created once and reused by every
+run(), so a cycle costs no thread start-up.
+
+Each run reports the critical path: starting from the stage that finished
+last, repeatedly step to the dependency that finished last (the one it was
+actually waiting for). It ends when the cycle ends, and its stages are the
+only ones where making a stage faster shortens the cycle.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    start: float    # seconds since cycle start
+    end: float
+    ready: float    # when the last dependency finished
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class CycleReport:
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    wall: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+
+    @property
+    def critical_s(self) -> float:
+        return self.timings[self.critical_path[-1]].end if self.critical_path else 0.0
+
+    @property
+    def serial_s(self) -> float:
+        """What the same stages cost back to back."""
+        return sum(t.duration for t in self.timings.values())
+
+    def summary(self) -> str:
+        path = " → ".join(f"{n}({self.timings[n].duration * 1e3:.1f}ms)" for n in self.critical_path)
+        s = (f"critical path {path} = {self.critical_s * 1e3:.1f}ms | wall {self.wall * 1e3:.1f}ms | "
+             f"serial {self.serial_s * 1e3:.1f}ms ({self.serial_s / max(self.wall, 1e-9):.1f}x)")
+        if self.errors:
+            s += f" | failed: {', '.join(self.errors)}"
+        if self.skipped:
+            s += f" | skipped: {', '.join(self.skipped)}"
+        return s
+
+
+class StageGraph:
+    def __init__(self, max_workers: int = 4, name: str = "cycle"):
+        self.name = name
+        self.max_workers = int(max_workers)
+        self.stages: Dict[str, Stage] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn: Callable, deps: Sequence[str] = ()) -> "StageGraph":
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            # stages are added in dependency order, which also rules out cycles
+            raise ValueError(f"stage {name!r} depends on unknown stage(s) {missing}")
+        self.stages[name] = Stage(name, fn, tuple(deps))
+        return self
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._pool
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def run(self) -> CycleReport:
+        rep = CycleReport()
+        pool = self._executor()
+        t0 = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        ready_at: Dict[str, float] = {}
+
+        def _timed(stage: Stage, args):
+            start = time.perf_counter() - t0
+            try:
+                value, err = stage.fn(*args), None
+            except Exception as e:
+                value, err = None, e
+            return start, time.perf_counter() - t0, value, err
+
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(d in rep.errors or d in rep.skipped for d in stage.deps):
+                    rep.skipped.append(name)
+                    del pending[name]
+                elif all(d in rep.timings for d in stage.deps):
+                    ready_at[name] = max((rep.timings[d].end for d in stage.deps), default=0.0)
+                    args = [rep.results[d] for d in stage.deps]
+                    running[pool.submit(_timed, stage, args)] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                start, end, value, err = fut.result()
+                rep.timings[name] = StageTiming(start, end, ready_at[name])
+                if err is None:
+                    rep.results[name] = value
+                else:
+                    rep.errors[name] = err
+
+        rep.wall = time.perf_counter() - t0
+        rep.critical_path = self._critical_path(rep)
+        return rep
+
+    def _critical_path(self, rep: CycleReport) -> List[str]:
+        if not rep.timings:
+            return []
+        node = max(rep.timings, key=lambda n: rep.timings[n].end)
+        path = [node]
+        while True:
+            deps = [d for d in self.stages[node].deps if d in rep.timings]
+            if not deps:
+                break
+            node = max(deps, key=lambda d: rep.timings[d].end)
+            path.append(node)
+        return path[::-1]
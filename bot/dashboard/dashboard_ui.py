@@ -14,6 +14,7 @@ from dash import no_update
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 from loguru import logger
+from bot.utils.tracing import load_dump
 
 # ============================================================
 # Control File Interface (Dashboard ↔ Scheduler)
@@ -164,6 +165,14 @@ def read_winrate_data():
         logger.error(f"Error reading winrate_history.csv: {e}")
         return pd.DataFrame(columns=["time", "win_rate"])
 
+def read_latency_histograms():
+    """Load per-stage latency percentiles dumped by the scheduler's tracer."""
+    dump = load_dump(os.path.join("reports", "latency_histograms.json"))
+    cols = ["stage", "n", "err", "p50_us", "p90_us", "p99_us", "p999_us", "max_us"]
+    rows = [{"stage": name, **{k: st.get(k, 0) for k in cols[1:]}} for name, st in dump.get("stages", {}).items()]
+    df = pd.DataFrame(rows, columns=cols)
+    return df.sort_values("p99_us", ascending=False), dump.get("t")
+
 # ============================================================
 # Layout
 # ============================================================
@@ -305,6 +314,26 @@ html.Div(
 
 
 
+        # ───────────────────────────────────────────────
+        # Stage Latency Dock
+        # ───────────────────────────────────────────────
+        html.Div(
+            [
+                html.H4("⏱ Stage Latency (p50 / p99)", style={"color": "#FF77FF", "marginBottom": "10px"}),
+                html.Div(id="latency-container"),
+            ],
+            style={
+                "border": "1px solid #333",
+                "borderRadius": "10px",
+                "padding": "12px",
+                "backgroundColor": "#1b1b1b",
+                "color": "white",
+                "marginBottom": "25px",
+                "maxHeight": "300px",
+                "overflowY": "auto",
+            },
+        ),
+
         # ───────────────────────────────────────────────
         # Metrics Display
         # ───────────────────────────────────────────────
@@ -563,6 +592,43 @@ def update_ai_log(n):
 
 
 
+# ============================================================
+# Callback: Stage Latency Histograms
+# ============================================================
+
+def _fmt_us(us):
+    return f"{us / 1000:.1f}ms" if us >= 1000 else f"{us:.0f}µs"
+
+
+@app.callback(
+    Output("latency-container", "children"),
+    Input("interval-component", "n_intervals"),
+)
+def update_latency(n):
+    df, ts = read_latency_histograms()
+    if df.empty:
+        return html.Div("No latency histograms dumped yet.", style={"color": "#888"})
+
+    rows = []
+    for _, r in df.iterrows():
+        color = "#FF5555" if r["p99_us"] >= 1e6 else "#ffcc00" if r["p99_us"] >= 1e5 else "#00FFAA"
+        rows.append(
+            html.Div(
+                [
+                    html.Span(f"{r['stage']:<32}", style={"color": "#00BFFF", "whiteSpace": "pre"}),
+                    html.Span(f" p50={_fmt_us(r['p50_us'])}", style={"color": "#ccc"}),
+                    html.Span(f"  p99={_fmt_us(r['p99_us'])}", style={"color": color, "fontWeight": "bold"}),
+                    html.Span(f"  max={_fmt_us(r['max_us'])}  n={int(r['n'])}", style={"color": "#999"}),
+                    html.Span(f"  err={int(r['err'])}" if r["err"] else "", style={"color": "#FF5555"}),
+                ],
+                style={"marginBottom": "3px", "fontSize": "15px", "fontFamily": "monospace"},
+            )
+        )
+    if ts:
+        rows.append(html.Div(f"dumped {datetime.utcfromtimestamp(ts).strftime('%H:%M:%S')} UTC", style={"color": "#666"}))
+    return rows
+
+
 # ============================================================
 # Main Entry
 # ============================================================
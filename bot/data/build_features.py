@@ -2,10 +2,7 @@ import os
 import pandas as pd
 import numpy as np
 import logging
-from ta.trend import EMAIndicator, MACD
-from ta.volatility import BollingerBands
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange
+from bot.data.indicator_engine import compute_indicators
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 
@@ -34,19 +31,8 @@ def generate_features():
         'volume': volume
     })
 
-    # Indicators
-    df['EMA_20'] = EMAIndicator(df['close'], window=20).ema_indicator()
-    df['EMA_50'] = EMAIndicator(df['close'], window=50).ema_indicator()
-    df['EMA_200'] = EMAIndicator(df['close'], window=200).ema_indicator()
-    df['RSI_14'] = RSIIndicator(df['close'], window=14).rsi()
-    macd = MACD(df['close'])
-    df['MACD'] = macd.macd()
-    bb = BollingerBands(df['close'])
-    df['BB_upper'] = bb.bollinger_hband()
-    df['BB_lower'] = bb.bollinger_lband()
-    df['ATR'] = AverageTrueRange(df['high'], df['low'], df['close'], window=14).average_true_range()
-
-    df = df.dropna()
+    # Indicators (same streaming engine the live feed uses)
+    df = compute_indicators(df)
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
     df.to_csv(OUTPUT_PATH, index=False)
     logging.info(f"✅ Feature dataset saved → {OUTPUT_PATH}")
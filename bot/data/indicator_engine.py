@@ -1,66 +1,247 @@
+from __future__ import annotations
+import copy
+import math
+from collections import deque
+
 import pandas as pd
 import numpy as np
 
-# ========== Core Indicator Functions ==========
-
-def EMA(series, period):
-    return series.ewm(span=period, adjust=False).mean()
-
-def RSI(series, period=14):
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def MACD(series, fast=12, slow=26, signal=9):
-    ema_fast = EMA(series, fast)
-    ema_slow = EMA(series, slow)
-    macd = ema_fast - ema_slow
-    signal_line = EMA(macd, signal)
-    return macd - signal_line
-
-def Bollinger_Bands(series, period=20, num_std=2):
-    ma = series.rolling(window=period).mean()
-    std = series.rolling(window=period).std()
-    upper = ma + num_std * std
-    lower = ma - num_std * std
-    return upper, lower
-
-def ATR(df, period=14):
-    high_low = df['high'] - df['low']
-    high_close = np.abs(df['high'] - df['close'].shift())
-    low_close = np.abs(df['low'] - df['close'].shift())
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = tr.rolling(window=period).mean()
-    return atr
-
-# ========== Main Wrapper ==========
+# ========== Streaming Indicator Engine ==========
+# One definition of EMA / RSI / MACD / Bollinger / ATR shared by the live feed,
+# the live loop and the training exports. Every indicator keeps its recursive
+# state and advances in O(1) per bar; the batch path is a loop over the very
+# same update() so historical frames and live appends can never disagree.
+#
+# Conventions follow the `ta` defaults the feed used before:
+#   - EMA:       adjust=False recursion from the first bar (feed EMAs report from
+#                bar one; MACD's inner EMAs wait for `period` bars like `ta`)
+#   - RSI:       Wilder smoothing (alpha = 1/period), 100 when there are no losses
+#   - MACD:      EMA(12) - EMA(26), signal EMA(9) over the MACD line
+#   - Bollinger: rolling mean ± k·std with population std (ddof=0)
+#   - ATR:       Wilder ATR seeded with the mean of the first `period` true ranges
 
-def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+NAN = float("nan")
+
+
+def _copy_slots(obj):
+    clone = obj.__class__.__new__(obj.__class__)
+    for name in obj.__slots__:
+        setattr(clone, name, getattr(obj, name))
+    return clone
+
+
+class EMAState:
+    __slots__ = ("period", "alpha", "min_periods", "value", "count")
+
+    def __init__(self, period: int, min_periods: int | None = None):
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1.0)
+        self.min_periods = self.period if min_periods is None else int(min_periods)
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class RSIState:
+    __slots__ = ("period", "alpha", "prev", "up", "down", "count")
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self.alpha = 1.0 / self.period
+        self.prev = NAN
+        self.up = 0.0
+        self.down = 0.0
+        self.count = 0
+
+    def update(self, close: float) -> float:
+        if self.count == 0:
+            gain = loss = 0.0
+            self.up, self.down = gain, loss
+        else:
+            delta = close - self.prev
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            self.up = (1.0 - self.alpha) * self.up + self.alpha * gain
+            self.down = (1.0 - self.alpha) * self.down + self.alpha * loss
+        self.prev = close
+        self.count += 1
+        if self.count < self.period:
+            return NAN
+        if self.down == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + self.up / self.down))
+
+
+class MACDState:
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+
+    def update(self, close: float):
+        f = self.fast.update(close)
+        s = self.slow.update(close)
+        if math.isnan(s):
+            return NAN, NAN, NAN
+        macd = f - s
+        sig = self.signal.update(macd)
+        return macd, sig, macd - sig
+
+
+class BollingerState:
+    __slots__ = ("period", "num_std", "window", "mean", "m2")
 
-    # Exponentials
-    df["EMA_20"] = EMA(df["close"], 20)
-    df["EMA_50"] = EMA(df["close"], 50)
-    df["EMA_200"] = EMA(df["close"], 200)
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.period = int(period)
+        self.num_std = float(num_std)
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
 
-    # RSI
-    df["RSI_14"] = RSI(df["close"], 14)
+    def update(self, x: float):
+        # Sliding-window Welford: O(1) and stable at gold price levels
+        if len(self.window) < self.period:
+            self.window.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window.popleft()
+            self.window.append(x)
+            prev_mean = self.mean
+            self.mean = prev_mean + (x - old) / self.period
+            self.m2 += (x - old) * (x - self.mean + old - prev_mean)
+        if len(self.window) < self.period:
+            return NAN, NAN, NAN
+        std = math.sqrt(max(self.m2, 0.0) / self.period)
+        return self.mean, self.mean + self.num_std * std, self.mean - self.num_std * std
 
-    # MACD
-    df["MACD"] = MACD(df["close"])
 
-    # Bollinger Bands
-    bb_upper, bb_lower = Bollinger_Bands(df["close"], 20)
-    df["BB_upper"] = bb_upper
-    df["BB_lower"] = bb_lower
+class ATRState:
+    __slots__ = ("period", "prev_close", "seed", "value", "count")
 
-    # ATR
-    df["ATR"] = ATR(df, 14)
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self.prev_close = NAN
+        self.seed = 0.0
+        self.value = NAN
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self.count > 0:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.period:
+            self.seed += tr
+            return NAN
+        if self.count == self.period:
+            self.value = (self.seed + tr) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    Stateful indicator set.
+      - update(...)  → commit one closed bar, O(1)
+      - preview(...) → values for a still-forming bar without committing it
+      - batch(df)    → replay a historical frame through update()
+
+    ema_min_periods=1 reports EMAs from the first bar (the live feed); None
+    holds each EMA at NaN for its first `period` bars (training exports).
+    """
+
+    COLUMNS = [
+        "EMA_20", "EMA_50", "EMA_200", "RSI_14",
+        "MACD", "MACD_Signal", "MACD_Hist",
+        "BB_Mid", "BB_Upper", "BB_Lower", "ATR",
+    ]
+
+    def __init__(self, atr_period: int = 14, ema_min_periods: int | None = 1):
+        self.atr_period = int(atr_period)
+        self.ema_min_periods = ema_min_periods
+        self.reset()
+
+    def reset(self):
+        self.ema = [EMAState(p, min_periods=self.ema_min_periods) for p in (20, 50, 200)]
+        self.rsi = RSIState(14)
+        self.macd = MACDState(12, 26, 9)
+        self.bb = BollingerState(20, 2.0)
+        self.atr = ATRState(self.atr_period)
+        self.bars = 0
+
+    def update(self, high: float, low: float, close: float) -> dict:
+        e20, e50, e200 = (e.update(close) for e in self.ema)
+        macd, sig, hist = self.macd.update(close)
+        mid, upper, lower = self.bb.update(close)
+        self.bars += 1
+        return {
+            "EMA_20": e20, "EMA_50": e50, "EMA_200": e200,
+            "RSI_14": self.rsi.update(close),
+            "MACD": macd, "MACD_Signal": sig, "MACD_Hist": hist,
+            "BB_Mid": mid, "BB_Upper": upper, "BB_Lower": lower,
+            "ATR": self.atr.update(high, low, close),
+        }
+
+    def preview(self, high: float, low: float, close: float) -> dict:
+        return self._clone().update(high, low, close)
+
+    def _clone(self) -> "IndicatorEngine":
+        # hand-rolled: deepcopy() is ~10x slower on these small slot objects
+        clone = copy.copy(self)
+        clone.ema = [_copy_slots(e) for e in self.ema]
+        clone.rsi = _copy_slots(self.rsi)
+        clone.macd = _copy_slots(self.macd)
+        clone.macd.fast = _copy_slots(self.macd.fast)
+        clone.macd.slow = _copy_slots(self.macd.slow)
+        clone.macd.signal = _copy_slots(self.macd.signal)
+        clone.bb = _copy_slots(self.bb)
+        clone.bb.window = self.bb.window.copy()
+        clone.atr = _copy_slots(self.atr)
+        return clone
+
+    def batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reset, replay every row of `df` and return it with indicator columns added."""
+        self.reset()
+        out = df.copy()
+        n = len(df)
+        cols = {c: np.empty(n) for c in self.COLUMNS}
+        high = df["high"].to_numpy(dtype=float).tolist()
+        low = df["low"].to_numpy(dtype=float).tolist()
+        close = df["close"].to_numpy(dtype=float).tolist()
+        for i in range(n):
+            row = self.update(high[i], low[i], close[i])
+            for c in self.COLUMNS:
+                cols[c][i] = row[c]
+        for c in self.COLUMNS:
+            out[c] = cols[c]
+        return out
+
+
+# ========== Training / Export Wrapper ==========
+
+# Training datasets (artifacts/features.json) use lower-case Bollinger names
+TRAINING_NAMES = {"BB_Upper": "BB_upper", "BB_Lower": "BB_lower"}
+
+
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    # EMAs wait for `period` bars here so the dropna below removes the
+    # unconverged EMA_200 warm-up, as the ta-based exports did
+    df = IndicatorEngine(ema_min_periods=None).batch(df)
+    df.drop(columns=["MACD_Signal", "MACD_Hist", "BB_Mid"], inplace=True)
+    df.rename(columns=TRAINING_NAMES, inplace=True)
 
     # Drop NaNs from warm-up periods
     df.dropna(inplace=True)
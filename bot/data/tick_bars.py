@@ -0,0 +1,118 @@
+# ================================================================
+# File: bot/data/tick_bars.py
+# Purpose: Tick → OHLCV aggregation (vectorized time_msc path + legacy resample)
+# ================================================================
+
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+
+def rule_to_ms(rule: str) -> int:
+    """'1min' / '5min' / '1T' / '30s' → bar length in milliseconds."""
+    ms = int(pd.Timedelta(str(rule).replace("T", "min")).total_seconds() * 1000)
+    if ms <= 0:
+        raise ValueError(f"Invalid bar rule: {rule}")
+    return ms
+
+
+def ticks_to_ohlcv(
+    time_msc: np.ndarray,
+    price: np.ndarray,
+    bar_ms: int = 60_000,
+    volume: np.ndarray | None = None,
+    bid: np.ndarray | None = None,
+    ask: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """
+    Single grouped pass over NumPy arrays keyed on time_msc.
+
+    Every tick is kept (no second flooring, no duplicate-timestamp drop);
+    ticks sharing a millisecond keep their arrival order. Returns bars indexed
+    by UTC bar start with open/high/low/close/volume/tick_count and, when both
+    bid and ask are given, spread_mean/spread_max.
+    """
+    msc = np.asarray(time_msc, dtype=np.int64)
+    px = np.asarray(price, dtype=np.float64)
+    n = len(msc)
+    if n == 0:
+        return pd.DataFrame(columns=["open", "high", "low", "close", "volume", "tick_count"])
+
+    order = None
+    if n > 1 and np.any(msc[1:] < msc[:-1]):
+        order = np.argsort(msc, kind="stable")
+        msc, px = msc[order], px[order]
+
+    bar_id = msc // bar_ms
+    starts = np.concatenate(([0], np.flatnonzero(bar_id[1:] != bar_id[:-1]) + 1))
+    ends = np.append(starts[1:], n)
+    counts = ends - starts
+
+    cols = {
+        "open": px[starts],
+        "high": np.maximum.reduceat(px, starts),
+        "low": np.minimum.reduceat(px, starts),
+        "close": px[ends - 1],
+    }
+    if volume is not None:
+        vol = np.asarray(volume, dtype=np.float64)
+        cols["volume"] = np.add.reduceat(vol if order is None else vol[order], starts)
+    else:
+        cols["volume"] = np.zeros(len(starts))
+    cols["tick_count"] = counts
+
+    if bid is not None and ask is not None:
+        spread = np.asarray(ask, dtype=np.float64) - np.asarray(bid, dtype=np.float64)
+        if order is not None:
+            spread = spread[order]
+        cols["spread_mean"] = np.add.reduceat(spread, starts) / counts
+        cols["spread_max"] = np.maximum.reduceat(spread, starts)
+
+    index = pd.to_datetime(bar_id[starts] * bar_ms, unit="ms", utc=True)
+    index.name = "time"
+    return pd.DataFrame(cols, index=index)
+
+
+def resample_ticks(tick_df: pd.DataFrame, rule: str = "1min", price_col: str | None = None) -> pd.DataFrame:
+    """
+    Legacy pandas path: second-resolution index, duplicate timestamps dropped,
+    one resample per field. Kept for frames without time_msc (e.g. rates).
+    """
+    if price_col is None:
+        price_col = next((c for c in ["bid", "ask", "last", "close"] if c in tick_df.columns), None)
+    if price_col is None:
+        raise ValueError("No bid/ask/last column found in tick data.")
+
+    # --- Ensure time index is proper datetime in UTC ---
+    if not pd.api.types.is_datetime64_any_dtype(tick_df.index):
+        if "time" in tick_df.columns:
+            tick_df["time"] = pd.to_datetime(tick_df["time"], unit="s", utc=True)
+            tick_df.set_index("time", inplace=True)
+        else:
+            raise ValueError("No time column found in tick data.")
+    else:
+        tick_df.index = pd.to_datetime(tick_df.index, utc=True)
+
+    # --- Sort and remove duplicates ---
+    tick_df = tick_df[~tick_df.index.duplicated(keep="last")].sort_index()
+
+    # --- Normalize to 1-second precision ---
+    tick_df.index = tick_df.index.floor("s")
+
+    # --- Resample to OHLC bars ---
+    price_series = tick_df[price_col]
+    o = price_series.resample(rule).first()
+    h = price_series.resample(rule).max()
+    l = price_series.resample(rule).min()
+    c = price_series.resample(rule).last()
+
+    # --- Volume aggregation ---
+    if "volume" in tick_df.columns:
+        v = tick_df["volume"].resample(rule).sum()
+    else:
+        v = pd.Series(0, index=c.index)
+
+    bars = pd.concat([o, h, l, c, v], axis=1)
+    bars.columns = ["open", "high", "low", "close", "volume"]
+    bars.dropna(inplace=True)
+    return bars
@@ -0,0 +1,348 @@
+# ================================================================
+# File: bot/data/tick_store.py
+# Purpose: Columnar, day-partitioned binary tick store
+# Usage:   python -m bot.data.tick_store import --csv data/raw_ticks/XAUUSD_ticks.csv --symbol XAUUSD
+# ================================================================
+"""
+Layout
+------
+<root>/_schema.json
+<root>/<SYMBOL>/<YYYY-MM-DD>/<column>.bin      (one raw little-endian array per column)
+<root>/<SYMBOL>/<YYYY-MM-DD>/CURRENT           (after a rewrite: name of the live generation)
+<root>/<SYMBOL>/<YYYY-MM-DD>/g<N>/<column>.bin
+
+Partitions are UTC days of time_msc. Column files carry no header so appends
+are plain byte appends and reads are np.memmap views (zero-copy). A crash
+between column appends leaves files of unequal length; readers use the
+shortest column and the next append truncates the rest back to it.
+
+Out-of-order data rewrites the partition into a fresh generation directory and
+then switches CURRENT with one os.replace, so readers see either the old or
+the new columns, never a mix. Older generations are removed afterwards (and
+retried on the next rewrite if a reader still has them mapped).
+
+Appending ticks that are already stored (overlapping fetches, importing the
+same CSV twice) is a no-op: an incoming row equal on (time_msc, bid, ask,
+flags) to a stored row of its partition is skipped, repeats matched one for
+one. Identical ticks within one batch are separate prints and are all kept.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DAY_MS = 86_400_000
+COLUMNS = ("time_msc", "bid", "ask", "last", "volume", "flags")
+KEY = ("time_msc", "bid", "ask", "flags")    # identity of a tick for overlap detection
+
+
+def _to_msc(t) -> Optional[int]:
+    """int ms / datetime / Timestamp / ISO string → epoch milliseconds (UTC)."""
+    if t is None:
+        return None
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    ts = pd.Timestamp(t)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value // 1_000_000)
+
+
+def _day_name(day: int) -> str:
+    return datetime.fromtimestamp(day * DAY_MS / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _is_day(name: str) -> bool:
+    try:
+        datetime.strptime(name, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def _day_index(name: str) -> int:
+    return int(datetime.strptime(name, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000) // DAY_MS
+
+
+class TickStore:
+    """Append-only tick store with partition pruning and memory-mapped reads."""
+
+    def __init__(self, root: str | Path = "data/tick_store", price_dtype: str = "float64"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        schema_path = self.root / "_schema.json"
+        if schema_path.exists():
+            schema = json.loads(schema_path.read_text(encoding="utf-8"))
+        else:
+            if price_dtype not in ("float32", "float64"):
+                raise ValueError("price_dtype must be float32 or float64")
+            schema = {
+                "version": 1,
+                "partition": "utc_day",
+                "dtypes": {
+                    "time_msc": "<i8",
+                    "bid": np.dtype(price_dtype).str,
+                    "ask": np.dtype(price_dtype).str,
+                    "last": np.dtype(price_dtype).str,
+                    "volume": "<f8",
+                    "flags": "<u4",
+                },
+            }
+            schema_path.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+        self.dtypes: Dict[str, np.dtype] = {c: np.dtype(d) for c, d in schema["dtypes"].items()}
+
+    # ---------- Layout helpers ----------
+    def symbols(self) -> List[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def days(self, symbol: str) -> List[str]:
+        sym_dir = self.root / symbol
+        if not sym_dir.exists():
+            return []
+        return sorted(p.name for p in sym_dir.iterdir() if p.is_dir() and _is_day(p.name))
+
+    @staticmethod
+    def _data_dir(part: Path) -> Path:
+        """Directory holding the live column files of a partition."""
+        current = part / "CURRENT"
+        if current.exists():
+            return part / current.read_text(encoding="utf-8").strip()
+        return part
+
+    def _rows(self, data: Path) -> int:
+        sizes = []
+        for c in COLUMNS:
+            f = data / f"{c}.bin"
+            sizes.append(f.stat().st_size // self.dtypes[c].itemsize if f.exists() else 0)
+        return min(sizes)
+
+    def _column(self, part: Path, col: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=self.dtypes[col])
+        return np.memmap(part / f"{col}.bin", dtype=self.dtypes[col], mode="r", shape=(rows,))
+
+    # ---------- Write ----------
+    def _normalize(self, ticks) -> Dict[str, np.ndarray]:
+        """Structured MT5 array / DataFrame / dict → typed column arrays."""
+        if isinstance(ticks, pd.DataFrame):
+            get = lambda c: ticks[c].to_numpy() if c in ticks.columns else None
+        elif isinstance(ticks, np.ndarray) and ticks.dtype.names:
+            get = lambda c: ticks[c] if c in ticks.dtype.names else None
+        else:
+            get = lambda c: np.asarray(ticks[c]) if c in ticks else None
+
+        msc = get("time_msc")
+        if msc is None:
+            raise ValueError("ticks need a time_msc column")
+        n = len(msc)
+        vol = get("volume_real")
+        if vol is None:
+            vol = get("volume")
+        cols = {
+            "time_msc": msc,
+            "bid": get("bid"),
+            "ask": get("ask"),
+            "last": get("last"),
+            "volume": vol,
+            "flags": get("flags"),
+        }
+        return {
+            c: (np.zeros(n, dtype=self.dtypes[c]) if v is None else np.ascontiguousarray(v, dtype=self.dtypes[c]))
+            for c, v in cols.items()
+        }
+
+    @staticmethod
+    def _stored(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Mask of `new` rows already present in `old` on KEY. Repeats pair up one
+        for one: the k-th copy of a tick in `new` matches only if `old` holds
+        at least k copies, so extra same-ms prints are never dropped.
+        """
+        frames = []
+        for cols in (old, new):
+            df = pd.DataFrame({c: cols[c] for c in KEY})
+            df["nth"] = df.groupby(list(KEY), sort=False).cumcount()
+            frames.append(df)
+        hit = frames[1].merge(frames[0], how="left", on=[*KEY, "nth"], indicator=True)
+        return (hit["_merge"] == "both").to_numpy()
+
+    def _rewrite(self, part: Path, cols: Dict[str, np.ndarray]):
+        live = self._data_dir(part)
+        gen = int(live.name[1:]) + 1 if live != part else 1
+        new = part / f"g{gen}"
+        shutil.rmtree(new, ignore_errors=True)          # leftover of a crashed rewrite
+        new.mkdir()
+        for c in COLUMNS:
+            with open(new / f"{c}.bin", "wb") as f:
+                cols[c].tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        tmp = part / "CURRENT.tmp"
+        tmp.write_text(new.name, encoding="utf-8")
+        os.replace(tmp, part / "CURRENT")               # the switch: one atomic rename
+
+        # drop the previous generation / legacy top-level columns; on Windows a
+        # live memmap can keep a file locked, so leave it for the next rewrite
+        for p in part.iterdir():
+            if p.name in ("CURRENT", new.name):
+                continue
+            try:
+                shutil.rmtree(p) if p.is_dir() else p.unlink()
+            except OSError:
+                pass
+
+    def append(self, symbol: str, ticks) -> int:
+        """Append ticks (any order); returns the number of new rows stored."""
+        cols = self._normalize(ticks)
+        n = len(cols["time_msc"])
+        if n == 0:
+            return 0
+
+        order = np.argsort(cols["time_msc"], kind="stable")
+        if np.any(order != np.arange(n)):
+            cols = {c: v[order] for c, v in cols.items()}
+
+
+        written = 0
+        day = cols["time_msc"] // DAY_MS
+        cuts = np.concatenate(([0], np.flatnonzero(day[1:] != day[:-1]) + 1, [n]))
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            chunk = {c: v[a:b] for c, v in cols.items()}
+            part = self.root / symbol / _day_name(int(day[a]))
+            part.mkdir(parents=True, exist_ok=True)
+            data = self._data_dir(part)
+            rows = self._rows(data)
+
+            # repair a torn append: cut every column back to the shortest one
+            for c in COLUMNS:
+                f = data / f"{c}.bin"
+                if f.exists() and f.stat().st_size != rows * self.dtypes[c].itemsize:
+                    os.truncate(f, rows * self.dtypes[c].itemsize)
+
+            msc = self._column(data, "time_msc", rows)
+            last = int(msc[-1]) if rows else None
+            if last is None or int(chunk["time_msc"][0]) >= last:
+                if last is not None and int(chunk["time_msc"][0]) == last:
+                    # overlapping fetch: skip rows already stored at the boundary ms
+                    i = int(np.searchsorted(msc, last, side="left"))
+                    tail = {c: self._column(data, c, rows)[i:] for c in KEY}
+                    keep = ~self._stored(tail, chunk)
+                    chunk = {c: v[keep] for c, v in chunk.items()}
+                for c in COLUMNS:
+                    with open(data / f"{c}.bin", "ab") as f:
+                        chunk[c].tofile(f)
+                written += len(chunk["time_msc"])
+            else:
+                # out-of-order data: merge and rewrite this partition only
+                old = {c: np.array(self._column(data, c, rows)) for c in COLUMNS}
+                keep = ~self._stored(old, chunk)
+                if keep.any():
+                    merged = {c: np.concatenate([old[c], chunk[c][keep]]) for c in COLUMNS}
+                    order = np.argsort(merged["time_msc"], kind="stable")
+                    self._rewrite(part, {c: v[order] for c, v in merged.items()})
+                written += int(keep.sum())
+        return written
+
+    # ---------- Read ----------
+    def read(
+        self,
+        symbol: str,
+        start=None,
+        end=None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Ticks with start <= time_msc < end. Partitions outside the range are
+        never opened; a single-partition result is a zero-copy memmap view.
+        """
+        columns = list(columns or COLUMNS)
+        start_ms, end_ms = _to_msc(start), _to_msc(end)
+        lo_day = None if start_ms is None else start_ms // DAY_MS
+        hi_day = None if end_ms is None else (end_ms - 1) // DAY_MS
+
+        pieces: Dict[str, List[np.ndarray]] = {c: [] for c in columns}
+        for name in self.days(symbol):
+            d = _day_index(name)
+            if (lo_day is not None and d < lo_day) or (hi_day is not None and d > hi_day):
+                continue
+            part = self._data_dir(self.root / symbol / name)
+            rows = self._rows(part)
+            if rows == 0:
+                continue
+            msc = self._column(part, "time_msc", rows)
+            i = 0 if start_ms is None else int(np.searchsorted(msc, start_ms, side="left"))
+            j = rows if end_ms is None else int(np.searchsorted(msc, end_ms, side="left"))
+            if j <= i:
+                continue
+            for c in columns:
+                pieces[c].append(self._column(part, c, rows)[i:j])
+
+        out = {}
+        for c in columns:
+            if not pieces[c]:
+                out[c] = np.empty(0, dtype=self.dtypes[c])
+            elif len(pieces[c]) == 1:
+                out[c] = pieces[c][0]
+            else:
+                out[c] = np.concatenate(pieces[c])
+        return out
+
+    def read_frame(self, symbol: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        cols = self.read(symbol, start, end, columns)
+        df = pd.DataFrame({c: np.asarray(v) for c, v in cols.items()})
+        if "time_msc" in df.columns:
+            df.index = pd.to_datetime(df["time_msc"], unit="ms", utc=True)
+            df.index.name = "time"
+        return df
+
+    def count(self, symbol: str) -> int:
+        return sum(self._rows(self._data_dir(self.root / symbol / d)) for d in self.days(symbol))
+
+    # ---------- Import ----------
+    def import_csv(self, symbol: str, path: str | Path, chunksize: int = 500_000) -> int:
+        """Import an MT5 tick CSV export (needs time_msc) into the store."""
+        total = 0
+        carry = None
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            if "time_msc" not in chunk.columns:
+                if "time" not in chunk.columns:
+                    raise ValueError(f"{path}: need a time_msc or time column")
+                chunk["time_msc"] = pd.to_datetime(chunk["time"], utc=True).astype("int64") // 1_000_000
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            # hold back the last millisecond: repeats of a tick split across two
+            # chunks would otherwise look like an overlap with stored rows
+            tail = chunk["time_msc"].to_numpy() == chunk["time_msc"].iloc[-1]
+            carry = chunk[tail]
+            total += self.append(symbol, chunk[~tail])
+        if carry is not None:
+            total += self.append(symbol, carry)
+        return total
+
+
+# ---------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Columnar tick store utilities")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="import an MT5 tick CSV")
+    imp.add_argument("--csv", required=True)
+    imp.add_argument("--symbol", required=True)
+    imp.add_argument("--root", default="data/tick_store")
+    imp.add_argument("--price-dtype", default="float64", choices=["float32", "float64"])
+    args = ap.parse_args()
+
+    store = TickStore(args.root, price_dtype=args.price_dtype)
+    n = store.import_csv(args.symbol, args.csv)
+    print(f"✅ Imported {n:,} ticks → {store.root / args.symbol} ({len(store.days(args.symbol))} day partitions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,34 @@ import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
 import yaml
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime, timedelta
-from ta.trend import EMAIndicator, MACD
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.momentum import RSIIndicator
+from bot.data.indicator_engine import IndicatorEngine
+from bot.data.tick_bars import ticks_to_ohlcv, resample_ticks, rule_to_ms
+
+
+# ================================================================
+# Incremental Tick Cursor
+# ================================================================
+@dataclass
+class TickCursor:
+    """
+    Per-symbol incremental fetch state.
+      - last_msc:     time_msc watermark of the newest tick consumed
+      - seen_at_last: ticks already consumed that share last_msc
+                      (MT5 can stamp several ticks with the same msc)
+      - bars:         rolling OHLCV buffer covering the fetch window
+      - open_ticks:   ticks of the still-forming (last) bar
+      - engine:       streaming indicator state over closed bars
+      - features:     indicator rows already committed for closed bars
+    """
+    last_msc: int = 0
+    seen_at_last: int = 0
+    bars: pd.DataFrame = field(default_factory=pd.DataFrame)
+    open_ticks: pd.DataFrame = field(default_factory=pd.DataFrame)
+    engine: IndicatorEngine | None = None
+    features: pd.DataFrame | None = None
 
 
 # ================================================================
@@ -47,6 +70,9 @@ class MT5Feed:
         self.lookback = self.cfg["mt5"].get("lookback_bars", 5000)
         self.refresh = self.cfg["mt5"].get("refresh_rate", 60)
         self.resample_rule = self.cfg.get("resample_rule", "1min").replace("T", "min")
+        self.fetch_minutes = int(self.cfg["mt5"].get("fetch_minutes", 720))
+        self.incremental = bool(self.cfg["mt5"].get("incremental_ticks", True))
+        self._cursors: dict[str, TickCursor] = {}
 
         # --- Connect to MT5 ---
         if not mt5.initialize():
@@ -81,56 +107,32 @@ class MT5Feed:
     def ticks_to_bars(self, tick_df: pd.DataFrame) -> pd.DataFrame:
         """
         Convert tick-level data into OHLCV bars safely.
-        Handles bid/ask/last-only data and normalizes timestamps.
+        Frames carrying time_msc go through the single-pass NumPy aggregation
+        (every tick kept, plus tick_count/spread stats); anything else, e.g.
+        historical rates, uses the legacy resample path.
         """
-        import pandas as pd
-
         if tick_df.empty:
             print("⚠️ Tick dataframe is empty — cannot convert to bars.")
             return pd.DataFrame()
 
+        rule = self.resample_rule if hasattr(self, "resample_rule") else "1min"
+
         # --- Detect price column dynamically ---
-        price_col = None
-        for col in ["bid", "ask", "last"]:
-            if col in tick_df.columns:
-                price_col = col
-                break
+        price_col = next((c for c in ["bid", "ask", "last", "close"] if c in tick_df.columns), None)
         if price_col is None:
             raise ValueError("No bid/ask/last column found in tick data.")
 
-        # --- Ensure time index is proper datetime in UTC ---
-        if not pd.api.types.is_datetime64_any_dtype(tick_df.index):
-            if "time" in tick_df.columns:
-                tick_df["time"] = pd.to_datetime(tick_df["time"], unit="s", utc=True)
-                tick_df.set_index("time", inplace=True)
-            else:
-                raise ValueError("No time column found in tick data.")
+        if "time_msc" in tick_df.columns:
+            bars = ticks_to_ohlcv(
+                tick_df["time_msc"].to_numpy(),
+                tick_df[price_col].to_numpy(),
+                bar_ms=rule_to_ms(rule),
+                volume=tick_df["volume"].to_numpy() if "volume" in tick_df.columns else None,
+                bid=tick_df["bid"].to_numpy() if "bid" in tick_df.columns else None,
+                ask=tick_df["ask"].to_numpy() if "ask" in tick_df.columns else None,
+            )
         else:
-            tick_df.index = pd.to_datetime(tick_df.index, utc=True)
-
-        # --- Sort and remove duplicates ---
-        tick_df = tick_df[~tick_df.index.duplicated(keep="last")].sort_index()
-
-        # --- Normalize to 1-second precision ---
-        tick_df.index = tick_df.index.floor("S")
-
-        # --- Resample safely to 1-minute OHLC bars ---
-        rule = self.resample_rule if hasattr(self, "resample_rule") else "1min"
-        price_series = tick_df[price_col]
-        o = price_series.resample(rule).first()
-        h = price_series.resample(rule).max()
-        l = price_series.resample(rule).min()
-        c = price_series.resample(rule).last()
-
-        # --- Volume aggregation ---
-        if "volume" in tick_df.columns:
-            v = tick_df["volume"].resample(rule).sum()
-        else:
-            v = pd.Series(0, index=c.index)
-
-        bars = pd.concat([o, h, l, c, v], axis=1)
-        bars.columns = ["open", "high", "low", "close", "volume"]
-        bars.dropna(inplace=True)
+            bars = resample_ticks(tick_df, rule, price_col)
 
         print(f"✅ Converted {len(tick_df)} ticks → {len(bars)} bars ({rule})")
         return bars
@@ -141,79 +143,189 @@ class MT5Feed:
     def add_indicators(self, df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
         """
         Add technical indicators safely without dropping short datasets.
+        Batch path of the shared streaming engine (bot/data/indicator_engine).
         """
-        import ta  # technical analysis library
-        import numpy as np
-
         if df.empty:
             print("⚠️ Empty DataFrame received in add_indicators()")
             return df
 
-        df = df.copy()
-
-        # --- Core EMAs ---
-        for p in [20, 50, 200]:
-            try:
-                df[f"EMA_{p}"] = df["close"].ewm(span=p, adjust=False).mean()
-            except Exception as e:
-                print(f"⚠️ EMA({p}) failed: {e}")
-                df[f"EMA_{p}"] = np.nan
-
-        # --- RSI ---
-        try:
-            df["RSI_14"] = ta.momentum.RSIIndicator(df["close"], window=14).rsi()
-        except Exception as e:
-            print("⚠️ RSI failed:", e)
-            df["RSI_14"] = np.nan
-
-        # --- MACD ---
-        try:
-            macd = ta.trend.MACD(df["close"])
-            df["MACD"] = macd.macd()
-            df["MACD_Signal"] = macd.macd_signal()
-            df["MACD_Hist"] = macd.macd_diff()
-        except Exception as e:
-            print("⚠️ MACD failed:", e)
-            df["MACD"] = df["MACD_Signal"] = df["MACD_Hist"] = np.nan
-
-        # --- Bollinger Bands ---
-        try:
-            bb = ta.volatility.BollingerBands(df["close"], window=20, window_dev=2)
-            df["BB_Mid"] = bb.bollinger_mavg()
-            df["BB_Upper"] = bb.bollinger_hband()
-            df["BB_Lower"] = bb.bollinger_lband()
-        except Exception as e:
-            print("⚠️ Bollinger Bands failed:", e)
-            df["BB_Mid"] = df["BB_Upper"] = df["BB_Lower"] = np.nan
-
-        # --- ATR ---
-        try:
-            df["ATR"] = ta.volatility.AverageTrueRange(
-                high=df["high"], low=df["low"], close=df["close"], window=14
-            ).average_true_range()
-        except Exception as e:
-            print("⚠️ ATR failed:", e)
-            df["ATR"] = np.nan
+        atr_period = (cfg or {}).get("indicators", {}).get("atr_period", 14)
+        df = IndicatorEngine(atr_period).batch(df)
 
         # --- Fill any remaining NaNs rather than dropping ---
-        df.fillna(method="bfill", inplace=True)
-        df.fillna(method="ffill", inplace=True)
+        df.bfill(inplace=True)
+        df.ffill(inplace=True)
 
         print(f"✅ Indicators added → {len(df)} rows, {df.isna().sum().sum()} NaNs remaining")
         return df
 
+    def _stream_indicators(self, cur: TickCursor) -> pd.DataFrame:
+        """
+        Streaming path: commit newly closed bars into the cursor's engine in
+        O(1) each and preview the still-forming bar without committing it.
+        """
+        bars = cur.bars
+        if cur.engine is None:
+            atr_period = self.cfg.get("indicators", {}).get("atr_period", 14)
+            cur.engine = IndicatorEngine(atr_period)
+
+        closed = bars.iloc[:-1]
+        if cur.features is not None and not cur.features.empty:
+            closed = closed[closed.index > cur.features.index[-1]]
+        rows = [
+            cur.engine.update(h, l, c)
+            for h, l, c in zip(closed["high"].tolist(), closed["low"].tolist(), closed["close"].tolist())
+        ]
+        if rows:
+            fresh = pd.DataFrame(rows, index=closed.index, columns=IndicatorEngine.COLUMNS)
+            cur.features = fresh if cur.features is None else pd.concat([cur.features, fresh])
+        if cur.features is not None:
+            cur.features = cur.features[cur.features.index >= bars.index[0]]
+
+        last = bars.iloc[-1]
+        live = pd.DataFrame(
+            [cur.engine.preview(float(last["high"]), float(last["low"]), float(last["close"]))],
+            index=bars.index[-1:], columns=IndicatorEngine.COLUMNS,
+        )
+        ind = live if cur.features is None else pd.concat([cur.features, live])
+
+        df = bars.join(ind)
+        df.bfill(inplace=True)
+        df.ffill(inplace=True)
+        return df
+
     # ============================================================
     # Snapshot Symbol Features
     # ============================================================
-    def snapshot_symbol(self, symbol: str) -> pd.DataFrame:
+    @staticmethod
+    def _ticks_frame(ticks) -> pd.DataFrame:
+        """MT5 tick/rate array → DataFrame indexed by naive second-resolution time."""
+        df = pd.DataFrame(ticks)
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        df.set_index("time", inplace=True)
+        return df
+
+    @staticmethod
+    def _normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize tick/rate columns for bar + indicator generation."""
+        if "bid" in df.columns:
+            df.rename(columns={"bid": "close"}, inplace=True)
+        if "ask" in df.columns and "close" not in df.columns:
+            df.rename(columns={"ask": "close"}, inplace=True)
+        if "open" not in df.columns:
+            df["open"] = df["close"]
+        if "high" not in df.columns:
+            df["high"] = df["close"]
+        if "low" not in df.columns:
+            df["low"] = df["close"]
+        if "volume" not in df.columns:
+            df["volume"] = 0
+        return df
+
+    def reset_cursor(self, symbol: str | None = None) -> None:
+        """Drop incremental state (one symbol, or all) → next snapshot refetches the full window."""
+        if symbol is None:
+            self._cursors.clear()
+        else:
+            self._cursors.pop(symbol, None)
+
+    def _incremental_bars(self, symbol: str) -> pd.DataFrame | None:
+        """
+        Fetch only ticks newer than the symbol's time_msc watermark and merge
+        them into the rolling bar buffer. Returns None when no tick data is
+        available (caller falls back to the full-window path).
+
+        Only the still-forming bar is rebuilt from ticks; closed bars are kept
+        as-is, so per-cycle cost scales with new ticks, not with the lookback.
+        """
+        info = mt5.symbol_info_tick(symbol)
+        if not info:
+            return None
+
+        now = datetime.fromtimestamp(info.time)
+        cur = self._cursors.get(symbol)
+        if cur is None or cur.bars.empty:
+            cur = TickCursor()
+            frm = now - timedelta(minutes=self.fetch_minutes)
+        else:
+            # floor to the watermark second: MT5 ranges are second-resolution
+            frm = datetime.fromtimestamp(cur.last_msc // 1000)
+
+        ticks = mt5.copy_ticks_range(symbol, frm, now, mt5.COPY_TICKS_ALL)
+        if ticks is None or len(ticks) == 0:
+            return cur.bars if not cur.bars.empty else None
+
+        # --- Keep ticks past the watermark (plus unseen ticks sharing its msc) ---
+        msc = np.asarray(ticks["time_msc"], dtype=np.int64)
+        keep = msc > cur.last_msc
+        same = np.flatnonzero(msc == cur.last_msc)
+        if len(same) > cur.seen_at_last:
+            keep[same[cur.seen_at_last:]] = True
+
+        newest = int(msc.max())
+        seen = int(np.count_nonzero(msc == newest))
+        if newest == cur.last_msc:
+            seen = max(seen, cur.seen_at_last)
+        cur.last_msc, cur.seen_at_last = newest, seen
+
+        if not keep.any():
+            self._cursors[symbol] = cur
+            return cur.bars
+
+        fresh = self._ticks_frame(ticks[keep])
+        if cur.open_ticks.empty:
+            merged = fresh
+        else:
+            merged = pd.concat([cur.open_ticks, fresh])
+
+        partial = self.ticks_to_bars(merged)
+        if partial.empty:
+            self._cursors[symbol] = cur
+            return cur.bars if not cur.bars.empty else None
+
+        # --- Replace the forming bar onwards, keep closed bars untouched ---
+        first = partial.index[0]
+        if cur.bars.empty:
+            bars = partial
+        else:
+            bars = pd.concat([cur.bars[cur.bars.index < first], partial])
+
+        # --- Trim to the fetch window so memory stays flat ---
+        horizon = bars.index[-1] - pd.Timedelta(minutes=self.fetch_minutes)
+        cur.bars = bars[bars.index >= horizon]
+
+        last_open_ms = cur.bars.index[-1].value // 1_000_000
+        cur.open_ticks = merged[merged["time_msc"].to_numpy() >= last_open_ms]
+        self._cursors[symbol] = cur
+        print(f"✅ {symbol}: +{int(keep.sum())} ticks → {len(cur.bars)} bars (incremental)")
+        return cur.bars
+
+    def snapshot_symbol(self, symbol: str, incremental: bool | None = None) -> pd.DataFrame:
         """
         Fetch enough market data → OHLC bars → indicators for a given symbol.
         Uses ticks if available, else falls back to historical OHLC data (guaranteed).
+
+        With incremental=True (default from mt5.incremental_ticks) only ticks
+        newer than the last call are fetched and merged into an in-memory bar
+        buffer; the first call, or any call without tick data, takes the full
+        fetch_minutes window path below.
         """
         from datetime import datetime, timedelta
         atr_period = self.cfg.get("indicators", {}).get("atr_period", 14)
-        fetch_minutes = 720  # 12 hours of 1-minute data
+        fetch_minutes = self.fetch_minutes  # 12 hours of 1-minute data by default
 
+        incremental = self.incremental if incremental is None else incremental
+        if incremental:
+            try:
+                bars = self._incremental_bars(symbol)
+            except Exception as e:
+                print(f"⚠️ Incremental tick fetch error: {e}")
+                self.reset_cursor(symbol)
+                bars = None
+            if bars is not None and not bars.empty:
+                if len(bars) < atr_period:
+                    print(f"⚠️ Only {len(bars)} bars — not enough for ATR({atr_period}).")
+                return self._stream_indicators(self._cursors[symbol])
 
         df_ticks = pd.DataFrame()
 
@@ -225,9 +337,7 @@ class MT5Feed:
                 frm = now - timedelta(minutes=fetch_minutes)
                 ticks = mt5.copy_ticks_range(symbol, frm, now, mt5.COPY_TICKS_ALL)
                 if ticks is not None and len(ticks) > 0:
-                    df_ticks = pd.DataFrame(ticks)
-                    df_ticks["time"] = pd.to_datetime(df_ticks["time"], unit="s")
-                    df_ticks.set_index("time", inplace=True)
+                    df_ticks = self._ticks_frame(ticks)
                     print(f"✅ {symbol}: Live ticks fetched → {len(df_ticks)}")
         except Exception as e:
             print(f"⚠️ Tick fetch error: {e}")
@@ -238,9 +348,7 @@ class MT5Feed:
                 utc_from = datetime.now() - timedelta(days=5)
                 rates = mt5.copy_rates_from(symbol, mt5.TIMEFRAME_M1, utc_from, 5000)
                 if rates is not None and len(rates) > 0:
-                    df_ticks = pd.DataFrame(rates)
-                    df_ticks["time"] = pd.to_datetime(df_ticks["time"], unit="s")
-                    df_ticks.set_index("time", inplace=True)
+                    df_ticks = self._ticks_frame(rates)
                     print(f"✅ {symbol}: Historical OHLC fetched → {len(df_ticks)} bars")
                 else:
                     print(f"⚠️ No tick or OHLC data available for {symbol}.")
@@ -248,19 +356,9 @@ class MT5Feed:
                 print(f"❌ Failed to fetch historical data: {e}")
                 return pd.DataFrame()
 
-        # --- Normalize columns for indicator generation ---
-        if "bid" in df_ticks.columns:
-            df_ticks.rename(columns={"bid": "close"}, inplace=True)
-        if "ask" in df_ticks.columns and "close" not in df_ticks.columns:
-            df_ticks.rename(columns={"ask": "close"}, inplace=True)
-        if "open" not in df_ticks.columns:
-            df_ticks["open"] = df_ticks["close"]
-        if "high" not in df_ticks.columns:
-            df_ticks["high"] = df_ticks["close"]
-        if "low" not in df_ticks.columns:
-            df_ticks["low"] = df_ticks["close"]
-        if "volume" not in df_ticks.columns:
-            df_ticks["volume"] = 0
+        # --- Normalize rate columns (tick frames aggregate on bid directly) ---
+        if "time_msc" not in df_ticks.columns:
+            df_ticks = self._normalize_ohlcv(df_ticks)
 
         bars = self.ticks_to_bars(df_ticks)
         if len(bars) < atr_period:
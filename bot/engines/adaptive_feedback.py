@@ -1,8 +1,9 @@
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from bot.engines.volatility_sync import VolatilitySynchronizer
+from bot.utils.bayes_state import get_bayes_state
+from bot.utils.jsonl_tail import get_jsonl_ring
 
 logger = logging.getLogger(__name__)
 
@@ -21,17 +22,15 @@ class AdaptiveFeedback:
         logger.info(f"🧠 AdaptiveFeedback initialized | α={self.alpha_base:.2f}, k={self.k_conf:.2f}")
 
     def load_state(self):
-        """Load Bayesian state for feedback updates."""
-        if self.state_path.exists():
-            with open(self.state_path, "r") as f:
-                self.state = json.load(f)
-        else:
-            self.state = {"XAUUSD": {"a": 50.0, "b": 50.0}}
+        """Attach to the shared Bayesian state (bot/utils/bayes_state.py)."""
+        self._svc = get_bayes_state(self.state_path)
+        self.state = self._svc.state
+        # no seeding: other owners give state[symbol] the {"prior", "signals"} schema;
+        # this class only adds flat "a"/"b" keys to a symbol's node on update()
         logger.debug("📖 Bayesian state loaded.")
 
     def save_state(self):
-        with open(self.state_path, "w") as f:
-            json.dump(self.state, f, indent=2)
+        self._svc.save_all()
 
     def update(self, symbol: str, win: bool, conf: float):
         """Apply feedback weighted by volatility."""
@@ -42,14 +41,15 @@ class AdaptiveFeedback:
         volatility_factor = max(0.05, min(1.0 / (1 + 5 * vol), 1.0))
         adj_alpha = self.alpha_base * volatility_factor
 
-        entry = self.state.get(symbol, {"a": 50.0, "b": 50.0})
-        if win:
-            entry["a"] += adj_alpha * conf * self.k_conf
-        else:
-            entry["b"] += adj_alpha * (1 - conf) * self.k_conf
-
-        self.state[symbol] = entry
-        self.save_state()
+        with self._svc.lock(symbol):
+            entry = self.state.setdefault(symbol, {})
+            entry["a"] = float(entry.get("a", 50.0))
+            entry["b"] = float(entry.get("b", 50.0))
+            if win:
+                entry["a"] += adj_alpha * conf * self.k_conf
+            else:
+                entry["b"] += adj_alpha * (1 - conf) * self.k_conf
+        self._svc.mark_dirty(symbol)
 
         log_entry = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -61,9 +61,7 @@ class AdaptiveFeedback:
             "a": entry["a"],
             "b": entry["b"]
         }
-        Path("reports").mkdir(exist_ok=True)
-        with open("reports/feedback_log.jsonl", "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        get_jsonl_ring("reports/feedback_log.jsonl").append(log_entry)
 
         logger.info(
             f"📈 AdaptiveFeedback updated | {symbol} | win={win} | conf={conf:.3f} | "
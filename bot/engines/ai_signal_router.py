@@ -4,6 +4,7 @@ import random
 from datetime import datetime
 from pathlib import Path
 from bot.scheduler.vol_sync import VolatilitySynchronizer
+from bot.utils.tracing import traced
 
 import logging
 from typing import Optional
@@ -52,6 +53,7 @@ class AISignalRouter:
 
 
     # Example placeholder for computing volatility
+    @traced("ai.compute_volatility")
     def compute_volatility(self, symbol: str) -> float:
         try:
             return float(self.vol_sync.latest(symbol))
@@ -62,6 +64,7 @@ class AISignalRouter:
     # Example placeholder for confidence / AI model logic
     import random  # ✅ add this at the top of your file if not already
 
+    @traced("ai.compute_confidence")
     def compute_confidence(self, symbol: str) -> float:
         """
         Returns a probability-like confidence in [0,1].
@@ -1,7 +1,8 @@
-import json
-import os
 import logging
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+from bot.engines.dynamic_weights import VOL_CAP, DynamicWeighting
+from bot.utils.bayes_state import get_bayes_state
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 
@@ -19,34 +20,43 @@ DEFAULT_WEIGHTS = {
 }
 
 class BayesianFusion:
-    def __init__(self, state_path: str = "bayes_state.json", weights: Dict[str, Dict[str, float]] = None):
+    def __init__(self, state_path: str = "bayes_state.json", weights: Dict[str, Dict[str, float]] = None,
+                 dynamic_weights: Optional[DynamicWeighting] = None):
         self.state_path = state_path
         self.weights = weights or DEFAULT_WEIGHTS
+        self.dynamic_weights = dynamic_weights  # learned per-symbol weights (cached lookups)
         self._ensure_state()
 
     # Persist priors/posteriors if you use them; kept compatible with previous steps.
     def _ensure_state(self):
-        if not os.path.exists(self.state_path):
-            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
-            with open(self.state_path, "w") as f:
-                json.dump({"XAUUSD": {"prior": {"a": 50.0, "b": 50.0}, "signals": {}}}, f, indent=2)
+        self._svc = get_bayes_state(self.state_path)
+        self.state = self._svc.state
+        if not self.state:
+            with self._svc.lock("XAUUSD"):
+                self.state.setdefault("XAUUSD", {"prior": {"a": 50.0, "b": 50.0}, "signals": {}})
+            self._svc.mark_dirty("XAUUSD")
 
     def fused_decision(
         self,
         components: Dict[str, float],
         regime: str = "trend",
         vol: float = 0.0,
-        buy_sell_band: Tuple[float, float] = (0.555, 0.445)
+        buy_sell_band: Tuple[float, float] = (0.555, 0.445),
+        symbol: Optional[str] = None
     ) -> Dict:
         """
         components: dict of {name: probability in [0,1]}
         regime: 'trend' | 'range' | 'chop'
         vol:    normalized vol (0..1) used for adaptive widening/narrowing
         buy_sell_band: center thresholds before adaptive adjustments
+        symbol: with dynamic_weights set, use that symbol's learned weights
         """
         # 1) Choose weights by regime
         regime_key = regime if regime in self.weights else "trend"
         regime_w = self.weights[regime_key]
+        if self.dynamic_weights is not None and symbol:
+            # DynamicWeighting takes raw vol (full penalty at VOL_CAP); ours is 0..1
+            regime_w = self.dynamic_weights.compute(symbol, tuple(regime_w), regime_key, vol * VOL_CAP)
 
         # 2) Keep only available components
         active = {k: v for k, v in components.items() if k in regime_w and v is not None}
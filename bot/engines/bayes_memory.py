@@ -1,46 +1,78 @@
-import json
 import numpy as np
 from datetime import datetime, timedelta
 from loguru import logger
 
+from bot.core.clock import get_clock
+from bot.utils.bayes_state import get_bayes_state
+
 class BayesianMemory:
     """
     Tracks performance and drift of each Bayesian signal component.
     Provides adaptive priors and volatility-aware decay.
+
+    Decay is time-based and lazy: a signal node keeps its a/b as of its last
+    update ("t"), and `decay` per `decay_period_s` of elapsed time is applied
+    only when the node is read or next updated. Drift correction bumps a
+    per-symbol epoch ("drift_epoch"); nodes that have not seen it yet are
+    flattened on their next read/update. Both updates and drift corrections
+    are O(1) in memory; the state service batches the flushes.
+
+    The decay settings are installed on the shared state service, which
+    applies them for every reader and writer of the signals (the confidence
+    engine and AdaptiveFeedback included), not only for this class.
     """
 
-    def __init__(self, state_file="bayes_state.json", decay=0.995, drift_threshold=0.15):
+    def __init__(self, state_file="bayes_state.json", decay=0.995, drift_threshold=0.15,
+                 decay_period_s=3600.0, clock=None):
         self.state_file = state_file
         self.decay = decay
+        self.decay_period_s = float(decay_period_s)
         self.drift_threshold = drift_threshold
+        self.clock = clock or get_clock()
+        self._svc = get_bayes_state(state_file)
+        self._svc.configure_decay(decay, self.decay_period_s, self.clock)
         self.state = self._load_state()
 
     def _load_state(self):
-        try:
-            with open(self.state_file, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
+        # shared in-memory state (bot/utils/bayes_state.py)
+        if not self._svc.state:
             logger.warning("⚠️ No bayes_state.json found — initializing new memory.")
-            return {}
+        return self._svc.state
+
+    def _save_state(self, symbol=None):
+        """Mark `symbol` for the next coalesced flush; no symbol → full snapshot."""
+        if symbol is None:
+            self._svc.save_all()
+        else:
+            self._svc.mark_dirty(symbol)
 
-    def _save_state(self):
-        with open(self.state_file, "w") as f:
-            json.dump(self.state, f, indent=2)
+    # ---------- Lazy decay / drift ----------
+    def _decayed(self, symbol, node, now):
+        """(a, b) of `node` as of `now` (see BayesStateService.beta)."""
+        return self._svc.beta(symbol, node, now)
+
+    def posterior(self, symbol, signal_name):
+        """Current (a, b) of a signal with decay applied; None if unknown."""
+        with self._svc.lock(symbol):
+            node = self.state.get(symbol, {}).get("signals", {}).get(signal_name)
+            if not node:
+                return None
+            return self._decayed(symbol, node, self.clock.time())
 
     def update_memory(self, symbol, signal_name, outcome):
         """
         outcome = 1 (correct signal), 0 (incorrect)
         """
-        node = self.state.get(symbol, {}).get("signals", {}).get(signal_name)
-        if not node:
-            return
-
-        a, b = node["a"], node["b"]
-        a = self.decay * a + outcome
-        b = self.decay * b + (1 - outcome)
+        now = self.clock.time()
+        with self._svc.lock(symbol):
+            node = self.state.get(symbol, {}).get("signals", {}).get(signal_name)
+            if not node:
+                return
 
-        node["a"], node["b"] = a, b
-        self._save_state()
+            self._svc.materialize(symbol, node, now)
+            node["a"] += outcome
+            node["b"] += 1 - outcome
+        self._save_state(symbol)
 
     def detect_drift(self, symbol, recent_vols):
         """
@@ -61,11 +93,11 @@ class BayesianMemory:
     def apply_drift_correction(self, symbol):
         """
         When drift occurs, slightly flatten priors (forget old bias).
+        Only the symbol's drift epoch moves; each signal is flattened lazily.
         """
         if symbol not in self.state:
             return
-        for sig in self.state[symbol]["signals"].values():
-            sig["a"] = 50 + (sig["a"] - 50) * 0.5
-            sig["b"] = 50 + (sig["b"] - 50) * 0.5
-        self._save_state()
+        with self._svc.lock(symbol):
+            self._svc.bump_drift(symbol, self.clock.time())
+        self._save_state(symbol)
         logger.info(f"🔄 Priors flattened for {symbol} due to regime drift.")
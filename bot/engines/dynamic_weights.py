@@ -1,20 +1,52 @@
 # D:\XAU_Bot\bot\engines\dynamic_weights.py
 from __future__ import annotations
-import json, time
+import atexit
 from pathlib import Path
-from math import exp
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bot.core.clock import get_clock
+from bot.utils.wal_store import open_store
+
+# Per-signal statistics, one row each in the per-symbol dense array
+FIELDS = ("ema_acc", "ema_var", "count", "last_update", "base")
+DEFAULTS = (
+    0.55,   # ema_acc: start slightly optimistic
+    0.05,   # ema_var: pseudo-variance of correctness stream
+    0,      # count
+    0.0,    # last_update
+    1.0,    # base weight multiplier (manual tweaks if ever needed)
+)
+ACC, VAR, COUNT, LAST, BASE = range(len(FIELDS))
+
+# Hyperparams for scoring -> softmax
+W_ACC = 3.0       # influence of accuracy
+W_STAB = 2.0      # penalty from variance
+W_REG = 1.0       # regime alignment bump
+W_VOL = 0.5       # volatility penalty if signal tends to fail in high vol
+VOL_CAP = 0.05    # vol at which the penalty is full
+
+# Simple regime preference map (you can extend per your naming)
+# Keys must match your signal names in bayes_fusion signals
+REGIME_BIAS = {
+    "trend": {
+        "kf_trend": +1.0, "kf_slope": +1.0, "stoch_momo": +0.5,
+        "ou_revert": -0.5, "ou_zscore": -0.4
+    },
+    "range": {
+        "ou_revert": +1.0, "ou_zscore": +0.8,
+        "kf_trend": -0.5, "kf_slope": -0.5, "stoch_momo": -0.2
+    }
+}
+
+# Volatility aversion map (which signals struggle when vol climbs)
+VOL_PENALTY = {
+    "ou_revert": +1.0, "ou_zscore": +0.6,  # mean-revert worse in high vol
+    "kf_trend": 0.2, "kf_slope": 0.1, "stoch_momo": 0.3
+}
+DEFAULT_VOL_PENALTY = 0.2
 
-def _safe_load_json(p: Path) -> dict:
-    if not p.exists():
-        return {}
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-def _safe_dump_json(p: Path, obj: dict) -> None:
-    p.write_text(json.dumps(obj, indent=2), encoding="utf-8")
 
 class DynamicWeighting:
     """
@@ -23,49 +55,128 @@ class DynamicWeighting:
     - stability (variance penalty)
     - regime alignment (trend vs range)
     All weights are softmax-normalized.
+
+    Stats live in one dense (len(FIELDS), n_signals) array per symbol, indexed
+    by signal id. compute() results are cached per (symbol, regime, vol bucket,
+    signal list) and dropped only when an outcome for that symbol arrives, so
+    a fusion cycle is a dict lookup. Outcomes are persisted in batches of
+    `flush_every` (one WAL record; flush() forces it, also run at exit).
     """
     def __init__(
         self,
         state_path: str = "weights_state.json",
         alpha: float = 0.2,      # EWMA smoothing for accuracy
         beta: float = 0.1,       # EWMA smoothing for variance
-        min_weight: float = 0.05 # floor before softmax (keeps diversity)
+        min_weight: float = 0.05, # floor before softmax (keeps diversity)
+        vol_buckets: int = 20,   # vol in [0, VOL_CAP] is quantized to this many steps
+        flush_every: int = 32,   # outcomes per persisted batch
+        clock=None               # stamps last_update (SimulatedClock in replay)
     ):
         self.path = Path(state_path)
-        self.state: Dict = _safe_load_json(self.path)
+        self._store = open_store(self.path)
         self.alpha = alpha
         self.beta = beta
         self.min_weight = min_weight
-
-    def _ensure(self, symbol: str, signal: str) -> None:
-        self.state.setdefault(symbol, {})
-        self.state[symbol].setdefault(signal, {
-            "ema_acc": 0.55,   # start slightly optimistic
-            "ema_var": 0.05,   # pseudo-variance of correctness stream
-            "count": 0,
-            "last_update": 0.0,
-            "base": 1.0        # base weight multiplier (manual tweaks if ever needed)
-        })
-
+        self.vol_buckets = max(1, int(vol_buckets))
+        self.flush_every = max(1, int(flush_every))
+        self.clock = clock or get_clock()
+
+        self.signals: List[str] = []            # signal id -> name
+        self._ids: Dict[str, int] = {}           # name -> signal id
+        self._arrays: Dict[str, np.ndarray] = {} # symbol -> stats
+        self._tables: Tuple[int, Dict[str, np.ndarray], np.ndarray] = (0, {}, np.zeros(0))
+        self._cache: Dict[str, Dict[tuple, Dict[str, float]]] = {}
+        self._dirty: set = set()                 # (symbol, signal id) awaiting flush
+        self._pending = 0                        # outcomes since last flush
+
+        for symbol, sigs in self._store.load().items():
+            for name, s in sigs.items():
+                i = self._id(name)
+                a = self._row(symbol)
+                for f, field in enumerate(FIELDS):
+                    a[f, i] = float(s.get(field, DEFAULTS[f]))
+        atexit.register(self.flush)
+
+    # ---------- Dense storage ----------
+    def _id(self, signal: str) -> int:
+        i = self._ids.get(signal)
+        if i is None:
+            i = self._ids[signal] = len(self.signals)
+            self.signals.append(signal)
+        return i
+
+    def _row(self, symbol: str) -> np.ndarray:
+        a = self._arrays.get(symbol)
+        n = len(self.signals)
+        if a is None or a.shape[1] < n:
+            width = max(n, 8, 2 * a.shape[1] if a is not None else 0)
+            grown = np.repeat(np.asarray(DEFAULTS, dtype=float)[:, None], width, axis=1)
+            if a is not None:
+                grown[:, :a.shape[1]] = a
+            a = self._arrays[symbol] = grown
+        return a
+
+    def _node(self, symbol: str, i: int) -> dict:
+        col = self._row(symbol)[:, i].tolist()
+        node = dict(zip(FIELDS, col))
+        node["count"] = int(node["count"])
+        return node
+
+    @property
+    def state(self) -> Dict[str, Dict[str, dict]]:
+        """Nested {symbol: {signal: stats}} view (the persisted format)."""
+        return {sym: {name: self._node(sym, i) for i, name in enumerate(self.signals)}
+                for sym in self._arrays}
+
+    def _lookup_tables(self) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Regime-bias and vol-penalty vectors by signal id (rebuilt when signals are added)."""
+        n, reg, pen = self._tables
+        if n != len(self.signals):
+            n = len(self.signals)
+            reg = {r: np.array([bias.get(s, 0.0) for s in self.signals]) for r, bias in REGIME_BIAS.items()}
+            pen = np.array([VOL_PENALTY.get(s, DEFAULT_VOL_PENALTY) for s in self.signals])
+            self._tables = (n, reg, pen)
+        return reg, pen
+
+    # ---------- Learning ----------
     def register_outcome(self, symbol: str, signal: str, correct: bool) -> None:
         """
         Call this from your strategy AFTER an outcome is known.
         `correct=True` if the signal direction was right, else False.
         """
-        self._ensure(symbol, signal)
-        s = self.state[symbol][signal]
+        i = self._id(signal)
+        a = self._row(symbol)
         x = 1.0 if correct else 0.0
 
         # EWMA accuracy
-        s["ema_acc"] = (1 - self.alpha) * s["ema_acc"] + self.alpha * x
+        a[ACC, i] = (1 - self.alpha) * a[ACC, i] + self.alpha * x
 
         # EWMA pseudo-variance around the running mean (Bessel-like but EWMA)
-        diff = x - s["ema_acc"]
-        s["ema_var"] = (1 - self.beta) * s["ema_var"] + self.beta * (diff * diff)
-
-        s["count"] += 1
-        s["last_update"] = time.time()
-        _safe_dump_json(self.path, self.state)
+        diff = x - a[ACC, i]
+        a[VAR, i] = (1 - self.beta) * a[VAR, i] + self.beta * (diff * diff)
+
+        a[COUNT, i] += 1
+        a[LAST, i] = self.clock.time()
+
+        self._cache.pop(symbol, None)
+        self._dirty.add((symbol, i))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> int:
+        """Persist every pending outcome as one WAL record; returns how many nodes."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, set()
+        self._pending = 0
+        self._store.record_many([([sym, self.signals[i]], self._node(sym, i)) for sym, i in sorted(dirty)])
+        return len(dirty)
+
+    # ---------- Weights ----------
+    def vol_bucket(self, vol: float | None) -> int:
+        vol = 0.0 if vol is None else float(vol)
+        return int(round(max(0.0, min(VOL_CAP, vol)) / VOL_CAP * self.vol_buckets))
 
     def compute(
         self,
@@ -76,56 +187,38 @@ class DynamicWeighting:
     ) -> Dict[str, float]:
         """
         Returns a dict of normalized weights for the provided `signal_names`.
+        The dict is shared by later calls with the same key: treat it as read-only.
         """
-        # Hyperparams for scoring -> softmax
-        w_acc = 3.0       # influence of accuracy
-        w_stab = 2.0      # penalty from variance
-        w_reg = 1.0       # regime alignment bump
-        w_vol = 0.5       # volatility penalty if signal tends to fail in high vol
-
-        # Basic priors if unknown
-        regime = regime or "range"
-        vol = 0.0 if vol is None else float(vol)
-
-        # Simple regime preference map (you can extend per your naming)
-        # Keys must match your signal names in bayes_fusion signals
-        regime_bias = {
-            "trend": {
-                "kf_trend": +1.0, "kf_slope": +1.0, "stoch_momo": +0.5,
-                "ou_revert": -0.5, "ou_zscore": -0.4
-            },
-            "range": {
-                "ou_revert": +1.0, "ou_zscore": +0.8,
-                "kf_trend": -0.5, "kf_slope": -0.5, "stoch_momo": -0.2
-            }
-        }
-        rb = regime_bias.get(regime, {})
-
-        # Volatility aversion map (which signals struggle when vol climbs)
-        vol_penalty = {
-            "ou_revert": +1.0, "ou_zscore": +0.6,  # mean-revert worse in high vol
-            "kf_trend": 0.2, "kf_slope": 0.1, "stoch_momo": 0.3
-        }
-
-        z: Dict[str, float] = {}
-        for sig in signal_names:
-            self._ensure(symbol, sig)
-            s = self.state[symbol][sig]
-
-            acc_term  = w_acc  * (s["ema_acc"] - 0.5) * 2.0          # centered & scaled [-1,1] -> [-2,2] * w_acc
-            stab_term = -w_stab * min(1.0, max(0.0, s["ema_var"]))    # lower variance => smaller penalty
-            reg_term  = w_reg  * rb.get(sig, 0.0)
-            vol_term  = -w_vol * vol_penalty.get(sig, 0.2) * max(0.0, min(0.05, vol)) / 0.05
-            base      = s.get("base", 1.0)
-
-            score = acc_term + stab_term + reg_term + vol_term
-            # floor for exploration before softmax:
-            raw = max(self.min_weight, base * exp(score))
-            z[sig] = raw
+        key = (regime or "range", self.vol_bucket(vol), tuple(signal_names))
+        cached = self._cache.get(symbol)
+        if cached is None:
+            cached = self._cache[symbol] = {}
+        w = cached.get(key)
+        if w is None:
+            w = cached[key] = self._compute(symbol, *key)
+        return w
+
+    def _compute(self, symbol: str, regime: str, bucket: int, names: tuple) -> Dict[str, float]:
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        ids = np.fromiter((self._id(s) for s in names), dtype=np.intp, count=len(names))
+        a = self._row(symbol)
+        reg, pen = self._lookup_tables()
+        rb = reg.get(regime)
+
+        acc_term  = W_ACC * (a[ACC, ids] - 0.5) * 2.0                 # centered & scaled [-1,1] -> [-2,2] * w_acc
+        stab_term = -W_STAB * np.clip(a[VAR, ids], 0.0, 1.0)         # lower variance => smaller penalty
+        reg_term  = W_REG * rb[ids] if rb is not None else 0.0
+        vol_term  = -W_VOL * pen[ids] * (bucket / self.vol_buckets)
+
+        score = acc_term + stab_term + reg_term + vol_term
+        # floor for exploration before softmax:
+        raw = np.maximum(self.min_weight, a[BASE, ids] * np.exp(score))
 
         # Normalize
-        ssum = sum(z.values())
+        ssum = raw.sum()
         if ssum <= 0:
             # fallback to uniform
-            return {sig: 1.0 / max(1, len(signal_names)) for sig in signal_names}
-        return {sig: z[sig] / ssum for sig in signal_names}
+            return {sig: 1.0 / len(names) for sig in names}
+        return dict(zip(names, (raw / ssum).tolist()))
@@ -3,21 +3,22 @@ import logging
 from pathlib import Path
 from datetime import datetime
 
+from bot.utils.bayes_state import get_bayes_state
+from bot.utils.jsonl_tail import get_jsonl_ring
+
 class ThresholdTuner:
     def __init__(self, bayes_state_path="bayes_state.json", feedback_path="reports/feedback_log.jsonl"):
         self.bayes_state_path = Path(bayes_state_path)
         self.feedback_path = Path(feedback_path)
+        self.feedback = get_jsonl_ring(self.feedback_path)  # recent outcomes, kept current by AdaptiveFeedback
         self.base_buy = 0.555
         self.base_sell = 0.445
         self.load_bayes()
         self.logger = logging.getLogger(__name__)
 
     def load_bayes(self):
-        if self.bayes_state_path.exists():
-            with open(self.bayes_state_path, "r") as f:
-                self.bayes_state = json.load(f)
-        else:
-            self.bayes_state = {}
+        # shared, always-current in-memory view (bot/utils/bayes_state.py)
+        self.bayes_state = get_bayes_state(self.bayes_state_path).state
 
     def recent_feedback_stats(self, window=30):
         """Compute win ratio and avg confidence from recent feedback"""
@@ -25,18 +26,12 @@ class ThresholdTuner:
         if not self.feedback_path.exists():
             return 0.5, 0.0  # default neutral
 
-        with open(self.feedback_path, "r") as f:
-            lines = f.readlines()[-window:]
-            for line in lines:
-                try:
-                    rec = json.loads(line)
-                    confs.append(rec.get("confidence", 0.5))
-                    if rec.get("win", False):
-                        wins += 1
-                    else:
-                        losses += 1
-                except:
-                    continue
+        for rec in self.feedback.recent(window):
+            confs.append(rec.get("confidence", 0.5))
+            if rec.get("win", False):
+                wins += 1
+            else:
+                losses += 1
 
         total = wins + losses
         win_rate = wins / total if total > 0 else 0.5
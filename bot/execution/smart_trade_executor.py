@@ -1,15 +1,17 @@
 import MetaTrader5 as mt5
-import json, time, os
-from datetime import datetime
+import json, os
 from loguru import logger
 
+from bot.core.clock import get_clock
+
 
 class SmartTradeExecutor:
     """
     Handles trade validation, cooldown, duplicate prevention and live logging.
     """
-    def __init__(self, cooldown_sec=300, log_path="runtime/trade_log.json"):
+    def __init__(self, cooldown_sec=300, log_path="runtime/trade_log.json", clock=None):
         self.cooldown_sec = cooldown_sec
+        self.clock = clock or get_clock()
         self.last_trade_time = {}
         self.log_path = log_path
         os.makedirs(os.path.dirname(log_path), exist_ok=True)
@@ -17,7 +19,7 @@ class SmartTradeExecutor:
     # -------------------------------------------------------------------------
     def can_trade(self, symbol):
         """Return False if cooldown active or existing open trade detected."""
-        now = time.time()
+        now = self.clock.time()
         if symbol in self.last_trade_time:
             elapsed = now - self.last_trade_time[symbol]
             if elapsed < self.cooldown_sec:
@@ -35,7 +37,7 @@ class SmartTradeExecutor:
     def record_trade(self, symbol, action, volume, price, result):
         """Log every trade with timestamp and status to runtime JSON."""
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self.clock.utcnow().isoformat(),
             "symbol": symbol,
             "action": action,
             "volume": volume,
@@ -58,6 +60,6 @@ class SmartTradeExecutor:
     # -------------------------------------------------------------------------
     def update_cooldown(self, symbol):
         """Mark symbol as recently traded."""
-        self.last_trade_time[symbol] = time.time()
+        self.last_trade_time[symbol] = self.clock.time()
         logger.debug(f"⏱️ Cooldown timer reset for {symbol}")
 
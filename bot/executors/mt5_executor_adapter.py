@@ -6,6 +6,7 @@ from pathlib import Path
 from loguru import logger
 from dotenv import load_dotenv
 import MetaTrader5 as mt5
+from bot.utils.tracing import span
 
 class MT5ExecutorAdapter:
     def __init__(self):
@@ -41,7 +42,8 @@ class MT5ExecutorAdapter:
             self.connect()
         lot = lot or self.default_lot
         self.ensure_symbol()
-        tick = mt5.symbol_info_tick(self.symbol)
+        with span("mt5.symbol_info_tick"):
+            tick = mt5.symbol_info_tick(self.symbol)
         if not tick:
             logger.warning("No tick data available — possibly market closed.")
             return {"status": "market_closed"}
@@ -77,7 +79,8 @@ class MT5ExecutorAdapter:
             "type_filling": mt5.ORDER_FILLING_IOC,
         }
 
-        result = mt5.order_send(request)
+        with span("mt5.order_send"):
+            result = mt5.order_send(request)
         if result and result.retcode in (mt5.TRADE_RETCODE_DONE, mt5.TRADE_RETCODE_PLACED):
             logger.success(f"✅ Order executed → {action} {self.symbol} {lot} @ {price}")
             self._log_trade(action, lot, price, result)
@@ -108,7 +111,8 @@ class MT5ExecutorAdapter:
             "magic": self.magic,
             "comment": "XAU_Bot SLTP modify",
         }
-        res = mt5.order_send(req)
+        with span("mt5.order_send"):
+            res = mt5.order_send(req)
         ok = bool(res and res.retcode in (mt5.TRADE_RETCODE_DONE, mt5.TRADE_RETCODE_PLACED))
         if ok:
             logger.info(f"✏️  SL/TP modified | ticket={ticket} | SL={req['sl']:.2f} TP={req['tp']:.2f}")
@@ -144,7 +148,8 @@ class MT5ExecutorAdapter:
             "type_time": mt5.ORDER_TIME_GTC,
             "type_filling": mt5.ORDER_FILLING_IOC,
         }
-        res = mt5.order_send(req)
+        with span("mt5.order_send"):
+            res = mt5.order_send(req)
         ok = bool(res and res.retcode in (mt5.TRADE_RETCODE_DONE, mt5.TRADE_RETCODE_PLACED))
         if ok:
             logger.info(f"✅ Closed position ticket={ticket} | retcode={res.retcode}")
@@ -1,5 +1,6 @@
 import MetaTrader5 as mt5
 import logging
+from bot.utils.tracing import span
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -31,9 +32,9 @@ class PositionManager:
 
     # ------------------------
     def get_open_positions(self, symbol=None):
-        if symbol:
-            return [p for p in mt5.positions_get(symbol=symbol) or []]
-        return mt5.positions_get() or []
+        with span("mt5.positions_get"):
+            positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+        return list(positions or [])
 
     # ------------------------
     def close_all(self, symbol=None):
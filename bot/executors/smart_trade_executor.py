@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 
 # Live adapter we built in the last step
 from .mt5_executor_adapter import MT5ExecutorAdapter
+from bot.utils.tracing import traced
 
 # ── Optional gates: DRG / SEC ──────────────────────────────────────────────
 # We try to import your existing governors. If not available, we allow trade.
@@ -80,6 +81,7 @@ class SmartTradeExecutor:
         return round(float(lot), 2)
     # ────────────────────────────────────────────────────────────────────────
 
+    @traced("exec.execute")
     def execute(self, ctx: ExecContext) -> Dict[str, Any]:
         """
         Main entry from Scheduler.
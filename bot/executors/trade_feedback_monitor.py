@@ -1,28 +1,47 @@
 # D:\XAU_Bot\bot\executors\trade_feedback_monitor.py
 from __future__ import annotations
 import MetaTrader5 as mt5
-from datetime import datetime, timedelta
+from datetime import timedelta
 from loguru import logger
 from bot.engines.adaptive_feedback import AdaptiveFeedback
+from bot.core.clock import get_clock
+from bot.utils.tracing import span, traced
 
 class TradeFeedbackMonitor:
     """
     Polls MT5 closed deals and pushes outcomes into AdaptiveFeedback.
     Maintains last-check timestamp to avoid duplicates.
+    With a confidence_engine, the same deals also resolve its pending decisions in bulk.
     """
-    def __init__(self, feedback_engine: AdaptiveFeedback, symbol: str):
+    def __init__(self, feedback_engine: AdaptiveFeedback, symbol: str, clock=None, confidence_engine=None):
         self.feedback_engine = feedback_engine
+        self.confidence_engine = confidence_engine
         self.symbol = symbol
-        self.last_check = datetime.utcnow() - timedelta(minutes=5)
+        self.clock = clock or get_clock()
+        self.last_check = self.clock.utcnow() - timedelta(minutes=5)
 
+    @staticmethod
+    def _opened_volume(position_id: int):
+        """Lots opened on a position (its full deal history), for partial-close accounting."""
+        with span("mt5.history_deals_get"):
+            history = mt5.history_deals_get(position=position_id) or ()
+        return sum(float(d.volume) for d in history if getattr(d, "entry", None) == 0) or None
+
+    @traced("feedback.poll_closed_trades")
     def poll_closed_trades(self):
-        now = datetime.utcnow()
+        now = self.clock.utcnow()
         # fetch recent history since last check
-        deals = mt5.history_deals_get(self.last_check, now)
+        with span("mt5.history_deals_get"):
+            deals = mt5.history_deals_get(self.last_check, now)
         self.last_check = now
         if not deals:
             return
 
+        if self.confidence_engine is not None:
+            n = self.confidence_engine.update_outcomes_from_deals(deals, self._opened_volume)
+            if n:
+                logger.info(f"🎯 Resolved {n} pending Bayesian decisions from closed deals")
+
         for d in deals:
             if getattr(d, "symbol", "") != self.symbol:
                 continue
@@ -1,12 +1,15 @@
 # D:\XAU_Bot\bot\models\bayes_confidence.py
 from __future__ import annotations
-import json
 import math
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from bot.utils.prob import logit, sigmoid, clip01
+from bot.models.pending_decisions import PendingDecisionIndex
+from bot.utils.bayes_state import get_bayes_state
 
 # ---------------------------
 # Design
@@ -26,14 +29,50 @@ from bot.utils.prob import logit, sigmoid, clip01
 #
 # Online learning:
 #  - After placing a trade, call register_decision(...) to store the evidence.
-#  - When the trade closes, call update_outcome(..., realized_pnl) to update Betas.
+#  - When the trade closes, call update_outcome(..., realized_pnl) to update Betas,
+#    or hand closed MT5 deals to update_outcomes_from_deals(deals).
+#  - Pending decisions live in <state>.pending.json (TTL + size bounded, survives restarts).
 #
 # State is persisted in D:\XAU_Bot\bot\state\bayes_state.json
+#
+# Batch API (backtests / threshold sweeps):
+#  - build_evidence_arrays(...) → presence (bars × signals, +1/−1/0) and strength
+#  - compute_confidence_batch(symbol, direction, presence, strength, signals)
+# The log-odds are accumulated signal by signal in the scalar order, and tanh /
+# sigmoid go through math (NumPy's SIMD exp/tanh differ from libm in the last
+# ulp), so exact=True reproduces the scalar path bit for bit.
 
 DEFAULT_ALPHA = 50.0   # strong but not rigid priors; adjust in config if needed
 DEFAULT_BETA  = 50.0
 DEFAULT_SIGNALS = ("kf_trend", "ou_revert", "stoch_momo")
 
+# presence codes for the batch API
+SUPPORT, IGNORE, CONTRADICT = 1, 0, -1
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def _map_math(fn, x: np.ndarray) -> np.ndarray:
+    """Elementwise math/libm function (bit-identical to the scalar path)."""
+    return np.fromiter(map(fn, x.ravel().tolist()), dtype=np.float64, count=x.size).reshape(x.shape)
+
+
+def _buy_mask(direction) -> np.ndarray:
+    """True where direction is buy; accepts one string or an array of them."""
+    d = np.asarray(direction)
+    if d.ndim == 0:
+        d = str(d).lower()
+        assert d in ("buy", "sell")
+        return np.bool_(d == "buy")
+    buy = (d == "buy") | (d == "BUY") | (d == "Buy")
+    assert (buy | (d == "sell") | (d == "SELL") | (d == "Sell")).all()
+    return buy
+
+
+def _np_sigmoid(x: np.ndarray) -> np.ndarray:
+    z = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1.0 / (1.0 + z), z / (1.0 + z))
+
 @dataclass
 class SignalEvidence:
     present: Optional[bool]   # True supports, False contradicts, None = ignore
@@ -46,7 +85,9 @@ class BayesianConfidenceEngine:
                  default_beta: float = DEFAULT_BETA,
                  signals: Tuple[str, ...] = DEFAULT_SIGNALS,
                  base_prior_alpha: float = DEFAULT_ALPHA,
-                 base_prior_beta: float = DEFAULT_BETA):
+                 base_prior_beta: float = DEFAULT_BETA,
+                 pending_ttl_s: float = 7 * 86400,
+                 max_pending: int = 10_000):
         self.state_path = state_path
         self.default_alpha = float(default_alpha)
         self.default_beta  = float(default_beta)
@@ -55,32 +96,34 @@ class BayesianConfidenceEngine:
         self.base_prior_beta  = float(base_prior_beta)
 
         self.state: Dict[str, dict] = {}  # per-symbol
-        self.decisions: Dict[str, dict] = {}  # pending outcomes by trade_id
         self._load()
+        # pending outcomes by trade_id / MT5 ticket
+        pending_path = Path(state_path).with_name(Path(state_path).stem + ".pending.json")
+        self.decisions = PendingDecisionIndex(pending_path, ttl_seconds=pending_ttl_s, max_size=max_pending)
 
     # ---------- Persistence ----------
     def _load(self):
-        try:
-            if self.state_path.exists():
-                self.state = json.loads(self.state_path.read_text(encoding="utf-8"))
-            else:
-                self.state = {}
-        except Exception:
-            self.state = {}
-
-    def _save(self):
-        self.state_path.parent.mkdir(parents=True, exist_ok=True)
-        self.state_path.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        # shared in-memory state for this file (see bot/utils/bayes_state.py)
+        self._svc = get_bayes_state(self.state_path)
+        self.state = self._svc.state
+
+    def _save(self, symbol: Optional[str] = None):
+        """Mark the symbol for the next coalesced flush; no symbol → full snapshot."""
+        if symbol is None:
+            self._svc.save_all()
+        else:
+            self._svc.mark_dirty(symbol)
 
     def _ensure_symbol(self, symbol: str):
-        if symbol not in self.state:
-            self.state[symbol] = {
-                "prior": {"a": self.base_prior_alpha, "b": self.base_prior_beta},
-                "signals": {
-                    s: {"a": self.default_alpha, "b": self.default_beta}
-                    for s in self.signals
-                }
-            }
+        # fill in whatever is missing: other owners of the shared state may have
+        # created the node with only their own keys (e.g. flat "a"/"b")
+        node = self.state.setdefault(symbol, {})
+        if "prior" not in node:
+            node["prior"] = {"a": self.base_prior_alpha, "b": self.base_prior_beta}
+        signals = node.setdefault("signals", {})
+        for s in self.signals:
+            if s not in signals:
+                signals[s] = {"a": self.default_alpha, "b": self.default_beta}
 
     # ---------- Read helpers ----------
     @staticmethod
@@ -88,8 +131,8 @@ class BayesianConfidenceEngine:
         return a / max(a + b, 1e-12)
 
     def _signal_p(self, symbol: str, sig: str) -> float:
-        a = float(self.state[symbol]["signals"][sig]["a"])
-        b = float(self.state[symbol]["signals"][sig]["b"])
+        # decayed / drift-flattened view shared with BayesianMemory
+        a, b = self._svc.beta(symbol, self.state[symbol]["signals"][sig])
         return clip01(self._beta_mean(a, b))
 
     def _prior_p(self, symbol: str) -> float:
@@ -140,6 +183,51 @@ class BayesianConfidenceEngine:
             "prior": float(prior),
         }
 
+    def compute_confidence_batch(self,
+                                 symbol: str,
+                                 direction: Union[str, ArrayLike],
+                                 presence: np.ndarray,
+                                 strength: np.ndarray,
+                                 signals: Sequence[str] = DEFAULT_SIGNALS,
+                                 exact: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Vectorized compute_confidence over many bars.
+
+        presence: (bars × signals) codes SUPPORT / CONTRADICT / IGNORE
+        strength: (bars × signals) floats
+        signals:  column names, in the order the scalar evidence dict would list them
+        exact=False uses NumPy's sigmoid (≤1 ulp off, a few times faster).
+
+        Returns arrays confidence, log_odds, prior (one entry per bar).
+        """
+        _buy_mask(direction)
+
+        presence = np.atleast_2d(np.asarray(presence))
+        strength = np.atleast_2d(np.asarray(strength, dtype=np.float64))
+        n, k = presence.shape
+        if strength.shape != (n, k) or len(signals) != k:
+            raise ValueError("presence, strength and signals must agree in shape")
+
+        self._ensure_symbol(symbol)
+        prior = self._prior_p(symbol)
+        log_odds = np.full(n, logit(prior))
+        for j, sig_name in enumerate(signals):
+            if sig_name not in self.state[symbol]["signals"]:
+                self.state[symbol]["signals"][sig_name] = {"a": self.default_alpha, "b": self.default_beta}
+            p_sig = self._signal_p(symbol, sig_name)
+            lr = math.log(p_sig / (1.0 - p_sig + 1e-12) + 1e-12)
+            col = presence[:, j]
+            contribution = np.where(col == SUPPORT, strength[:, j] * lr,
+                                    np.where(col == CONTRADICT, strength[:, j] * (-lr), 0.0))
+            log_odds += contribution
+
+        confidence = _map_math(sigmoid, log_odds) if exact else _np_sigmoid(log_odds)
+        return {
+            "confidence": confidence,
+            "log_odds": log_odds,
+            "prior": np.full(n, float(prior)),
+        }
+
     # ---------- Decision tracking / online updates ----------
     def register_decision(self,
                           trade_id: str,
@@ -169,9 +257,25 @@ class BayesianConfidenceEngine:
 
         dec = self.decisions.pop(trade_id)
         symbol = dec["symbol"]
-        self._ensure_symbol(symbol)
+        with self._svc.lock(symbol):
+            self._apply_outcome(symbol, dec, realized_pnl > 0.0)
 
-        success = realized_pnl > 0.0
+        # Persist
+        self._save(symbol)
+
+    def update_outcomes_from_deals(self, deals, opened_volume=None) -> int:
+        """
+        Resolve every pending decision whose position `deals` (MT5 TradeDeal-like)
+        finished closing; partial closes are kept until the rest arrives.
+        opened_volume(position_id) → lots, for positions whose opening deal was not seen.
+        """
+        matched = self.decisions.match_deals(deals, opened_volume)
+        for trade_id, pnl in matched:
+            self.update_outcome(trade_id, pnl)
+        return len(matched)
+
+    def _apply_outcome(self, symbol: str, dec: dict, success: bool):
+        self._ensure_symbol(symbol)
         sym_state = self.state[symbol]
 
         # Update prior first
@@ -190,7 +294,7 @@ class BayesianConfidenceEngine:
             if sig_name not in sym_state["signals"]:
                 sym_state["signals"][sig_name] = {"a": self.default_alpha, "b": self.default_beta}
 
-            rec = sym_state["signals"][sig_name]
+            rec = self._svc.materialize(symbol, sym_state["signals"][sig_name])
             if present is True:
                 # If signal supported the trade, reward a on success, b on failure
                 if success:
@@ -204,9 +308,6 @@ class BayesianConfidenceEngine:
                 else:
                     rec["a"] = float(rec["a"]) + strength
 
-        # Persist
-        self._save()
-
     # ---------- Utility: build evidence from raw features ----------
     @staticmethod
     def build_evidence_from_features(direction: str,
@@ -272,6 +373,63 @@ class BayesianConfidenceEngine:
 
         return ev
 
+    @staticmethod
+    def build_evidence_arrays(direction: Union[str, ArrayLike],
+                              kf_slope: Optional[ArrayLike] = None,
+                              kf_slope_scale: float = 5.0,
+                              ou_zscore: Optional[ArrayLike] = None,
+                              ou_entry_z: float = 1.0,
+                              stoch_fast: Optional[ArrayLike] = None,
+                              stoch_slow: Optional[ArrayLike] = None,
+                              exact: bool = True) -> Tuple[np.ndarray, np.ndarray, Tuple[str, ...]]:
+        """
+        Vectorized build_evidence_from_features.
+
+        Feature arguments are arrays (NaN = missing, like None in the scalar
+        version) or None for a missing column; direction is one string or one
+        per bar. Returns (presence int8, strength float64, signal names) ready
+        for compute_confidence_batch.
+        """
+        cols = [np.asarray(c, dtype=np.float64) for c in (kf_slope, ou_zscore, stoch_fast, stoch_slow)
+                if c is not None]
+        is_buy = _buy_mask(direction)
+        n = max([is_buy.size] + [c.size for c in cols])
+        buy = np.broadcast_to(is_buy, (n,))
+        sell = ~buy
+
+        def column(x):
+            return np.full(n, np.nan) if x is None else np.broadcast_to(np.asarray(x, dtype=np.float64), (n,))
+
+        presence = np.zeros((n, 3), dtype=np.int8)
+        strength = np.zeros((n, 3), dtype=np.float64)
+        tanh = (lambda v: _map_math(math.tanh, v)) if exact else np.tanh
+
+        # Kalman trend
+        slope = column(kf_slope)
+        ok = ~np.isnan(slope)
+        agree = ((slope > 0) & buy) | ((slope < 0) & sell)
+        presence[:, 0] = np.where(ok, np.where(agree, SUPPORT, CONTRADICT), IGNORE)
+        strength[ok, 0] = tanh(np.abs(slope[ok]) / max(kf_slope_scale, 1e-6))
+
+        # OU mean reversion
+        z = column(ou_zscore)
+        ok = ~np.isnan(z)
+        support_buy = z <= -abs(ou_entry_z)
+        support_sell = z >= abs(ou_entry_z)
+        supports = (buy & support_buy) | (sell & support_sell)
+        contradicts = (buy & support_sell) | (sell & support_buy)
+        presence[:, 1] = np.where(ok & supports, SUPPORT, np.where(ok & contradicts, CONTRADICT, IGNORE))
+        strength[ok, 1] = np.minimum(np.abs(z[ok]) / 3.0, 1.0)
+
+        # Stochastic momentum
+        fast, slow = column(stoch_fast), column(stoch_slow)
+        ok = ~(np.isnan(fast) | np.isnan(slow))
+        agree = ((fast > slow) & buy) | ((fast < slow) & sell)
+        presence[:, 2] = np.where(ok, np.where(agree, SUPPORT, CONTRADICT), IGNORE)
+        strength[ok, 2] = np.minimum(np.abs(fast[ok] - slow[ok]) / 20.0, 1.0)
+
+        return presence, strength, DEFAULT_SIGNALS
+
 
 # -------- Convenience factory --------
 _engine_singleton: Optional[BayesianConfidenceEngine] = None
@@ -292,6 +450,8 @@ def get_bayes_engine(config: dict) -> BayesianConfidenceEngine:
     bayes_cfg = config.get("bayes", {})
     _engine_singleton = BayesianConfidenceEngine(
         state_path=state_path,
+        pending_ttl_s=float(bayes_cfg.get("pending_ttl_hours", 7 * 24)) * 3600,
+        max_pending=int(bayes_cfg.get("max_pending", 10_000)),
         default_alpha=float(bayes_cfg.get("signal_alpha", DEFAULT_ALPHA)),
         default_beta=float(bayes_cfg.get("signal_beta", DEFAULT_BETA)),
         signals=tuple(bayes_cfg.get("signals", list(DEFAULT_SIGNALS))),
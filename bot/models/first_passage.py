@@ -0,0 +1,226 @@
+"""
+XAU_Bot — First-Passage SL/TP Engine
+
+File: bot/models/first_passage.py
+
+Purpose
+-------
+Estimate, before an order is sent, how the execution brackets from
+config.yaml are likely to resolve:
+
+    P(TP before stop), P(stop), P(still open at horizon),
+    expected bars to exit and expected R-multiple (R = initial SL distance).
+
+Brackets (execution section)
+  sl_atr          initial SL = entry ∓ sl_atr·ATR
+  tp_atr          TP         = entry ± tp_atr·ATR
+  be_trigger_atr  once the best excursion reaches be_trigger_atr·ATR the
+  be_offset_pts   stop moves to entry ± be_offset_pts·point …
+  trail_atr       … and then trails the best price by trail_atr·ATR
+
+Paths come from GBMSimulator (log-normal) or a fitted OUModel (exact OU
+transition). Between two simulated points a Brownian bridge gives the chance
+that the continuous path touched a barrier unnoticed:
+
+    p = exp(−2·d0·d1 / v)     d = distance to the barrier (log for GBM), v = step variance
+
+Instead of sampling those crossings, each path carries a survival weight and
+exits are accumulated as expectations, so coarse steps (e.g. 4 bars) stay
+accurate and the estimates are smooth in entry/ATR. Break-even and trailing
+stops are moved at step close, like an EA managing positions on updates, so
+bars_per_step > 1 is exact only for the fixed SL/TP part.
+
+Normals are drawn once per n_steps (antithetic pairs) and reused: candidates
+are compared on common random numbers and a call costs ~3 ms for
+1024 paths × 48 steps on one core.
+"""
+
+from __future__ import annotations
+import math
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from bot.models.ou_model import OUModel
+from bot.models.stochastic import GBMSimulator
+
+
+@dataclass
+class Brackets:
+    sl_atr: float = 2.0
+    tp_atr: float = 3.0
+    be_trigger_atr: float = 1.0
+    be_offset_pts: float = 50.0
+    trail_atr: float = 0.5
+    point: float = 0.01
+
+    @classmethod
+    def from_config(cls, cfg: dict, point: float = 0.01) -> "Brackets":
+        ex = (cfg or {}).get("execution", {}) or {}
+        d = cls(point=point)
+        return cls(
+            sl_atr=float(ex.get("sl_atr", d.sl_atr)),
+            tp_atr=float(ex.get("tp_atr", d.tp_atr)),
+            be_trigger_atr=float(ex.get("be_trigger_atr", d.be_trigger_atr)),
+            be_offset_pts=float(ex.get("be_offset_pts", d.be_offset_pts)),
+            trail_atr=float(ex.get("trail_atr", d.trail_atr) or 0.0),
+            point=point,
+        )
+
+
+@dataclass
+class BarrierOutcome:
+    p_tp: float          # TP reached first
+    p_stop: float        # any stop exit (initial SL, break-even or trailing)
+    p_loss_stop: float   # stop exits with R < 0 (initial SL before BE)
+    p_open: float        # neither by the horizon (marked to market)
+    exp_bars: float      # expected bars to exit (horizon for open paths)
+    exp_r: float         # expected R-multiple
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class FirstPassageEngine:
+    """Vectorized bracket-outcome estimator with Brownian-bridge correction."""
+
+    def __init__(self, brackets: Optional[Brackets] = None, n_paths: int = 1024, seed: int = 0):
+        self.brackets = brackets or Brackets()
+        self.n_paths = int(n_paths) + int(n_paths) % 2
+        self.seed = seed
+        self._z: Dict[int, np.ndarray] = {}
+
+    # -----------------------------------------------------------------
+    def _normals(self, n_steps: int) -> np.ndarray:
+        z = self._z.get(n_steps)
+        if z is None:
+            half = np.random.default_rng(self.seed).standard_normal((self.n_paths // 2, n_steps))
+            z = self._z[n_steps] = np.concatenate((half, -half))
+        return z
+
+    @staticmethod
+    def _check_atr(atr: float) -> None:
+        # R is measured in SL distance (sl_atr·ATR): zero/NaN ATR has no scale
+        if not atr > 0.0:
+            raise ValueError(f"atr must be positive, got {atr!r}")
+
+    @staticmethod
+    def _steps(horizon_bars: int, bars_per_step: int) -> Tuple[int, float]:
+        n = -(-int(horizon_bars) // int(bars_per_step))
+        return n, float(bars_per_step)
+
+    # -----------------------------------------------------------------
+    def gbm(self, sim: GBMSimulator, entry: float, atr: float, side: str = "BUY",
+            horizon_bars: int = 48, bars_per_step: int = 1) -> BarrierOutcome:
+        """Outcome under GBM; sim.dt is the length of one bar in years."""
+        self._check_atr(atr)
+        n, k = self._steps(horizon_bars, bars_per_step)
+        drift = (sim.mu_annual - 0.5 * sim.sigma_annual ** 2) * sim.dt * k
+        var = sim.sigma_annual ** 2 * sim.dt * k
+        y = np.empty((self.n_paths, n + 1))
+        y[:, 0] = 0.0
+        np.multiply(self._normals(n), math.sqrt(var), out=y[:, 1:])
+        y[:, 1:] += drift
+        np.cumsum(y[:, 1:], axis=1, out=y[:, 1:])
+        # y = log(S / entry); barriers are compared in price, bridged in log space
+        f = np.expm1(y)
+        f *= entry * (1.0 if side.upper() == "BUY" else -1.0)
+        return self._evaluate(f, y, entry, atr, side, var, bars_per_step=k)
+
+    def ou(self, model: OUModel, entry: float, atr: float, side: str = "BUY",
+           horizon_bars: int = 48, bars_per_step: int = 1) -> BarrierOutcome:
+        """Outcome under a fitted OU model (one model time unit = one bar)."""
+        self._check_atr(atr)
+        n, k = self._steps(horizon_bars, bars_per_step)
+        phi, s = model.transition(k)
+        mu = model.params.mu
+        x = np.empty((self.n_paths, n + 1))
+        x[:, 0] = entry - mu
+        np.multiply(self._normals(n), s, out=x[:, 1:])
+        for t in range(1, n + 1):
+            x[:, t] += phi * x[:, t - 1]
+        x += mu - entry
+        if side.upper() != "BUY":
+            x *= -1.0
+        # the bridge uses the step variance of the transition, not σ²·dt
+        return self._evaluate(x, None, entry, atr, side, s * s, bars_per_step=k)
+
+    # -----------------------------------------------------------------
+    def _evaluate(self, f: np.ndarray, y: Optional[np.ndarray], entry: float, atr: float,
+                  side: str, var: float, bars_per_step: float) -> BarrierOutcome:
+        """f: favourable excursion ±(price − entry), shape (paths, steps+1).
+        y: log(price / entry) for GBM (bridge in log space), None for OU."""
+        b = self.brackets
+        sgn = 1.0 if side.upper() == "BUY" else -1.0
+        sl_d, tp_d = b.sl_atr * atr, b.tp_atr * atr
+        be_d, trail_d = b.be_trigger_atr * atr, b.trail_atr * atr
+        be_off = b.be_offset_pts * b.point
+        n = f.shape[1] - 1
+
+        # the stop for step t uses the best excursion up to t−1
+        best = np.maximum.accumulate(f[:, :-1], axis=1)
+        armed = best >= be_d
+        stop_f = np.full_like(best, -sl_d)
+        if trail_d > 0:
+            np.copyto(stop_f, np.maximum(be_off, best - trail_d), where=armed)
+        else:
+            stop_f[armed] = be_off
+
+        f0, f1 = f[:, :-1], f[:, 1:]
+        sl_hit = f1 <= stop_f
+        tp_hit = f1 >= tp_d
+
+        # bridge crossing probabilities for steps that end inside the bracket
+        def bridge(level_f):
+            if y is not None:
+                lvl = np.log1p(np.multiply(level_f, sgn / entry))
+                d = (y[:, :-1] - lvl) * (y[:, 1:] - lvl)
+            else:
+                d = (f0 - level_f) * (f1 - level_f)
+            np.maximum(d, 0.0, out=d)
+            d *= -2.0 / var
+            return np.exp(d, out=d)
+
+        a_sl = bridge(stop_f)
+        a_sl[sl_hit] = 1.0
+        a_tp = bridge(tp_d)
+        a_tp[tp_hit] = 1.0
+        a_tp *= 1.0 - a_sl
+
+        # survival weight entering each step: Π (1 − exit probability) over earlier steps
+        alive = np.empty_like(a_sl)
+        alive[:, 0] = 1.0
+        np.subtract(1.0, a_sl[:, :-1], out=alive[:, 1:])
+        alive[:, 1:] -= a_tp[:, :-1]
+        np.cumprod(alive[:, 1:], axis=1, out=alive[:, 1:])
+        w_sl = alive * a_sl
+
+        m = len(f)
+        p_tp = np.vdot(alive, a_tp) / m
+        p_stop = w_sl.sum() / m
+        open_w = alive[:, -1] * (1.0 - a_sl[:, -1] - a_tp[:, -1])
+        p_open = open_w.sum() / m
+        # stops exit at their level, open paths are marked to market at the horizon
+        exp_r = (p_tp * tp_d + (np.vdot(w_sl, stop_f) + np.vdot(open_w, f[:, -1])) / m) / sl_d
+        # Σ exits·(t − ½) + open·n  ==  Σ alive − ½(1 − p_open), in steps
+        exp_bars = bars_per_step * (alive.sum() / m - 0.5 * (1.0 - p_open))
+        return BarrierOutcome(
+            p_tp=float(p_tp), p_stop=float(p_stop),
+            p_loss_stop=float(w_sl.sum(where=~armed) / m), p_open=float(p_open),
+            exp_bars=float(exp_bars), exp_r=float(exp_r),
+        )
+
+
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    import time
+    from bot.utils.config_loader import load_config
+
+    eng = FirstPassageEngine(Brackets.from_config(load_config()))
+    sim = GBMSimulator(mu_annual=0.0, sigma_annual=0.18, dt=5 / (252 * 24 * 60))
+    eng.gbm(sim, 2400.0, 3.0, "BUY")
+    t0 = time.perf_counter()
+    for _ in range(100):
+        out = eng.gbm(sim, 2400.0, 3.0, "BUY", horizon_bars=48)
+    print(out, f"{(time.perf_counter() - t0) * 10:.2f} ms/call")
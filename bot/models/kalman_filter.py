@@ -21,9 +21,13 @@ Q = diag(q_level, q_trend); R = r_obs
 """
 
 from __future__ import annotations
+import copy
+import json
+import os
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+from pathlib import Path
 from typing import Optional, Tuple, Dict
 
 
@@ -36,6 +40,36 @@ class KFParams:
     r_obs: float = 1e-2     # observation noise
 
 
+# ---------------------------------------------------------------------
+def _kf_step(y, x0, x1, p00, p01, p11, qL, qT, r):
+    """
+    One predict + update of the level/trend model with the 2x2 algebra
+    written out (P is symmetric, so only p00, p01, p11 are carried).
+    Works on Python floats or on aligned NumPy arrays (one lane per
+    parameter set), which is what auto_tune uses.
+
+    Returns (x0, x1, p00, p01, p11, innov, innov_var, k0, k1).
+    """
+    # Predict: x = F x, P = F P F^T + Q
+    xp0 = x0 + x1
+    pp00 = p00 + 2.0 * p01 + p11 + qL
+    pp01 = p01 + p11
+    pp11 = p11 + qT
+
+    # Innovation and gain: S = H P H^T + R, K = P H^T / S
+    s = pp00 + r
+    k0 = pp00 / s
+    k1 = pp01 / s
+    e = y - xp0
+
+    # Update: x = x + K e, P = (I - K H) P
+    return (
+        xp0 + k0 * e, x1 + k1 * e,
+        pp00 - k0 * pp00, pp01 - k0 * pp01, pp11 - k1 * pp01,
+        e, s, k0, k1,
+    )
+
+
 # ---------------------------------------------------------------------
 class KalmanTrend:
     """
@@ -47,107 +81,171 @@ class KalmanTrend:
       - Produce 1-step forecasts and signals.
     """
 
-    def __init__(self, params: KFParams | None = None):
+    OUTPUTS = ["filtered", "trend", "forecast_1", "innov", "innov_var", "k_gain_level", "k_gain_trend"]
+
+    def __init__(self, params: KFParams | None = None, state_path: str | Path | None = None):
         self.params = params or KFParams()
         self.F = np.array([[1.0, 1.0],
                            [0.0, 1.0]], dtype=float)
         self.H = np.array([[1.0, 0.0]], dtype=float)
+        self.state_path = Path(state_path) if state_path else None
+        self.reset()
+        if self.state_path and self.state_path.exists():
+            self.load_state()
 
     # -----------------------------------------------------------------
-    def _filter_core(self, y: np.ndarray) -> Dict[str, np.ndarray]:
-        n = len(y)
-        F, H = self.F, self.H
-        qL, qT, r = self.params.q_level, self.params.q_trend, self.params.r_obs
-        Q = np.array([[qL, 0.0], [0.0, qT]], dtype=float)
-        R = np.array([[r]], dtype=float)
-
-        # Allocate storage
-        x_pred = np.zeros((n, 2))
-        P_pred = np.zeros((n, 2, 2))
-        x_filt = np.zeros((n, 2))
-        P_filt = np.zeros((n, 2, 2))
-        K_gain = np.zeros((n, 2, 1))
-        innov = np.zeros((n, 1))
-        innov_var = np.zeros((n, 1))
-
-        # Initialize
-        x_filt[0] = np.array([y[0], 0.0])
-        P_filt[0] = np.eye(2) * 1.0
-
-        for t in range(1, n):
-            # Predict
-            x_pred[t] = F @ x_filt[t - 1]
-            P_pred[t] = F @ P_filt[t - 1] @ F.T + Q
-
-            # Innovation
-            y_pred = (H @ x_pred[t].reshape(2, 1))[0, 0]
-            e_t = y[t] - y_pred
-            S_t = (H @ P_pred[t] @ H.T + R)[0, 0]
-
-            # Kalman gain
-            K_t = (P_pred[t] @ H.T) / S_t  # shape (2,1)
-
-            # Update
-            x_filt[t] = x_pred[t] + (K_t.flatten() * e_t)
-            P_filt[t] = (np.eye(2) - K_t @ H) @ P_pred[t]
-
-            # Save values
-            K_gain[t] = K_t
-            innov[t] = e_t
-            innov_var[t] = S_t
-
+    # Streaming API
+    def reset(self):
+        """Forget the filter state (x, P); params are kept."""
+        self.x = (0.0, 0.0)              # level, trend
+        self.P = (1.0, 0.0, 1.0)         # p00, p01, p11 (symmetric)
+        self.n = 0
+
+    def update(self, price: float) -> Dict[str, float]:
+        """
+        Consume one price in O(1) and return the same fields as a filter() row.
+        The first price seeds the state (level = price, trend = 0, P = I).
+        """
+        y = float(price)
+        if self.n == 0:
+            self.x, self.P = (y, 0.0), (1.0, 0.0, 1.0)
+            e = s = k0 = k1 = 0.0
+        else:
+            p = self.params
+            x0, x1, p00, p01, p11, e, s, k0, k1 = _kf_step(
+                y, self.x[0], self.x[1], *self.P, p.q_level, p.q_trend, p.r_obs)
+            self.x, self.P = (x0, x1), (p00, p01, p11)
+        self.n += 1
         return {
-            "x_pred": x_pred,
-            "P_pred": P_pred,
-            "x_filt": x_filt,
-            "P_filt": P_filt,
-            "K_gain": K_gain,
-            "innov": innov,
-            "innov_var": innov_var,
+            "filtered": self.x[0],
+            "trend": self.x[1],
+            "forecast_1": self.x[0] + self.x[1],
+            "innov": e,
+            "innov_var": s,
+            "k_gain_level": k0,
+            "k_gain_trend": k1,
         }
 
+    def get_state(self) -> dict:
+        return {"x": list(self.x), "P": list(self.P), "n": self.n, "params": asdict(self.params)}
+
+    def set_state(self, state: dict):
+        self.x = tuple(float(v) for v in state["x"])
+        self.P = tuple(float(v) for v in state["P"])
+        self.n = int(state.get("n", 1))
+        if "params" in state:
+            self.params = KFParams(**state["params"])
+
+    def save_state(self, path: str | Path | None = None):
+        """Snapshot (x, P, params) as JSON; written to a temp file then renamed."""
+        path = Path(path or self.state_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.get_state(), f, indent=2)
+        os.replace(tmp, path)
+
+    def load_state(self, path: str | Path | None = None):
+        with open(path or self.state_path, "r", encoding="utf-8") as f:
+            self.set_state(json.load(f))
+
     # -----------------------------------------------------------------
     def filter(self, prices: pd.Series) -> pd.DataFrame:
+        """
+        Reset and replay `prices` through update(); the streaming state ends at
+        the last price. The filtered x/P path is cached for smooth().
+        """
         y = pd.Series(prices).dropna().astype(float).values
-        res = self._filter_core(y)
-
-        level = res["x_filt"][:, 0]
-        trend = res["x_filt"][:, 1]
-        forecast = (self.H @ (self.F @ res["x_filt"].T)).flatten()
-
-        df = pd.DataFrame({
-            "filtered": level,
-            "trend": trend,
-            "forecast_1": forecast,
-            "innov": res["innov"].flatten(),
-            "innov_var": res["innov_var"].flatten(),
-            "k_gain_level": res["K_gain"][:, 0, 0],
-            "k_gain_trend": res["K_gain"][:, 1, 0],
-        }, index=pd.RangeIndex(len(y)))
-        return df
+        n = len(y)
+        self.reset()
+        out = {c: np.empty(n) for c in self.OUTPUTS}
+        fwd = np.empty((5, n))       # x0, x1, p00, p01, p11 after each step
+        for i, price in enumerate(y.tolist()):
+            row = self.update(price)
+            for c in self.OUTPUTS:
+                out[c][i] = row[c]
+            fwd[0, i], fwd[1, i] = self.x
+            fwd[2, i], fwd[3, i], fwd[4, i] = self.P
+        self._fwd = (y, asdict(self.params), fwd)
+        return pd.DataFrame(out, index=pd.RangeIndex(n))
+
+    def _forward(self, y: np.ndarray) -> np.ndarray:
+        """
+        Filtered x/P path for y, reused when filter() already ran on the same
+        prices and params; otherwise replayed on a scratch copy so the
+        streaming state is left alone.
+        """
+        cached = getattr(self, "_fwd", None)
+        if cached is None or cached[1] != asdict(self.params) or not np.array_equal(cached[0], y):
+            scratch = copy.copy(self)
+            scratch.filter(y)
+            self._fwd = scratch._fwd
+        return self._fwd[2]
 
     # -----------------------------------------------------------------
     def smooth(self, prices: pd.Series) -> pd.DataFrame:
-        """Backward pass smoother (Rauch–Tung–Striebel)."""
+        """
+        Backward pass smoother (Rauch–Tung–Striebel). Unlike filter(), it does
+        not touch the streaming state (x, P, n).
+
+        With P_f = [[a, b], [b, c]] the predicted covariance is
+        P_p = F P_f F^T + Q = [[d, e], [e, f]], and the smoother gain
+        C = P_f F^T P_p^-1 uses the closed-form 2x2 inverse. The gains do not
+        depend on the prices, so they are computed for all t at once into a
+        preallocated workspace; only the 2-state backward recursion is a loop.
+        """
         y = pd.Series(prices).dropna().astype(float).values
-        res = self._filter_core(y)
-        x_filt, P_filt = res["x_filt"], res["P_filt"]
-        x_pred, P_pred = res["x_pred"], res["P_pred"]
         n = len(y)
-
-        x_smooth = np.zeros_like(x_filt)
-        P_smooth = np.zeros_like(P_filt)
-        x_smooth[-1] = x_filt[-1]
-        P_smooth[-1] = P_filt[-1]
-
-        for t in range(n - 2, -1, -1):
-            C_t = P_filt[t] @ self.F.T @ np.linalg.pinv(P_pred[t + 1])
-            x_smooth[t] = x_filt[t] + C_t @ (x_smooth[t + 1] - x_pred[t + 1])
-            P_smooth[t] = P_filt[t] + C_t @ (P_smooth[t + 1] - P_pred[t + 1]) @ C_t.T
+        fwd = self._forward(y)
+        x0, x1, a, b, c = fwd
+        qL, qT = self.params.q_level, self.params.q_trend
+
+        ws = np.empty((8, n))
+        d, e, f, det, c00, c01, c10, c11 = ws
+        # predicted covariance for t+1 from the filtered covariance at t
+        np.add(a, c, out=d)
+        d += b
+        d += b
+        d += qL
+        np.add(b, c, out=e)
+        np.add(c, qT, out=f)
+        np.multiply(d, f, out=det)
+        np.multiply(e, e, out=c11)
+        det -= c11
+        # C = [[a+b, b], [b+c, c]] @ [[f, -e], [-e, d]] / det   (b+c == e)
+        np.add(a, b, out=c10)                      # c10 holds a+b for now
+        np.multiply(c10, f, out=c00)
+        np.multiply(c10, e, out=c01)
+        np.multiply(b, e, out=c10)
+        c00 -= c10
+        np.multiply(b, d, out=c10)
+        np.subtract(c10, c01, out=c01)
+        np.multiply(c, d, out=c11)
+        c11 -= np.multiply(e, e, out=c10)
+        np.multiply(e, f, out=c10)
+        c10 -= np.multiply(c, e, out=d)           # d no longer needed
+        for g in (c00, c01, c10, c11):
+            g /= det
+
+        level = np.empty(n)
+        trend = np.empty(n)
+        if n:
+            f0, f1 = x0.tolist(), x1.tolist()
+            g00, g01, g10, g11 = c00.tolist(), c01.tolist(), c10.tolist(), c11.tolist()
+            s0, s1 = f0[-1], f1[-1]
+            level[-1], trend[-1] = s0, s1
+            for t in range(n - 2, -1, -1):
+                # x_s[t] = x_f[t] + C_t (x_s[t+1] - F x_f[t])
+                d0 = s0 - f0[t] - f1[t]
+                d1 = s1 - f1[t]
+                s0 = f0[t] + g00[t] * d0 + g01[t] * d1
+                s1 = f1[t] + g10[t] * d0 + g11[t] * d1
+                level[t] = s0
+                trend[t] = s1
 
         df = pd.DataFrame({
-            "level_smooth": x_smooth[:, 0],
-            "trend_smooth": x_smooth[:, 1],
+            "level_smooth": level,
+            "trend_smooth": trend,
         }, index=pd.RangeIndex(n))
         return df
 
@@ -156,26 +254,42 @@ class KalmanTrend:
                   qL_grid=(1e-6, 1e-5, 1e-4, 1e-3),
                   qT_grid=(1e-7, 1e-6, 1e-5, 1e-4),
                   r_grid=(1e-4, 1e-3, 1e-2, 1e-1)) -> KFParams:
-        """Find good Q,R by minimizing forecast RMSE."""
+        """
+        Find good Q,R by minimizing forecast RMSE.
+
+        Every (qL, qT, r) candidate is a lane of the same array, so the whole
+        grid advances together in one pass over the prices.
+        """
         y = pd.Series(prices).dropna().astype(float).values
-        best = (None, np.inf)
-        orig = self.params
-
-        for qL in qL_grid:
-            for qT in qT_grid:
-                for r in r_grid:
-                    self.params = KFParams(qL, qT, r)
-                    res = self._filter_core(y)
-                    x_filt = res["x_filt"]
-                    forecast = (self.H @ (self.F @ x_filt.T)).flatten()
-                    err = y - forecast
-                    rmse = np.sqrt(np.mean(err[1:] ** 2))
-                    if rmse < best[1]:
-                        best = (KFParams(qL, qT, r), rmse)
-
-        self.params = best[0] or orig
+        rmse = self.grid_rmse(y, qL_grid, qT_grid, r_grid)
+        if not np.isfinite(rmse).any():
+            return self.params
+
+        # first minimum in qL → qT → r order, as the nested search picked it
+        i, j, k = np.unravel_index(int(np.nanargmin(rmse)), rmse.shape)
+        self.params = KFParams(float(qL_grid[i]), float(qT_grid[j]), float(r_grid[k]))
         return self.params
 
+    @staticmethod
+    def grid_rmse(y: np.ndarray, qL_grid, qT_grid, r_grid) -> np.ndarray:
+        """RMSE of y[t] vs the forecast made at t, for every grid point → shape (len(qL), len(qT), len(r))."""
+        y = np.asarray(y, dtype=float)
+        qL, qT, r = (g.ravel() for g in np.meshgrid(
+            np.asarray(qL_grid, float), np.asarray(qT_grid, float), np.asarray(r_grid, float), indexing="ij"))
+        shape = (len(qL_grid), len(qT_grid), len(r_grid))
+        if len(y) < 2:
+            return np.full(shape, np.nan)
+
+        g = len(qL)
+        x0, x1 = np.full(g, y[0]), np.zeros(g)
+        p00, p01, p11 = np.ones(g), np.zeros(g), np.ones(g)
+        sse = np.zeros(g)
+        for t in range(1, len(y)):
+            x0, x1, p00, p01, p11, *_ = _kf_step(y[t], x0, x1, p00, p01, p11, qL, qT, r)
+            d = y[t] - x0 - x1
+            sse += d * d
+        return np.sqrt(sse / (len(y) - 1)).reshape(shape)
+
     # -----------------------------------------------------------------
     @staticmethod
     def signals(filtered_df: pd.DataFrame,
@@ -0,0 +1,354 @@
+"""
+XAU_Bot — Monte Carlo Risk Engine
+
+File: bot/models/monte_carlo.py
+
+Purpose
+-------
+Stream GBM path blocks through reducers instead of materializing the full
+(n_paths, n_steps+1) matrix that GBMSimulator.simulate_paths returns.
+
+  • Paths are generated in fixed-size blocks; each block gets its own
+    SeedSequence child (SeedSequence(seed).spawn(n_blocks)), so results
+    depend only on (seed, block_paths), never on the number of workers.
+  • Blocks can be spread over a process pool; partial results come back in
+    block order and are combined by each reducer's finalize().
+  • Peak memory is one block per worker plus what reducers keep
+    (at most one float per path for the exact quantile/VaR reducers).
+
+Variance reduction (opt-in, combinable)
+---------------------------------------
+  antithetic=True       – each block uses (z, −z) pairs
+  sobol=True            – scrambled Sobol draws with Brownian-bridge path
+                          construction (one independent scrambling per block,
+                          so blocks stay i.i.d. replicates); needs scipy
+  control_variate=True  – S_T / s0 as control with known mean exp(μ T); mean-type
+                          estimates (CVaR, hit probabilities) are regressed on it
+
+Standard errors are batch means over blocks, which stays valid for all three
+schemes. run_to_precision() keeps adding blocks until a chosen *_se drops
+below a target instead of taking a path count.
+
+Reducers
+--------
+  TerminalQuantiles  – quantiles of S_T
+  PathVaR            – VaR / CVaR of the terminal or worst-along-path loss
+  BarrierHit         – P(TP first), P(SL first), P(neither) for SL/TP levels
+
+A reducer is any picklable object with
+    block(paths, s0) -> partial        (paths: (m, n_steps) prices after s0)
+    finalize(list_of_partials, info=None) -> result
+where info is a BlockInfo (block sizes + optional control values).
+
+Example
+-------
+    sim = GBMSimulator.from_prices(close, minutes_per_bar=5)
+    eng = MonteCarloEngine(sim, seed=42, workers=4)
+    out = eng.run(s0, n_steps=288, n_paths=1_000_000, reducers={
+        "q": TerminalQuantiles(), "var": PathVaR(0.99), "bar": BarrierHit(tp=s0+30, sl=s0-20)})
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import warnings
+import numpy as np
+
+from bot.models.stochastic import GBMSimulator
+
+
+# ---------------------------------------------------------------------------
+# Standard errors
+
+@dataclass
+class BlockInfo:
+    block_sizes: np.ndarray
+    control: Optional[np.ndarray] = None     # S_T / s0 per path
+    control_mean: Optional[float] = None     # E[S_T / s0] = exp(μ T)
+
+
+def mean_se(values: np.ndarray, info: Optional[BlockInfo] = None) -> Tuple[float, float]:
+    """Mean and standard error of per-path values.
+
+    With a control in `info` the values are first regressed on it
+    (y − β (c − E[c])). The SE is the batch-means SE over blocks when there are
+    at least two, else the i.i.d. formula.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    if info is not None and info.control is not None:
+        c = info.control - info.control_mean
+        cc = float(c @ c)
+        if cc > 0:
+            y = y - (float((y - y.mean()) @ c) / cc) * c
+    mean = float(y.mean())
+    sizes = None if info is None else info.block_sizes
+    if sizes is not None and len(sizes) >= 2:
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+        block_means = np.add.reduceat(y, starts) / sizes
+        w = sizes / sizes.sum()
+        k = len(sizes)
+        se = math.sqrt(float(np.sum(w ** 2 * (block_means - mean) ** 2)) * k / (k - 1))
+    else:
+        se = float(y.std(ddof=1)) / math.sqrt(len(y)) if len(y) > 1 else float("nan")
+    return mean, se
+
+
+# ---------------------------------------------------------------------------
+# Reducers
+
+class TerminalQuantiles:
+    """Quantiles of the terminal price S_T (exact: keeps one float per path)."""
+
+    def __init__(self, qs: Sequence[float] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+        self.qs = tuple(float(q) for q in qs)
+
+    def block(self, paths: np.ndarray, s0: float) -> np.ndarray:
+        return paths[:, -1].copy()
+
+    def finalize(self, parts: List[np.ndarray], info: Optional[BlockInfo] = None) -> Dict[float, float]:
+        terminal = np.concatenate(parts)
+        return dict(zip(self.qs, np.quantile(terminal, self.qs).tolist()))
+
+
+class PathVaR:
+    """VaR / CVaR of the relative loss at level alpha.
+
+    mode="terminal" → loss = 1 − S_T / s0
+    mode="worst"    → loss = 1 − min_t S_t / s0 (worst point along the path)
+
+    CVaR uses the Rockafellar–Uryasev form VaR + E[(L − VaR)⁺] / (1 − alpha),
+    whose expectation term carries cvar_se and takes the control variate.
+    """
+
+    def __init__(self, alpha: float = 0.99, mode: str = "terminal"):
+        if mode not in ("terminal", "worst"):
+            raise ValueError("mode must be 'terminal' or 'worst'")
+        self.alpha = float(alpha)
+        self.mode = mode
+
+    def block(self, paths: np.ndarray, s0: float) -> np.ndarray:
+        ref = paths[:, -1] if self.mode == "terminal" else paths.min(axis=1)
+        return 1.0 - ref / s0
+
+    def finalize(self, parts: List[np.ndarray], info: Optional[BlockInfo] = None) -> Dict[str, float]:
+        loss = np.concatenate(parts)
+        var = float(np.quantile(loss, self.alpha))
+        excess, se = mean_se(np.maximum(loss - var, 0.0) / (1.0 - self.alpha), info)
+        return {"alpha": self.alpha, "var": var, "cvar": var + max(excess, 0.0), "cvar_se": se}
+
+
+class BarrierHit:
+    """First-passage of SL/TP price levels along each path.
+
+    side="BUY":  TP above, SL below.  side="SELL": TP below, SL above.
+    A path that crosses both within the same step counts as SL (conservative).
+    """
+
+    def __init__(self, tp: float, sl: float, side: str = "BUY"):
+        self.tp, self.sl = float(tp), float(sl)
+        self.side = side.upper()
+
+    def block(self, paths: np.ndarray, s0: float) -> np.ndarray:
+        n_steps = paths.shape[1]
+        if self.side == "BUY":
+            tp_hit, sl_hit = paths >= self.tp, paths <= self.sl
+        else:
+            tp_hit, sl_hit = paths <= self.tp, paths >= self.sl
+        t_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), n_steps)
+        t_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), n_steps)
+        # per-path outcome: 1 = TP first, −1 = SL first, 0 = neither
+        out = (t_tp < t_sl).astype(np.int8)
+        out[(t_sl <= t_tp) & (t_sl < n_steps)] = -1
+        return out
+
+    def finalize(self, parts: List[np.ndarray], info: Optional[BlockInfo] = None) -> Dict[str, float]:
+        out = np.concatenate(parts)
+        p_tp, se_tp = mean_se(out == 1, info)
+        p_sl, se_sl = mean_se(out == -1, info)
+        return {"p_tp": p_tp, "p_sl": p_sl, "p_none": 1.0 - p_tp - p_sl,
+                "p_tp_se": se_tp, "p_sl_se": se_sl, "n_paths": len(out)}
+
+
+# ---------------------------------------------------------------------------
+# Block worker (top level so process pools can pickle it)
+
+def _bridge_increments(z: np.ndarray) -> np.ndarray:
+    """Map (m, n) normals to Brownian increments via Brownian-bridge construction.
+
+    Column 0 fixes W_n, the next columns the midpoints, and so on, so the
+    leading (best distributed) Sobol coordinates drive the coarse path shape.
+    """
+    m, n = z.shape
+    w = np.empty((m, n + 1))
+    w[:, 0] = 0.0
+    w[:, n] = math.sqrt(n) * z[:, 0]
+    k, intervals = 1, [(0, n)]
+    while intervals:
+        nxt = []
+        for lo, hi in intervals:
+            mid = (lo + hi) // 2
+            if mid == lo:
+                continue
+            a, b = (hi - mid) / (hi - lo), (mid - lo) / (hi - lo)
+            w[:, mid] = a * w[:, lo] + b * w[:, hi] + math.sqrt((mid - lo) * (hi - mid) / (hi - lo)) * z[:, k]
+            k += 1
+            nxt += [(lo, mid), (mid, hi)]
+        intervals = nxt
+    return np.diff(w, axis=1)
+
+
+def _normals(m: int, n_steps: int, seed_seq: np.random.SeedSequence, sobol: bool) -> np.ndarray:
+    rng = np.random.default_rng(seed_seq)
+    if not sobol:
+        return rng.standard_normal((m, n_steps))
+    from scipy.stats import qmc
+    from scipy.special import ndtri
+    with warnings.catch_warnings():
+        # balance properties want m = 2^k; other sizes are still valid RQMC points
+        warnings.simplefilter("ignore", UserWarning)
+        u = qmc.Sobol(d=n_steps, scramble=True, seed=rng).random(m)
+    return _bridge_increments(ndtri(u, out=u))
+
+
+def _gbm_block(drift: float, vol: float, s0: float, n_steps: int, m: int,
+               seed_seq: np.random.SeedSequence, antithetic: bool = False, sobol: bool = False):
+    if antithetic:
+        half = _normals((m + 1) // 2, n_steps, seed_seq, sobol)
+        paths = np.concatenate((half, -half))[:m]
+    else:
+        paths = _normals(m, n_steps, seed_seq, sobol)
+    paths *= vol
+    paths += drift
+    np.cumsum(paths, axis=1, out=paths)
+    np.exp(paths, out=paths)
+    paths *= s0
+    return paths
+
+
+def _run_block(job):
+    drift, vol, s0, n_steps, m, seed_seq, reducers, antithetic, sobol, control = job
+    paths = _gbm_block(drift, vol, s0, n_steps, m, seed_seq, antithetic, sobol)
+    parts = {name: r.block(paths, s0) for name, r in reducers.items()}
+    return parts, (paths[:, -1] / s0 if control else None)
+
+
+# ---------------------------------------------------------------------------
+
+class MonteCarloEngine:
+    """Chunked, optionally multi-process Monte Carlo over a GBMSimulator's parameters."""
+
+    def __init__(
+        self,
+        sim: GBMSimulator,
+        block_paths: int = 8192,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        antithetic: bool = False,
+        control_variate: bool = False,
+        sobol: bool = False,
+    ):
+        if block_paths <= 0:
+            raise ValueError("block_paths must be positive")
+        self.sim = sim
+        self.block_paths = int(block_paths)
+        self.workers = max(1, int(workers))
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.sobol = sobol
+        # keep the entropy so a run without an explicit seed can still be replayed
+        self.seed_seq = np.random.SeedSequence(seed)
+
+    def _step_params(self) -> Tuple[float, float]:
+        drift = (self.sim.mu_annual - 0.5 * self.sim.sigma_annual ** 2) * self.sim.dt
+        vol = self.sim.sigma_annual * math.sqrt(self.sim.dt)
+        return drift, vol
+
+    def _jobs(self, s0: float, n_steps: int, sizes: Sequence[int], first_block: int, reducers: dict):
+        drift, vol = self._step_params()
+        for i, m in enumerate(sizes, start=first_block):
+            # identical to self.seed_seq.spawn(...)[i], without mutating the parent
+            child = np.random.SeedSequence(self.seed_seq.entropy, spawn_key=(i,))
+            yield (drift, vol, float(s0), int(n_steps), int(m), child, reducers,
+                   self.antithetic, self.sobol, self.control_variate)
+
+    def _simulate(self, jobs, parts: Dict[str, list], controls: list, pool=None):
+        results = pool.map(_run_block, jobs) if pool is not None else map(_run_block, jobs)
+        # map() yields in submission (block) order → worker-count independent
+        for res, ctrl in results:
+            for name, part in res.items():
+                parts[name].append(part)
+            if ctrl is not None:
+                controls.append(ctrl)
+
+    def _finalize(self, n_steps: int, sizes: List[int], parts: dict, controls: list, reducers: dict):
+        info = BlockInfo(block_sizes=np.asarray(sizes, dtype=np.float64))
+        if self.control_variate:
+            drift, vol = self._step_params()
+            info.control = np.concatenate(controls)
+            info.control_mean = math.exp(n_steps * (drift + 0.5 * vol ** 2))
+        return {name: r.finalize(parts[name], info) for name, r in reducers.items()}
+
+    def _pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def run(self, s0: float, n_steps: int, n_paths: int, reducers: Dict[str, object]) -> Dict[str, object]:
+        """Simulate n_paths GBM paths of n_steps from s0 and return {name: reducer result}."""
+        if n_steps <= 0 or n_paths <= 0:
+            raise ValueError("n_steps and n_paths must be positive")
+        n_paths = int(n_paths)
+        sizes = [min(self.block_paths, n_paths - lo) for lo in range(0, n_paths, self.block_paths)]
+        parts: Dict[str, list] = {name: [] for name in reducers}
+        controls: list = []
+
+        pool = self._pool()
+        try:
+            self._simulate(self._jobs(s0, n_steps, sizes, 0, reducers), parts, controls, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self._finalize(n_steps, sizes, parts, controls, reducers)
+
+    def run_to_precision(
+        self,
+        s0: float,
+        n_steps: int,
+        reducers: Dict[str, object],
+        target_se: float,
+        metric: Tuple[str, str],
+        min_paths: int = 16_384,
+        max_paths: int = 4_000_000,
+    ) -> Dict[str, object]:
+        """Add blocks (doubling the path count) until result[metric[0]][metric[1]] <= target_se.
+
+        metric names a standard-error field, e.g. ("var", "cvar_se"). Stops at
+        max_paths regardless; the returned dict carries "n_paths" and "converged".
+        Block seeds follow the same sequence as run(), so the outcome is
+        reproducible and equals run() with the final path count.
+        """
+        name, key = metric
+        parts: Dict[str, list] = {r: [] for r in reducers}
+        controls: list = []
+        sizes: List[int] = []
+        want = max(int(min_paths), self.block_paths)
+
+        pool = self._pool()
+        try:
+            while True:
+                n_new = -(-(want - len(sizes) * self.block_paths) // self.block_paths)
+                new = [self.block_paths] * max(n_new, 0)
+                self._simulate(self._jobs(s0, n_steps, new, len(sizes), reducers), parts, controls, pool)
+                sizes += new
+                out = self._finalize(n_steps, sizes, parts, controls, reducers)
+                n_paths = len(sizes) * self.block_paths
+                converged = out[name][key] <= target_se
+                if converged or n_paths >= max_paths:
+                    break
+                want = min(2 * n_paths, int(max_paths))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        out["n_paths"] = n_paths
+        out["converged"] = bool(converged)
+        return out
@@ -17,11 +17,14 @@ where
 """
 
 from __future__ import annotations
+import math
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 from typing import Optional
 
+from bot.data.indicator_engine import BollingerState
+
 
 # ---------------------------------------------------------------------
 # Parameters container
@@ -88,20 +91,151 @@ class OUModel:
             return f"HOLD (z={z:.2f})"
 
     # -----------------------------------------------------------------
-    def simulate(self, n_steps: int, dt: float = 1.0) -> np.ndarray:
-        """Simulate a synthetic OU path using fitted parameters."""
+    def transition(self, dt: float = 1.0):
+        """Exact OU step over dt: X' = μ + φ (X − μ) + s·Z, returns (φ, s)."""
         if self.params is None:
             raise ValueError("Model not fitted yet; call fit() first.")
+        theta, sigma = self.params.theta, self.params.sigma
+        phi = float(np.exp(-theta * dt))
+        # Var = σ²(1 − e^{−2θdt}) / 2θ  → σ² dt as θ → 0
+        var = sigma ** 2 * (dt if abs(theta) < 1e-12 else (1.0 - phi ** 2) / (2.0 * theta))
+        return phi, float(np.sqrt(var))
+
+    def simulate_chunks(self, n_steps: int, n_paths: int, dt: float = 1.0,
+                        seed=None, dtype=np.float64, chunk_paths: int = 50_000,
+                        x0: float | None = None):
+        """
+        Yield (first_path_index, block) with block shape (≤chunk_paths, n_steps).
+
+        Noise for each block is drawn in one call straight into the block and
+        the recursion runs in place, so peak memory is one block. Draws are
+        path-major, so a given seed gives the same paths for any chunk size.
+        """
+        phi, scale = self.transition(dt)
+        mu = self.params.mu
+        start = float(self.prices.iloc[-1] if x0 is None else x0)
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        dtype = np.dtype(dtype)
+        phi_t, scale_t = dtype.type(phi), dtype.type(scale)
+
+        for lo in range(0, int(n_paths), int(chunk_paths)):
+            m = min(int(chunk_paths), int(n_paths) - lo)
+            block = np.empty((m, n_steps), dtype=dtype)
+            rng.standard_normal(out=block, dtype=dtype)
+            # work on deviations from μ: d_t = φ d_{t−1} + s·Z_t
+            block *= scale_t
+            block[:, 0] = start - mu
+            tmp = np.empty(m, dtype=dtype)
+            for t in range(1, n_steps):
+                np.multiply(block[:, t - 1], phi_t, out=tmp)
+                block[:, t] += tmp
+            block += dtype.type(mu)
+            yield lo, block
+
+    def simulate(self, n_steps: int, dt: float = 1.0, n_paths: int | None = None,
+                 seed=None, dtype=np.float64, chunk_paths: int = 50_000,
+                 x0: float | None = None) -> np.ndarray:
+        """
+        Simulate OU paths from the last price with the exact transition.
+
+        n_paths=None returns one path of shape (n_steps,); otherwise an
+        (n_paths, n_steps) array. `seed` is an int or a np.random.Generator.
+        """
+        if self.params is None:
+            raise ValueError("Model not fitted yet; call fit() first.")
+        total = 1 if n_paths is None else int(n_paths)
+        out = np.empty((total, n_steps), dtype=dtype)
+        for lo, block in self.simulate_chunks(n_steps, total, dt, seed, dtype, chunk_paths, x0):
+            out[lo:lo + len(block)] = block
+        return out[0] if n_paths is None else out
+
+
+# ---------------------------------------------------------------------
+class OnlineOU:
+    """
+    Incremental OU estimator: O(1) work per bar.
+
+    Keeps exponentially weighted means and co-moments of the regression
+    ΔX = α + β X_{t−1} (West's weighted Welford update, so gold-level prices
+    do not cancel catastrophically). `lam` is the forgetting factor; with
+    lam=1 every bar weighs the same and the estimates equal OUModel.fit() on
+    the same history.
+
+    The running z-score uses the same last-`z_window` prices (ddof=1) as
+    OUModel.zscore, kept as a sliding window.
+    """
+
+    MIN_OBS = 10   # same minimum as OUModel.fit()
+
+    def __init__(self, lam: float = 1.0, z_window: int = 100, dt: float = 1.0):
+        if not 0.0 < lam <= 1.0:
+            raise ValueError("lam must be in (0, 1]")
+        self.lam = float(lam)
+        self.dt = float(dt)
+        self.prev: Optional[float] = None
+        self.n = 0                 # regression pairs seen
+        self.w = 0.0               # total weight
+        self.mx = self.my = 0.0    # weighted means of X_{t−1} and ΔX
+        self.cxx = self.cxy = self.cyy = 0.0
+        self.window = BollingerState(z_window)
+        self.params: Optional[OUParams] = None
+        self.zscore = 0.0
+
+    @classmethod
+    def from_prices(cls, prices: pd.Series, **kwargs) -> "OnlineOU":
+        est = cls(**kwargs)
+        for p in pd.Series(prices).dropna().astype(float).tolist():
+            est.update(p)
+        return est
+
+    def update(self, price: float) -> Optional[OUParams]:
+        """Add one bar; returns the current estimate (None until MIN_OBS pairs)."""
+        x = float(price)
+        self._update_z(x)
+        if self.prev is None:
+            self.prev = x
+            return None
+
+        xl, dx = self.prev, x - self.prev
+        self.prev = x
+        lam = self.lam
+        self.w = lam * self.w + 1.0
+        ex, ey = xl - self.mx, dx - self.my
+        self.mx += ex / self.w
+        self.my += ey / self.w
+        # C_n = λ C_{n−1} + (x − m_x,old)(y − m_y,new)
+        self.cxx = lam * self.cxx + ex * (xl - self.mx)
+        self.cxy = lam * self.cxy + ex * (dx - self.my)
+        self.cyy = lam * self.cyy + ey * (dx - self.my)
+        self.n += 1
+
+        if self.n >= self.MIN_OBS and self.cxx > 0:
+            self.params = self._estimate()
+        return self.params
 
-        theta, mu, sigma = self.params.theta, self.params.mu, self.params.sigma
-        x = np.zeros(n_steps)
-        x[0] = self.prices.iloc[-1]
+    def _estimate(self) -> OUParams:
+        b = self.cxy / self.cxx
+        a = self.my - b * self.mx
+        ssr = max(self.cyy - b * self.cxy, 0.0)
+        theta = -np.log(1 + b) / self.dt
+        # one bar spans dt: φ = e^{−θ dt} = 1 + β, residual var = σ²(1 − φ²)/2θ
+        mu = a / (1 - np.exp(-theta * self.dt))
+        sigma = math.sqrt(ssr / self.w) * np.sqrt(2 * theta / (1 - np.exp(-2 * theta * self.dt)))
+        return OUParams(float(theta), float(mu), float(sigma))
 
-        for t in range(1, n_steps):
-            dx = theta * (mu - x[t - 1]) * dt + sigma * np.sqrt(dt) * np.random.normal()
-            x[t] = x[t - 1] + dx
+    def _update_z(self, x: float):
+        win = self.window
+        win.update(x)
+        k = len(win.window)
+        std = math.sqrt(max(win.m2, 0.0) / (k - 1)) if k > 1 else 0.0
+        self.zscore = (x - win.mean) / std if std > 0 else 0.0
 
-        return x
+    @property
+    def half_life(self) -> float:
+        """Time for a deviation from μ to halve, in dt units: ln 2 / θ (inf when not mean-reverting)."""
+        if self.params is None or not self.params.theta > 0:
+            return float("inf")
+        return math.log(2.0) / self.params.theta
 
 
 # ---------------------------------------------------------------------
@@ -0,0 +1,169 @@
+# D:\XAU_Bot\bot\models\pending_decisions.py
+"""
+Pending-decision index for BayesianConfidenceEngine.
+
+register_decision() stores the evidence of every order until its close is seen.
+Kept in memory only, trades whose close was never observed pile up forever and
+a restart forgets the rest, so their outcomes never reach the Betas. This index
+
+  • persists entries through the WAL store (bot/utils/wal_store.py): one compact
+    line per add/remove, snapshot compaction in the background,
+  • evicts entries older than `ttl_seconds` and the oldest beyond `max_size`
+    (on every add and match), so memory and disk stay flat over weeks of uptime,
+  • matches MT5 deals in bulk by position_id (the opening ticket) or order
+    ticket. Partial closes accumulate in the entry across polls; it resolves
+    only once the closed volume reaches the opened volume.
+
+It behaves like the dict it replaces (`in`, [], pop, len).
+"""
+
+from __future__ import annotations
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bot.core.clock import get_clock
+from bot.utils.wal_store import open_store
+
+logger = logging.getLogger(__name__)
+
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_INOUT = 2   # reversal: closes the whole position
+_VOL_EPS = 1e-9
+
+
+def _deal_pnl(d) -> float:
+    return sum(float(getattr(d, f, 0.0) or 0.0) for f in ("profit", "swap", "commission", "fee"))
+
+
+class PendingDecisionIndex:
+    def __init__(self, path, ttl_seconds: float = 7 * 86400, max_size: int = 10_000, clock=None):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_size = int(max_size)
+        self.clock = clock or get_clock()
+        self._store = open_store(path, indent=None, compact_every=512)
+        loaded = self._store.load()
+        # oldest first, so eviction pops from the front
+        self._items: Dict[str, dict] = dict(sorted(loaded.items(), key=lambda kv: kv[1].get("t", 0.0)))
+        # position ticket → entry key, for entries registered under their order ticket
+        self._by_position: Dict[str, str] = {
+            str(rec["position_id"]): key for key, rec in self._items.items() if rec.get("position_id")}
+        self.evict()
+
+    # ---------- dict-like ----------
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, trade_id) -> bool:
+        return str(trade_id) in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __getitem__(self, trade_id) -> dict:
+        return self._items[str(trade_id)]
+
+    def __setitem__(self, trade_id, record: dict):
+        self.add(trade_id, record)
+
+    def get(self, trade_id, default=None):
+        return self._items.get(str(trade_id), default)
+
+    # ---------- writes ----------
+    def add(self, trade_id, record: dict) -> None:
+        key = str(trade_id)
+        record = dict(record, t=self.clock.time())
+        self._items.pop(key, None)
+        self._items[key] = record
+        self._store.record([key], record)
+        self.evict()
+
+    def pop(self, trade_id, default=None):
+        key = str(trade_id)
+        rec = self._items.pop(key, None)
+        if rec is None:
+            return default
+        self._forget_position(rec)
+        self._store.delete([key])
+        return rec
+
+    def _forget_position(self, rec: dict) -> None:
+        if rec.get("position_id"):
+            self._by_position.pop(str(rec["position_id"]), None)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop expired entries and the oldest beyond max_size; returns how many."""
+        now = self.clock.time() if now is None else now
+        cutoff = now - self.ttl_seconds
+        dropped = []
+        for key, rec in self._items.items():
+            if rec.get("t", 0.0) >= cutoff and len(self._items) - len(dropped) <= self.max_size:
+                break
+            dropped.append(key)
+        for key in dropped:
+            self._forget_position(self._items.pop(key))
+        if dropped:
+            self._store.delete(*([k] for k in dropped))
+            logger.info("🧹 Evicted %d pending decisions (ttl=%.0fs, max=%d)",
+                        len(dropped), self.ttl_seconds, self.max_size)
+        return len(dropped)
+
+    # ---------- deal matching ----------
+    def _key_for(self, deal) -> Optional[str]:
+        for ref in (getattr(deal, "position_id", None), getattr(deal, "order", None)):
+            if ref and str(ref) in self._items:
+                return str(ref)
+        pid = getattr(deal, "position_id", None)
+        return self._by_position.get(str(pid)) if pid else None
+
+    def match_deals(self, deals: Iterable,
+                    opened_volume: Optional[Callable[[int], Optional[float]]] = None) -> List[Tuple[str, float]]:
+        """
+        (trade_id, realized pnl) for every pending entry whose position is now
+        fully closed. pnl = profit + swap + commission + fee over all its closing
+        deals. Opening deals add to the entry's opened volume ("vol_in"), closing
+        deals to "vol_out" and "pnl"; this progress is persisted, so partial
+        closes seen in earlier polls count. An entry resolves when vol_out reaches
+        vol_in, or on a reversal (INOUT) deal. If its opening deal was never seen,
+        `opened_volume(position_id)` is asked for it. Deals already counted are
+        skipped. Entries are not removed here.
+        """
+        self.evict()
+        touched: Dict[str, dict] = {}
+        for d in deals or ():
+            key = self._key_for(d)
+            if key is None:
+                continue
+            rec = self._items[key]
+            ticket = getattr(d, "ticket", None)
+            seen = rec.setdefault("deals", [])
+            if ticket is not None:
+                if ticket in seen:
+                    continue
+                seen.append(ticket)
+            pid = getattr(d, "position_id", None)
+            if pid and not rec.get("position_id"):
+                rec["position_id"] = int(pid)
+                self._by_position[str(pid)] = key
+            vol = float(getattr(d, "volume", 0.0) or 0.0)
+            if getattr(d, "entry", None) == DEAL_ENTRY_IN:
+                rec["vol_in"] = rec.get("vol_in", 0.0) + vol
+            else:
+                rec["vol_out"] = rec.get("vol_out", 0.0) + vol
+                rec["pnl"] = rec.get("pnl", 0.0) + _deal_pnl(d)
+                if getattr(d, "entry", None) == DEAL_ENTRY_INOUT:
+                    rec["reversed"] = True
+            touched[key] = rec
+
+        resolved = []
+        for key, rec in touched.items():
+            if not rec.get("vol_in") and opened_volume is not None and rec.get("position_id"):
+                vol_in = opened_volume(rec["position_id"])
+                if vol_in:
+                    rec["vol_in"] = float(vol_in)
+            closed = rec.get("reversed") or (
+                rec.get("vol_in") and rec.get("vol_out", 0.0) >= rec["vol_in"] - _VOL_EPS)
+            if closed:
+                resolved.append((key, rec.get("pnl", 0.0)))
+            else:
+                self._store.record([key], rec)   # partial progress survives a restart
+        return resolved
@@ -131,13 +131,29 @@ class VolEstimator:
         r = pd.Series(returns).dropna().astype(float)
         if len(r) < 2:
             return 0.0
-        # Initialize with sample variance
-        var = float(np.var(r.values, ddof=1))
-        for x in r.values:
-            var = lam * var + (1 - lam) * (x ** 2)
-        std_step = math.sqrt(var)
+        std_step = math.sqrt(VolEstimator.ewma_var_curve(r, lam=lam)[-1])
         return _annualize_vol(std_step, steps_per_year)
 
+    @staticmethod
+    def ewma_var_curve(returns: pd.Series, lam: float = 0.94, var0: Optional[float] = None) -> np.ndarray:
+        """Per-step EWMA variance after each return (same recursion as ewma_vol).
+
+        var_t = lam * var_{t-1} + (1 - lam) * r_t^2, seeded with the sample variance
+        (ddof=1) unless var0 is given. Computed as one pandas ewm pass over
+        [var0, r_1^2, r_2^2, ...] (adjust=False is exactly this recursion).
+        lam >= 1 never forgets the seed: the curve is var0 throughout.
+        """
+        r = pd.Series(returns).dropna().astype(float).values
+        if len(r) == 0:
+            return np.empty(0, dtype=float)
+        if var0 is None:
+            var0 = float(np.var(r, ddof=1)) if len(r) > 1 else float(r[0] ** 2)
+        if lam >= 1.0:
+            return np.full(len(r), float(var0))
+        seq = np.concatenate(([float(var0)], r * r))
+        curve = pd.Series(seq).ewm(alpha=1.0 - lam, adjust=False).mean().values
+        return curve[1:]
+
     @staticmethod
     def drift(returns: pd.Series, steps_per_year: float) -> float:
         r = pd.Series(returns).dropna().astype(float)
@@ -169,6 +185,67 @@ class VolEstimator:
         return Calibration(mu_annual=mu_annual, sigma_annual=sigma_annual, steps_per_year=steps_per_year)
 
 
+class EWMAVol:
+    """Streaming EWMA (RiskMetrics) volatility: O(1) per bar for live use.
+
+    Seed it from history with `from_returns` / `from_prices` (identical to
+    VolEstimator.ewma_var_curve on that history), then feed new bars via
+    `update(ret)` or `update_price(price)`. Without a seed, the first return's
+    square starts the recursion.
+    """
+
+    def __init__(self, lam: float = 0.94, steps_per_year: Optional[float] = None, var0: Optional[float] = None):
+        if not 0.0 < lam < 1.0:
+            raise ValueError("lam must be in (0, 1)")
+        self.lam = float(lam)
+        self.steps_per_year = steps_per_year
+        self.var = var0
+        self.last_price: Optional[float] = None
+        self.n = 0
+
+    @classmethod
+    def from_returns(cls, returns: pd.Series, lam: float = 0.94, steps_per_year: Optional[float] = None) -> "EWMAVol":
+        est = cls(lam=lam, steps_per_year=steps_per_year)
+        curve = VolEstimator.ewma_var_curve(returns, lam=lam)
+        if len(curve):
+            est.var = float(curve[-1])
+            est.n = len(curve)
+        return est
+
+    @classmethod
+    def from_prices(cls, prices: pd.Series, lam: float = 0.94, steps_per_year: Optional[float] = None) -> "EWMAVol":
+        prices = pd.Series(prices).dropna().astype(float)
+        est = cls.from_returns(VolEstimator.log_returns(prices), lam=lam, steps_per_year=steps_per_year)
+        if len(prices):
+            est.last_price = float(prices.iloc[-1])
+        return est
+
+    def update(self, ret: float) -> float:
+        """Add one log-return; returns the per-step variance."""
+        x2 = float(ret) * float(ret)
+        self.var = x2 if self.var is None else self.lam * self.var + (1.0 - self.lam) * x2
+        self.n += 1
+        return self.var
+
+    def update_price(self, price: float) -> Optional[float]:
+        """Add one close; the first call only stores the price."""
+        price = float(price)
+        prev, self.last_price = self.last_price, price
+        if prev is None or prev <= 0 or price <= 0:
+            return self.var
+        return self.update(math.log(price / prev))
+
+    @property
+    def vol_step(self) -> float:
+        return math.sqrt(self.var) if self.var is not None else 0.0
+
+    @property
+    def vol_annual(self) -> float:
+        if self.steps_per_year is None:
+            raise ValueError("steps_per_year not set")
+        return _annualize_vol(self.vol_step, self.steps_per_year)
+
+
 # ---------------------------------------------------------------------------
 # Brownian Motion
 
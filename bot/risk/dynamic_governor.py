@@ -1,9 +1,10 @@
 import json
 import logging
 from dataclasses import dataclass, asdict
-from datetime import datetime
 from pathlib import Path
 
+from bot.core.clock import get_clock
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,8 +27,9 @@ class DynamicRiskGovernor:
     - Dynamic hedging requests
     """
 
-    def __init__(self, cfg: dict):
+    def __init__(self, cfg: dict, clock=None):
         self.cfg = cfg
+        self.clock = clock or get_clock()
         self.policy = self._load_policy()
         self.path = Path("risk_state.json")
         self.state = self._load_state()
@@ -37,6 +39,7 @@ class DynamicRiskGovernor:
         self.current_dd = 0.0
         self.daily_loss_pct = 0.0
         self.paused = False
+        self.paused_at = None
         self.hedge_requested = False
 
         self._publish_state(initial=True)
@@ -67,7 +70,7 @@ class DynamicRiskGovernor:
             except Exception as e:
                 logger.warning("⚠️ Could not load risk_state.json → %s", e)
         return {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self.clock.utcnow().isoformat(),
             "paused": False,
             "drawdown_pct": 0.0,
             "daily_loss_pct": 0.0,
@@ -87,7 +90,7 @@ class DynamicRiskGovernor:
     def _publish_state(self, initial=False):
         """Save and log current risk policy snapshot."""
         state = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self.clock.utcnow().isoformat(),
             "mode": self.mode,
             "max_drawdown": self.current_dd,
             "daily_loss_pct": self.daily_loss_pct,
@@ -108,7 +111,7 @@ class DynamicRiskGovernor:
             self.current_dd = max(dd, 0.0)
             logger.debug("📉 Current drawdown: %.2f%%", self.current_dd)
             if self.current_dd >= self.policy.max_dd_pct:
-                self.paused = True
+                self._pause()
                 logger.warning(
                     "⏸️ Trading PAUSED → max drawdown %.2f%% ≥ limit %.2f%%",
                     self.current_dd, self.policy.max_dd_pct,
@@ -127,19 +130,24 @@ class DynamicRiskGovernor:
     def can_trade(self, symbol: str) -> bool:
         """
         Checks if trading is allowed for the symbol.
-        Enforces drawdown and pause conditions.
+        Enforces drawdown and pause conditions. A pause lasts at least
+        policy.cooldown_minutes of clock time; after that it lifts on its own,
+        and re-arms below if the drawdown is still over the limit.
         """
         try:
             if self.paused:
-                logger.warning("⏸️ Trading blocked by DRG (pause active)")
-                return False
+                remaining = self.cooldown_remaining()
+                if remaining > 0:
+                    logger.warning("⏸️ Trading blocked by DRG (cooldown %.0fs left)", remaining)
+                    return False
+                self.resume_trading()
 
             if self.current_dd >= self.policy.max_dd_pct:
                 logger.warning(
                     "⏸️ Trading PAUSED → max DD %.2f%% ≥ %.2f%%",
                     self.current_dd, self.policy.max_dd_pct,
                 )
-                self.paused = True
+                self._pause()
                 self._publish_state()
                 return False
 
@@ -150,10 +158,23 @@ class DynamicRiskGovernor:
             logger.error("❌ can_trade() error → %s", e)
             return False
 
+    # ------------------------------------------------------------------
+    def _pause(self):
+        if not self.paused:
+            self.paused_at = self.clock.time()
+        self.paused = True
+
+    def cooldown_remaining(self) -> float:
+        """Seconds left of policy.cooldown_minutes since the pause began (0 if not paused)."""
+        if not self.paused or self.paused_at is None:
+            return 0.0
+        return max(0.0, self.policy.cooldown_minutes * 60 - (self.clock.time() - self.paused_at))
+
     # ------------------------------------------------------------------
     def resume_trading(self):
         """Manually resume trading after cooldown."""
         self.paused = False
+        self.paused_at = None
         self.hedge_requested = False
         logger.info("▶️ Trading RESUMED")
         self._publish_state()
@@ -4,10 +4,13 @@ import json
 import datetime as dt
 from pathlib import Path
 
+from bot.core.clock import get_clock
+
 GUARD_FILE = Path("bot/state/trade_guard.json")
 
 class TradeGuard:
-    def __init__(self, config_path="config.yaml"):
+    def __init__(self, config_path="config.yaml", clock=None):
+        self.clock = clock or get_clock()
         with open(config_path, "r", encoding="utf-8") as f:
             self.cfg = yaml.safe_load(f)
 
@@ -22,7 +25,7 @@ class TradeGuard:
             self.state = json.load(open(GUARD_FILE))
         else:
             self.state = {"last_trade_bar": 0, "open_positions": 0,
-                          "daily_pnl": 0.0, "date": dt.date.today().isoformat()}
+                          "daily_pnl": 0.0, "date": self.clock.today().isoformat()}
             self._save_state()
 
     def _save_state(self):
@@ -31,12 +34,12 @@ class TradeGuard:
 
     # Reset at new trading day
     def reset_if_new_day(self):
-        if self.state["date"] != dt.date.today().isoformat():
+        if self.state["date"] != self.clock.today().isoformat():
             self.state.update({
                 "last_trade_bar": 0,
                 "open_positions": 0,
                 "daily_pnl": 0.0,
-                "date": dt.date.today().isoformat()
+                "date": self.clock.today().isoformat()
             })
             self._save_state()
 
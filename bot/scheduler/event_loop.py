@@ -0,0 +1,316 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  XAU_Bot Event Loop – tick/bar-driven scheduling (asyncio)
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Wakes the decision pipeline when a bar closes instead of every 120 s.
+
+MT5 has no push API, so one feed task polls symbol_info_tick() every
+`tick_poll_s` (50 ms) and raises
+
+    TickEvent – a tick with a new time_msc
+    BarEvent  – the first tick at/after the next bar boundary (that is when the
+                terminal finalizes the bar), or `bar_grace_s` after the boundary
+                on the local clock if the market is quiet
+
+Plain (non-coroutine) bar handlers and periodic jobs run on worker threads
+(asyncio.to_thread), so a slow order_send or history_deals_get never stops
+the feed from polling ticks and detecting the next bar close. Bar handlers
+run one bar at a time; bars that close while a handler is busy are coalesced
+into the latest one. Tick handlers run inline on the feed and must be cheap.
+Periodic jobs (position / feedback polling, equity checks) are separate tasks
+parked on deadline timers that the feed releases after each poll, so the same
+code runs on wall time and on a SimulatedClock replay. On a replay the feed
+waits for in-flight handlers before stepping the clock, so simulated time
+stands still while they run (as it would for a handler that takes no time).
+
+Latency is measured from the bar boundary (server time, mapped to the local
+clock through the broker's whole-half-hour offset):
+    bar→detect   boundary → event raised (clock time)
+    bar→decide   bar→detect + wall time until the handlers returned
+                 (including any wait behind the previous bar's handlers)
+    bar→order    bar→decide, for handlers that sent an order (truthy result)
+"""
+
+from __future__ import annotations
+import asyncio
+import heapq
+import inspect
+import itertools
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import MetaTrader5 as mt5
+from loguru import logger
+
+from bot.core.clock import SimulatedClock, get_clock
+
+
+def timeframe_seconds(tf) -> int:
+    """'TIMEFRAME_M5' / 'M5' / 'H1' / 'D1' / seconds → bar length in seconds."""
+    if isinstance(tf, (int, float)):
+        return int(tf)
+    m = re.fullmatch(r"(?:TIMEFRAME_)?([MHD])(\d+)", str(tf).strip().upper())
+    if not m:
+        raise ValueError(f"Unknown timeframe: {tf!r}")
+    return int(m.group(2)) * {"M": 60, "H": 3600, "D": 86400}[m.group(1)]
+
+
+@dataclass
+class TickEvent:
+    symbol: str
+    time_msc: int
+    bid: float
+    ask: float
+    detected: float        # local clock time
+
+
+@dataclass
+class BarEvent:
+    symbol: str
+    close_time: float      # bar boundary, server epoch seconds
+    detected: float        # local clock time
+    lag_ms: float          # boundary → detection
+
+
+class LatencyStats:
+    """Last `maxlen` samples per metric (milliseconds) with percentile summaries."""
+
+    def __init__(self, maxlen: int = 2048):
+        self.maxlen = maxlen
+        self.samples: Dict[str, deque] = {}
+
+    def add(self, name: str, ms: float) -> None:
+        buf = self.samples.get(name)
+        if buf is None:
+            buf = self.samples[name] = deque(maxlen=self.maxlen)
+        buf.append(float(ms))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for name, buf in self.samples.items():
+            if not buf:
+                continue
+            a = np.fromiter(buf, dtype=float, count=len(buf))
+            p50, p95, p99 = np.percentile(a, [50, 95, 99])
+            out[name] = {"n": len(a), "p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                         "p99": round(float(p99), 3), "max": round(float(a.max()), 3)}
+        return out
+
+    def log(self) -> None:
+        for name, s in self.summary().items():
+            logger.info(f"⏱️ {name:<11} n={s['n']} p50={s['p50']:.1f}ms p95={s['p95']:.1f}ms "
+                        f"p99={s['p99']:.1f}ms max={s['max']:.1f}ms")
+
+
+async def _call(fn: Callable, *args, offload=None):
+    """Await coroutine functions; run plain callables via `offload` (or inline if None)."""
+    if inspect.iscoroutinefunction(fn) or offload is None:
+        res = fn(*args)
+    else:
+        res = await offload(fn, *args)
+    if inspect.isawaitable(res):
+        res = await res
+    return res
+
+
+class EventScheduler:
+    def __init__(self, symbol: str, bar_seconds: int = 300, clock=None, tick_poll_s: float = 0.05,
+                 bar_grace_s: float = 1.0, report_every: int = 12):
+        self.symbol = symbol
+        self.bar_seconds = int(bar_seconds)
+        self.clock = clock or get_clock()
+        self.tick_poll_s = float(tick_poll_s)
+        self.bar_grace_s = float(bar_grace_s)
+        self.report_every = int(report_every)
+        self.latency = LatencyStats()
+
+        self._bar_handlers: List[Callable] = []
+        self._tick_handlers: List[Callable] = []
+        self._periodic: List[tuple] = []
+        self._running = False
+        self._timers: List[tuple] = []          # heap of (deadline, seq, future)
+        self._seq = itertools.count()
+        self._offset: Optional[float] = None   # server − local, seconds
+        self._last_msc: Optional[int] = None
+        self._next_close: Optional[float] = None
+        self._bar_task: Optional[asyncio.Task] = None
+        self._bar_pending: Optional[tuple] = None   # latest bar closed while handlers were busy
+        self._inflight: set = set()                 # worker-thread calls not yet returned
+        self.bars = 0
+        self.coalesced = 0
+        self.ticks = 0
+
+    # ---------- Registration ----------
+    def on_bar(self, fn: Callable[[BarEvent], Any]) -> Callable:
+        """fn(BarEvent) on a worker thread; return something truthy when an order was sent."""
+        self._bar_handlers.append(fn)
+        return fn
+
+    def on_tick(self, fn: Callable[[TickEvent], Any]) -> Callable:
+        """fn(TickEvent) inline on the feed task: keep it cheap."""
+        self._tick_handlers.append(fn)
+        return fn
+
+    def every(self, seconds: float, fn: Callable[[], Any], name: Optional[str] = None) -> None:
+        """Run fn() now and then every `seconds` of clock time (on a worker thread)."""
+        self._periodic.append((name or getattr(fn, "__name__", "job"), float(seconds), fn))
+
+    def stop(self) -> None:
+        self._running = False
+
+    # ---------- Time ----------
+    async def _sleep(self, seconds: float) -> None:
+        if isinstance(self.clock, SimulatedClock):
+            self.clock.sleep(seconds)   # advances replay time (may raise StopReplay)
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(seconds)
+
+    def _wake_due(self, everyone: bool = False) -> None:
+        """Called by the feed after each poll: release jobs whose deadline passed."""
+        now = self.clock.time() + self.tick_poll_s / 2   # the poll nearest the deadline
+        while self._timers and (everyone or self._timers[0][0] <= now):
+            fut = heapq.heappop(self._timers)[2]
+            if not fut.done():
+                fut.set_result(None)
+
+    async def _until(self, deadline: float) -> None:
+        if self._running and self.clock.time() + self.tick_poll_s / 2 < deadline:
+            fut = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._timers, (deadline, next(self._seq), fut))
+            await fut
+
+    # ---------- Tasks ----------
+    async def _poll_feed(self) -> None:
+        tick = mt5.symbol_info_tick(self.symbol)
+        now = self.clock.time()
+        srv = now + (self._offset or 0.0)
+        if tick is not None and int(tick.time_msc) != self._last_msc:
+            t_srv = tick.time_msc / 1000.0
+            if self._offset is None:
+                self._offset = round((t_srv - now) / 1800.0) * 1800.0
+                srv = now + self._offset
+            self._last_msc = int(tick.time_msc)
+            self.ticks += 1
+            srv = max(srv, t_srv)
+            if self._tick_handlers:
+                ev = TickEvent(self.symbol, self._last_msc, float(tick.bid), float(tick.ask), now)
+                for fn in self._tick_handlers:
+                    await self._guard("tick", fn, ev, offload=False)
+        if self._next_close is None:
+            if self._offset is None:
+                return   # no tick yet: boundaries unknown
+            self._next_close = (math.floor(srv / self.bar_seconds) + 1) * self.bar_seconds
+            return
+        tick_closed = self._last_msc is not None and self._last_msc >= self._next_close * 1000
+        if tick_closed or srv >= self._next_close + self.bar_grace_s:
+            close = self._next_close
+            self._next_close = (math.floor(srv / self.bar_seconds) + 1) * self.bar_seconds
+            detected = (close, now, time.perf_counter())
+            if self._bar_task is not None and not self._bar_task.done():
+                if self._bar_pending is not None:
+                    self.coalesced += 1
+                self._bar_pending = detected
+            else:
+                self._bar_task = asyncio.create_task(self._run_bars(detected), name="bars")
+
+    async def _run_bars(self, detected: tuple) -> None:
+        while detected is not None:
+            await self._dispatch_bar(*detected)
+            detected, self._bar_pending = self._bar_pending, None
+
+    async def _dispatch_bar(self, close: float, detected: float, t0: float) -> None:
+        lag = (detected + (self._offset or 0.0) - close) * 1e3
+        ev = BarEvent(self.symbol, close, detected, lag)
+        self.bars += 1
+        self.latency.add("bar→detect", lag)
+        sent = False
+        for fn in self._bar_handlers:
+            sent = bool(await self._guard("bar", fn, ev)) or sent
+        # handler time on the wall clock, so replays (frozen clock) measure it too
+        done = lag + (time.perf_counter() - t0) * 1e3
+        self.latency.add("bar→decide", done)
+        if sent:
+            self.latency.add("bar→order", done)
+            logger.info(f"⚡ Order sent {done:.1f} ms after bar close")
+        if self.report_every and self.bars % self.report_every == 0:
+            self.latency.log()
+
+    async def _offload(self, fn: Callable, *args):
+        task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        return await task
+
+    async def _guard(self, kind: str, fn: Callable, *args, offload: bool = True):
+        try:
+            return await _call(fn, *args, offload=self._offload if offload else None)
+        except Exception as e:
+            logger.exception(f"⚠️ {kind} handler {getattr(fn, '__name__', fn)} failed: {e}")
+            return None
+
+    async def _settle(self) -> None:
+        """Replay only: let released jobs start, then wait for every in-flight handler."""
+        await asyncio.sleep(0)
+        busy = set(self._inflight)
+        if self._bar_task is not None and not self._bar_task.done():
+            busy.add(self._bar_task)
+        if busy:
+            await asyncio.wait(busy)
+
+    async def _feed_loop(self) -> None:
+        replay = isinstance(self.clock, SimulatedClock)
+        while self._running:
+            t0 = time.perf_counter()
+            await self._poll_feed()
+            self._wake_due(everyone=not self._running)
+            if replay:
+                await self._settle()
+            # live: keep the poll cadence; replay: every poll is one step of clock time
+            spent = 0.0 if replay else time.perf_counter() - t0
+            await self._sleep(max(0.0, self.tick_poll_s - spent))
+
+    async def _periodic_loop(self, name: str, seconds: float, fn: Callable) -> None:
+        due = self.clock.time()
+        while self._running:
+            await self._until(due)
+            if not self._running:
+                return
+            await self._guard(name, fn)
+            due += seconds
+            now = self.clock.time()
+            if due <= now:
+                due = now + seconds   # fell behind: skip, do not burst
+
+    async def run(self) -> None:
+        self._running = True
+        self._timers.clear()
+        logger.info(f"🕒 Event loop started | {self.symbol} | bar={self.bar_seconds}s | "
+                    f"tick poll={self.tick_poll_s * 1e3:.0f}ms | jobs={[p[0] for p in self._periodic]}")
+        tasks = [asyncio.create_task(self._feed_loop(), name="feed")]
+        tasks += [asyncio.create_task(self._periodic_loop(*p), name=p[0]) for p in self._periodic]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is not None:
+                    raise t.exception()
+        finally:
+            self._running = False
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # a handler already on a worker thread (an order in flight) is let finish
+            work = set(self._inflight)
+            if self._bar_task is not None:
+                self._bar_pending = None
+                work.add(self._bar_task)
+            await asyncio.gather(*work, return_exceptions=True)
+            self.latency.log()
+
+    def run_forever(self) -> None:
+        asyncio.run(self.run())
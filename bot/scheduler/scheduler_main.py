@@ -4,19 +4,22 @@
 # ─────────────────────────────────────────────────────────────────────────────
 
 from __future__ import annotations
-import time
 import MetaTrader5 as mt5
 from loguru import logger
 import os
 from dotenv import load_dotenv
 
 from bot.utils.config import load_yaml_config
+from bot.core.clock import get_clock
 from bot.engines.ai_signal_router import AISignalRouter
 from bot.engines.adaptive_feedback import AdaptiveFeedback
 from bot.executors.mt5_executor_adapter import MT5ExecutorAdapter
 from bot.executors.smart_trade_executor import SmartTradeExecutor, ExecContext
 from bot.executors.position_manager import PositionManager
 from bot.executors.trade_feedback_monitor import TradeFeedbackMonitor   # ← NEW
+from bot.scheduler.event_loop import EventScheduler, timeframe_seconds
+from bot.core.stage_graph import StageGraph
+from bot.utils.tracing import get_tracer
 
 
 # (optional) risk controllers
@@ -40,6 +43,13 @@ interval = int(config.get("interval", 120))     # seconds
 mode     = config.get("mode", "mt5")
 
 logger.info(f"Symbol : {symbol} | Interval : {interval}s | Mode : {mode}")
+
+trace_cfg = config.get("tracing", {}) or {}
+tracer = get_tracer().configure(
+    path=trace_cfg.get("path", "reports/latency_histograms.json"),
+    dump_every_s=float(trace_cfg.get("dump_s", 30)),
+    enabled=bool(trace_cfg.get("enabled", True)),
+)
 logger.info("──────────────────────────────────────────────────────────────────────────────")
 
 # Engines
@@ -68,181 +78,283 @@ sec = SmartExposureController() if SmartExposureController else None
 
 
 
+#── Cycle Steps ─────────────────────────────────────────────────────────────
+def decide_and_execute(confidence=None, latest_volatility=None):
+    """Steps 1–4: confidence → decision → gates → execution. Returns the STE result if an order was sent."""
+    # === STEP 1: Compute AI confidence & volatility (unless the cycle graph already did) ===
+    if confidence is None:
+        confidence = ai_signal_router.compute_confidence(symbol)
+    if latest_volatility is None:
+        latest_volatility = ai_signal_router.compute_volatility(symbol)
+
+    # 🧠 Step 2: Make decision based on current AI signal
+    decision = ai_signal_router.make_decision(confidence, vol=latest_volatility, mode="static")
+
+    # 🧩 Step 3: Apply confidence gates
+    min_conf, max_conf = 0.80, 0.50  # your thresholds
+
+    buy_ok = (confidence >= min_conf)
+    sell_ok = (confidence <= max_conf)
+
+    if not (buy_ok or sell_ok):
+        logger.info(
+            f"🕒 Skipped (low confidence) → action={decision['action']} | conf={confidence:.3f} | gate=[BUY≥{min_conf}, SELL≤{max_conf}]")
+    else:
+        logger.info(
+            f"📩 AI Decision → {decision['action']} | conf={confidence:.3f} | vol={latest_volatility:.3f}")
+
+    # ── NEW: static confidence gate (BUY ≥ min_conf, SELL ≤ 1 - min_conf)
+    dec_cfg = config.get("decision", {}) if isinstance(config, dict) else {}
+    mode = (dec_cfg.get("mode") or "static").lower()
+    min_conf = float(dec_cfg.get("min_conf", 0.80))
+    max_conf = float(dec_cfg.get("max_conf", 0.50))
+    buy_ok = (confidence >= min_conf)
+    sell_ok = (confidence <= max_conf)
+
+    # ...
+
+    # 4) Execute (string or dict decisions) with the gate
+    latest_action = None
+    exec_res = None
+    if isinstance(decision, str):
+        act = decision.upper()
+        if act == "BUY" and buy_ok:
+            latest_action = "BUY"
+            ctx = ExecContext(action=latest_action, confidence=float(conf), volatility=float(vol), lot=None)
+            exec_res = ste.execute(ctx)
+            logger.info(f"🔗 STE result → {exec_res}")
+        elif act == "SELL" and sell_ok:
+            latest_action = "SELL"
+            ctx = ExecContext(action=latest_action, confidence=float(conf), volatility=float(vol), lot=None)
+            exec_res = ste.execute(ctx)
+            logger.info(f"🔗 STE result → {exec_res}")
+        else:
+            logger.info(
+                f"🕒 Skipped (low confidence) → action={act} | conf={confidence:.3f} | gate=[BUY≥{min_conf:.2f}, SELL≤{1 - min_conf:.2f}]")
+
+    elif isinstance(decision, dict):
+        act = decision.get("action", "HOLD").upper()
+        # Use explicit conf/vol from router if provided; else fallback to measured
+        dconf = float(decision.get("confidence", confidence))
+        dvol = float(decision.get("volatility", latest_volatility))
+
+        if act == "BUY" and (dconf >= min_conf):
+            latest_action = "BUY"
+            ctx = ExecContext(action=latest_action, confidence=float(confidence), volatility=float(latest_volatility), lot=None)
+            exec_res = ste.execute(ctx)
+            logger.info(f"🔗 STE result → {exec_res}")
+        elif act == "SELL" and (dconf <= (1.0 - min_conf)):
+            latest_action = "SELL"
+            ctx = ExecContext(action=latest_action, confidence=dconf, volatility=dvol, lot=None)
+            exec_res = ste.execute(ctx)
+            logger.info(f"🔗 STE result → {exec_res}")
+        else:
+            logger.info(
+                f"🕒 Skipped (low confidence) → action={act} | conf={dconf:.3f} | gate=[BUY≥{min_conf:.2f}, SELL≤{1 - min_conf:.2f}]")
+    else:
+        logger.warning(f"Unexpected decision type: {type(decision)}")
+
+
+    # ─ Step 4: Execute trade if no open positions ─
+    if isinstance(decision, str):
+        act = decision.upper()
+        if act == "BUY" and buy_ok:
+            latest_action = "BUY"
+            ctx = ExecContext(action=latest_action, confidence=float(confidence),
+                              volatility=float(latest_volatility), lot=None)
+            exec_res = ste.execute(ctx)
+            logger.info(f"🔗 STE result → {exec_res}")
+        elif act == "SELL" and sell_ok:
+            latest_action = "SELL"
+            ctx = ExecContext(action=latest_action, confidence=float(confidence),
+                              volatility=float(latest_volatility), lot=None)
+            exec_res = ste.execute(ctx)
+            logger.info(f"🔗 STE result → {exec_res}")
+        else:
+            logger.info(
+                f"🕒 Skipped (low confidence) → action={act} | conf={confidence:.3f} | gate=[BUY≥{min_conf:.2f}, SELL≤{1 - min_conf:.2f}]")
+
+    return exec_res
+
+
+def daily_target_reached(account_info=None) -> bool:
+    """Compare live equity (fetched unless given) with the daily profit target."""
+    if account_info is None:
+        account_info = mt5.account_info()
+    if account_info:
+        current_equity = float(account_info.equity)
+        initial_equity = float(account_info.balance)  # use balance as base
+    else:
+        logger.warning("⚠️ Could not fetch MT5 account info; using fallback equity = 37000")
+        initial_equity = 37000.0
+        current_equity = initial_equity
+
+    # === Define profit target ===
+    target_pct = 0.10  # 2% daily target — change this value as you wish
+    target_equity = initial_equity * (1 + target_pct)
+
+    # === Log current state ===
+    logger.info(f"💰 Current Equity = {current_equity:.2f} | Target = {target_equity:.2f}")
+
+    # === Check if daily target reached ===
+    if current_equity >= target_equity:
+        logger.info(f"🎯 Daily profit target reached ({target_pct * 100:.1f}%). Pausing trading for today.")
+        return True  # safely exit today's session
+    return False
+
+
+#── Cycle Graph ─────────────────────────────────────────────────────────────
+def build_cycle_graph(polls: bool = True) -> StageGraph:
+    """
+    One cycle as a stage graph: terminal round trips and inference that do not
+    feed each other run concurrently; `decide` joins positions + confidence +
+    volatility, `target` only waits for the account info. polls=False leaves
+    deal polling and the equity check to the event loop's periodic jobs.
+    """
+    g = StageGraph(max_workers=int((config.get("stages") or {}).get("workers", 4)), name="cycle")
+    g.add("positions", lambda: pm.get_open_positions(symbol))
+    g.add("confidence", lambda: ai_signal_router.compute_confidence(symbol))
+    g.add("volatility", lambda: ai_signal_router.compute_volatility(symbol))
+    g.add("decide", lambda positions, conf, vol: None if positions else decide_and_execute(conf, vol),
+          deps=("positions", "confidence", "volatility"))
+    if polls:
+        g.add("deals", feedback_monitor.poll_closed_trades)
+        g.add("account", mt5.account_info)
+        g.add("target", daily_target_reached, deps=("account",))
+    return g
+
+
+def run_cycle(graph: StageGraph):
+    rep = graph.run()
+    for name, err in rep.errors.items():
+        logger.opt(exception=err).error(f"⚠️ Stage {name} failed: {err}")
+    logger.info(f"🧮 Cycle {rep.summary()}")
+    for name, t in rep.timings.items():
+        tracer.record(f"stage.{name}", t.duration)
+    tracer.record("cycle.wall", rep.wall)
+    tracer.maybe_dump()
+    return rep
+
+
 #── Main Loop ───────────────────────────────────────────────────────────────
-def run_scheduler():
+def run_scheduler(clock=None):
+    clock = clock or get_clock()
     logger.info("🕒 Scheduler started – Live Bridge Integration active")
     position_lock = False
+    cycle = build_cycle_graph()
     while True:
         try:
+            # === STEPS 0–6 run as one stage graph (positions, inference, deals, account in parallel) ===
+            rep = run_cycle(cycle)
 
             # === STEP 0: Trade Lock Check (prevents new trades while any are open) ===
-            open_positions = pm.get_open_positions(symbol)
+            open_positions = rep.results.get("positions")
             if open_positions:
                 if not position_lock:
                     position_lock = True
                     logger.info(f"🤖 Skipped → open position(s) detected for {symbol}. Logging the trade for Model running.")
                 else:
                     logger.info(f"🤖 Trade Learning → waiting for existing position(s) to close.")
-                time.sleep(120)
+                clock.sleep(120)
                 continue
             else:
                 if position_lock:
                     logger.info(f"✅ All positions closed → This trade was logged to learn by the XModel.")
                     position_lock = False
 
-            # === STEP 1: Compute AI confidence & volatility ===
-            confidence = ai_signal_router.compute_confidence(symbol)
-            latest_volatility = ai_signal_router.compute_volatility(symbol)
-
-            # 🧠 Step 2: Make decision based on current AI signal
-            decision = ai_signal_router.make_decision(confidence, vol=latest_volatility, mode="static")
-
-            # 🧩 Step 3: Apply confidence gates
-            min_conf, max_conf = 0.80, 0.50  # your thresholds
-
-            buy_ok = (confidence >= min_conf)
-            sell_ok = (confidence <= max_conf)
-
-            if not (buy_ok or sell_ok):
-                logger.info(
-                    f"🕒 Skipped (low confidence) → action={decision['action']} | conf={confidence:.3f} | gate=[BUY≥{min_conf}, SELL≤{max_conf}]")
-            else:
-                logger.info(
-                    f"📩 AI Decision → {decision['action']} | conf={confidence:.3f} | vol={latest_volatility:.3f}")
-
-            # ── NEW: static confidence gate (BUY ≥ min_conf, SELL ≤ 1 - min_conf)
-            dec_cfg = config.get("decision", {}) if isinstance(config, dict) else {}
-            mode = (dec_cfg.get("mode") or "static").lower()
-            min_conf = float(dec_cfg.get("min_conf", 0.80))
-            max_conf = float(dec_cfg.get("max_conf", 0.50))
-            buy_ok = (confidence >= min_conf)
-            sell_ok = (confidence <= max_conf)
-
-            # ...
-
-            # 4) Execute (string or dict decisions) with the gate
-            latest_action = None
-            if isinstance(decision, str):
-                act = decision.upper()
-                if act == "BUY" and buy_ok:
-                    latest_action = "BUY"
-                    ctx = ExecContext(action=latest_action, confidence=float(conf), volatility=float(vol), lot=None)
-                    exec_res = ste.execute(ctx)
-                    logger.info(f"🔗 STE result → {exec_res}")
-                elif act == "SELL" and sell_ok:
-                    latest_action = "SELL"
-                    ctx = ExecContext(action=latest_action, confidence=float(conf), volatility=float(vol), lot=None)
-                    exec_res = ste.execute(ctx)
-                    logger.info(f"🔗 STE result → {exec_res}")
-                else:
-                    logger.info(
-                        f"🕒 Skipped (low confidence) → action={act} | conf={confidence:.3f} | gate=[BUY≥{min_conf:.2f}, SELL≤{1 - min_conf:.2f}]")
-
-            elif isinstance(decision, dict):
-                act = decision.get("action", "HOLD").upper()
-                # Use explicit conf/vol from router if provided; else fallback to measured
-                dconf = float(decision.get("confidence", confidence))
-                dvol = float(decision.get("volatility", latest_volatility))
-
-                if act == "BUY" and (dconf >= min_conf):
-                    latest_action = "BUY"
-                    ctx = ExecContext(action=latest_action, confidence=float(confidence), volatility=float(latest_volatility), lot=None)
-                    exec_res = ste.execute(ctx)
-                    logger.info(f"🔗 STE result → {exec_res}")
-                elif act == "SELL" and (dconf <= (1.0 - min_conf)):
-                    latest_action = "SELL"
-                    ctx = ExecContext(action=latest_action, confidence=dconf, volatility=dvol, lot=None)
-                    exec_res = ste.execute(ctx)
-                    logger.info(f"🔗 STE result → {exec_res}")
-                else:
-                    logger.info(
-                        f"🕒 Skipped (low confidence) → action={act} | conf={dconf:.3f} | gate=[BUY≥{min_conf:.2f}, SELL≤{1 - min_conf:.2f}]")
-            else:
-                logger.warning(f"Unexpected decision type: {type(decision)}")
-
-
-            # ─ Step 4: Execute trade if no open positions ─
-            if isinstance(decision, str):
-                act = decision.upper()
-                if act == "BUY" and buy_ok:
-                    latest_action = "BUY"
-                    ctx = ExecContext(action=latest_action, confidence=float(confidence),
-                                      volatility=float(latest_volatility), lot=None)
-                    exec_res = ste.execute(ctx)
-                    logger.info(f"🔗 STE result → {exec_res}")
-                elif act == "SELL" and sell_ok:
-                    latest_action = "SELL"
-                    ctx = ExecContext(action=latest_action, confidence=float(confidence),
-                                      volatility=float(latest_volatility), lot=None)
-                    exec_res = ste.execute(ctx)
-                    logger.info(f"🔗 STE result → {exec_res}")
-                else:
-                    logger.info(
-                        f"🕒 Skipped (low confidence) → action={act} | conf={confidence:.3f} | gate=[BUY≥{min_conf:.2f}, SELL≤{1 - min_conf:.2f}]")
-
-            # 6) Poll closed trades → update AdaptiveFeedback with real outcomes
-            feedback_monitor.poll_closed_trades()
-
             # 7) Sleep
             # --- DAILY PROFIT TARGET CHECK ---
-            # Load current equity (either live from MT5 or from your portfolio_state.json)
-            def load_portfolio_equity():
-                try:
-                    import json, os
-                    path = os.path.join("D:\\XAU_Bot", "portfolio_state.json")
-                    if os.path.exists(path):
-                        with open(path, "r") as f:
-                            data = json.load(f)
-                            return data.get("equity", 0)
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not read portfolio equity: {e}")
-                return 0
-
-            # === Fetch Live Equity and Compute Daily Target ===
             try:
-                import MetaTrader5 as mt5
-                account_info = mt5.account_info()
-                if account_info:
-                    current_equity = float(account_info.equity)
-                    initial_equity = float(account_info.balance)  # use balance as base
-                else:
-                    logger.warning("⚠️ Could not fetch MT5 account info; using fallback equity = 37000")
-                    initial_equity = 37000.0
-                    current_equity = initial_equity
-
-                # === Define profit target ===
-                target_pct = 0.10  # 2% daily target — change this value as you wish
-                target_equity = initial_equity * (1 + target_pct)
-
-                # === Log current state ===
-                logger.info(f"💰 Current Equity = {current_equity:.2f} | Target = {target_equity:.2f}")
-
-                # === Check if daily target reached ===
-                if current_equity >= target_equity:
-                    logger.info(f"🎯 Daily profit target reached ({target_pct * 100:.1f}%). Pausing trading for today.")
+                if rep.results.get("target"):
                     return  # safely exit today's session
 
                 # === Continue scheduler ===
                 logger.info("🕒 Back check for trade running for 120s before next cycle …")
-                time.sleep(120)
+                clock.sleep(120)
 
             except KeyboardInterrupt:
                 logger.warning("🧭 Scheduler terminated manually.")
                 break
             except Exception as e:
                 logger.exception(f"⚠️ Scheduler error: {e}")
-                time.sleep(interval)
-
-
-
+                clock.sleep(interval)
 
         except KeyboardInterrupt:
             logger.warning("🧭 Scheduler terminated manually.")
             break
         except Exception as e:
             logger.exception(f"⚠️ Scheduler error: {e}")
-            time.sleep(interval)
+            clock.sleep(interval)
+
+
+#── Event Loop ──────────────────────────────────────────────────────────────
+def build_event_scheduler(clock=None) -> EventScheduler:
+    """
+    Bar-close driven variant of run_scheduler: decides as soon as a bar
+    completes; positions, closed trades and the daily target are polled by
+    separate periodic tasks.
+    """
+    ev_cfg = config.get("events", {}) or {}
+    exec_cfg = config.get("execution", {}) or {}
+    events = EventScheduler(
+        symbol,
+        bar_seconds=timeframe_seconds(ev_cfg.get("bar_timeframe", exec_cfg.get("timeframe", "M5"))),
+        clock=clock,
+        tick_poll_s=float(ev_cfg.get("tick_poll_ms", 50)) / 1000.0,
+        bar_grace_s=float(ev_cfg.get("bar_grace_s", 1.0)),
+        report_every=int(ev_cfg.get("latency_report_every", 12)),
+    )
+    state = {"position_lock": False}
+    cycle = build_cycle_graph(polls=False)
+
+    def poll_positions():
+        # === STEP 0: Trade Lock Check (prevents new trades while any are open) ===
+        if pm.get_open_positions(symbol):
+            if not state["position_lock"]:
+                state["position_lock"] = True
+                logger.info(f"🤖 Skipped → open position(s) detected for {symbol}. Logging the trade for Model running.")
+        elif state["position_lock"]:
+            logger.info(f"✅ All positions closed → This trade was logged to learn by the XModel.")
+            state["position_lock"] = False
+
+    def on_bar(ev):
+        if state["position_lock"]:
+            logger.info(f"🤖 Trade Learning → waiting for existing position(s) to close.")
+            return None
+        rep = run_cycle(cycle)
+        if rep.results.get("positions"):
+            state["position_lock"] = True
+            logger.info(f"🤖 Skipped → open position(s) detected for {symbol}. Logging the trade for Model running.")
+            return None
+        exec_res = rep.results.get("decide")
+        if exec_res:
+            state["position_lock"] = True   # until the next position poll says otherwise
+        return exec_res
+
+    def check_daily_target():
+        if daily_target_reached():
+            events.stop()  # safely exit today's session
+
+    events.on_bar(on_bar)
+    events.every(float(ev_cfg.get("position_poll_s", 5)), poll_positions, "positions")
+    events.every(float(ev_cfg.get("feedback_poll_s", 30)), feedback_monitor.poll_closed_trades, "feedback")
+    events.every(float(ev_cfg.get("equity_check_s", 60)), check_daily_target, "equity")
+    if tracer.enabled:
+        events.every(tracer.dump_every_s, tracer.dump, "trace")
+    return events
+
+
+def run_event_scheduler(clock=None) -> EventScheduler:
+    events = build_event_scheduler(clock)
+    try:
+        events.run_forever()
+    except KeyboardInterrupt:
+        logger.warning("🧭 Scheduler terminated manually.")
+    return events
 
 
 if __name__ == "__main__":
-    run_scheduler()
+    if (config.get("loop") or "events") == "events":
+        run_event_scheduler()
+    else:
+        run_scheduler()
@@ -0,0 +1,640 @@
+# ================================================================
+# File: bot/sim/fake_mt5.py
+# Purpose: Offline drop-in for the MetaTrader5 package (replay / benchmarking)
+# ================================================================
+"""
+Module-level API mirrors `MetaTrader5` so the real code paths run unchanged:
+
+    from bot.sim import fake_mt5
+    fake_mt5.install({"XAUUSD": TickStore("data/tick_store")}, aliases={"XAUUSD.sd": "XAUUSD"})
+    import MetaTrader5 as mt5          # → this module
+
+Market data comes from recorded ticks (TickStore, CSV path or DataFrame) and
+is only visible up to the simulated clock, so nothing can peek ahead. The
+clock is either stepped by hand (speed=0, the default) via advance()/set_time(),
+runs `speed` x faster than wall time, or follows any injected callable that
+returns epoch seconds.
+
+Calls are serialized on one lock per terminal, like the real terminal's IPC,
+so stages running on worker threads see consistent positions and deals.
+
+Orders fill at the current bid/ask with no slippage on a hedging account.
+Stops are evaluated on every tick the clock has passed since the previous
+call and close at the stop level, with MT5-style "[sl]" / "[tp]" deal comments.
+"""
+
+from __future__ import annotations
+import functools
+import sys
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bot.data.tick_bars import ticks_to_ohlcv
+from bot.data.tick_store import TickStore
+
+# ── Constants (values match the MetaTrader5 package) ────────────────────────
+TIMEFRAME_M1, TIMEFRAME_M2, TIMEFRAME_M3, TIMEFRAME_M4, TIMEFRAME_M5 = 1, 2, 3, 4, 5
+TIMEFRAME_M6, TIMEFRAME_M10, TIMEFRAME_M12, TIMEFRAME_M15 = 6, 10, 12, 15
+TIMEFRAME_M20, TIMEFRAME_M30 = 20, 30
+TIMEFRAME_H1, TIMEFRAME_H2, TIMEFRAME_H3, TIMEFRAME_H4 = 16385, 16386, 16387, 16388
+TIMEFRAME_H6, TIMEFRAME_H8, TIMEFRAME_H12 = 16390, 16392, 16396
+TIMEFRAME_D1 = 16408
+
+COPY_TICKS_ALL, COPY_TICKS_INFO, COPY_TICKS_TRADE = -1, 1, 2
+
+ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+# not in the real package, but bot/executors/position_manager.py uses them
+ORDER_BUY, ORDER_SELL = ORDER_TYPE_BUY, ORDER_TYPE_SELL
+POSITION_TYPE_BUY, POSITION_TYPE_SELL = 0, 1
+DEAL_TYPE_BUY, DEAL_TYPE_SELL = 0, 1
+DEAL_ENTRY_IN, DEAL_ENTRY_OUT = 0, 1
+
+TRADE_ACTION_DEAL, TRADE_ACTION_PENDING, TRADE_ACTION_SLTP = 1, 5, 6
+ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+ORDER_TIME_GTC, ORDER_TIME_DAY = 0, 1
+SYMBOL_TRADE_MODE_DISABLED, SYMBOL_TRADE_MODE_FULL = 0, 4
+
+TRADE_RETCODE_PLACED = 10008
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_MARKET_CLOSED = 10018
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_POSITION_CLOSED = 10036
+
+RES_S_OK, RES_E_FAIL, RES_E_NOT_FOUND, RES_E_INTERNAL_FAIL = 1, -1, -4, -10000
+
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+    ("volume", "<u8"), ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8"),
+])
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+# ── Result records (field subsets of the real MT5 named tuples) ─────────────
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+SymbolInfo = namedtuple(
+    "SymbolInfo",
+    "name visible select digits point spread trade_mode trade_contract_size "
+    "volume_min volume_max volume_step trade_tick_size trade_tick_value bid ask time",
+)
+AccountInfo = namedtuple(
+    "AccountInfo",
+    "login trade_mode leverage balance credit profit equity margin margin_free "
+    "margin_level currency server name company",
+)
+TerminalInfo = namedtuple("TerminalInfo", "connected trade_allowed name company path build")
+TradePosition = namedtuple(
+    "TradePosition",
+    "ticket time time_msc type magic identifier volume price_open sl tp "
+    "price_current swap profit symbol comment",
+)
+TradeDeal = namedtuple(
+    "TradeDeal",
+    "ticket order time time_msc type entry magic position_id volume price "
+    "commission swap profit fee symbol comment",
+)
+OrderSendResult = namedtuple(
+    "OrderSendResult", "retcode deal order volume price bid ask comment request_id request"
+)
+
+
+def _timeframe_seconds(tf: int) -> int:
+    if tf < 16384:
+        return tf * 60
+    if tf == TIMEFRAME_D1:
+        return 86_400
+    if tf < 32768:
+        return (tf - 16384) * 3600
+    raise ValueError(f"Unsupported timeframe: {tf}")
+
+
+def _to_seconds(t) -> float:
+    """datetime (naive = local, like MT5) / pandas Timestamp / epoch number → epoch seconds."""
+    if isinstance(t, datetime):
+        return t.timestamp()
+    return float(t)
+
+
+@dataclass
+class SymbolSpec:
+    digits: int = 2
+    point: float = 0.01
+    contract_size: float = 100.0
+    volume_min: float = 0.01
+    volume_max: float = 100.0
+    volume_step: float = 0.01
+
+
+@dataclass
+class _Position:
+    ticket: int
+    symbol: str
+    type: int
+    volume: float
+    price_open: float
+    time_msc: int
+    tick_idx: int
+    sl: float = 0.0
+    tp: float = 0.0
+    magic: int = 0
+    comment: str = ""
+
+
+class _Feed:
+    """Recorded ticks for one symbol, held as contiguous arrays."""
+
+    def __init__(self, name: str, source, spec: SymbolSpec):
+        self.name = name
+        self.spec = spec
+        if isinstance(source, TickStore):
+            cols = {c: np.array(v) for c, v in source.read(name).items()}
+        else:
+            df = pd.read_csv(source) if isinstance(source, (str, Path)) else source
+            cols = {c: df[c].to_numpy() for c in df.columns}
+        msc = np.asarray(cols["time_msc"], dtype=np.int64)
+        order = np.argsort(msc, kind="stable")
+        n = len(msc)
+
+        vol = cols.get("volume_real", cols.get("volume"))
+        self.ticks = np.zeros(n, dtype=TICK_DTYPE)
+        self.ticks["time_msc"] = msc[order]
+        self.ticks["time"] = self.ticks["time_msc"] // 1000
+        for c in ("bid", "ask", "last", "flags"):
+            if c in cols:
+                self.ticks[c] = np.asarray(cols[c])[order]
+        if vol is not None:
+            self.ticks["volume_real"] = np.asarray(vol, dtype=np.float64)[order]
+            self.ticks["volume"] = self.ticks["volume_real"].astype(np.uint64)
+        self.msc = np.ascontiguousarray(self.ticks["time_msc"])  # a strided field view makes searchsorted copy
+        self._bars: Dict[int, pd.DataFrame] = {}
+
+    def index_at(self, now_msc: int) -> int:
+        """Index of the last tick at or before now_msc (-1 if none yet)."""
+        return int(np.searchsorted(self.msc, now_msc, side="right")) - 1
+
+    def bars(self, tf: int, hi: int) -> np.ndarray:
+        """Rates for ticks[:hi+1]; closed bars are aggregated once and cached."""
+        if hi < 0:
+            return np.zeros(0, dtype=RATES_DTYPE)
+        bar_ms = _timeframe_seconds(tf) * 1000
+        full = self._bars.get(tf)
+        if full is None:
+            t = self.ticks
+            full = ticks_to_ohlcv(t["time_msc"], t["bid"], bar_ms=bar_ms,
+                                  volume=t["volume_real"], bid=t["bid"], ask=t["ask"])
+            self._bars[tf] = full
+
+        start_ms = int(self.msc[hi]) // bar_ms * bar_ms
+        closed = full[full.index < pd.Timestamp(start_ms, unit="ms", tz="UTC")]
+        lo = int(np.searchsorted(self.msc, start_ms, side="left"))
+        t = self.ticks[lo:hi + 1]
+        forming = ticks_to_ohlcv(t["time_msc"], t["bid"], bar_ms=bar_ms,
+                                 volume=t["volume_real"], bid=t["bid"], ask=t["ask"])
+        df = pd.concat([closed, forming])
+
+        out = np.zeros(len(df), dtype=RATES_DTYPE)
+        out["time"] = df.index.asi8 // 1_000_000_000
+        for c in ("open", "high", "low", "close"):
+            out[c] = df[c].to_numpy()
+        out["tick_volume"] = df["tick_count"].to_numpy()
+        out["real_volume"] = df["volume"].to_numpy()
+        out["spread"] = np.rint(df["spread_mean"].to_numpy() / self.spec.point)
+        return out
+
+
+class FakeTerminal:
+    """State behind the module-level functions: feeds, clock, account, positions, deals."""
+
+    def __init__(
+        self,
+        symbols: Dict[str, object],
+        start: Optional[float] = None,
+        speed: float = 0.0,
+        clock: Optional[Callable[[], float]] = None,
+        balance: float = 10_000.0,
+        leverage: int = 100,
+        aliases: Optional[Dict[str, str]] = None,
+        specs: Optional[Dict[str, SymbolSpec]] = None,
+    ):
+        specs = specs or {}
+        self.feeds = {s: _Feed(s, src, specs.get(s, SymbolSpec())) for s, src in symbols.items()}
+        self.aliases = dict(aliases or {})
+        firsts = [int(f.msc[0]) for f in self.feeds.values() if len(f.msc)]
+        self.start = float(start) if start is not None else (min(firsts) / 1000 if firsts else time.time())
+        self.speed = float(speed)
+        self._clock = clock
+        self._offset = 0.0
+        self._wall0 = time.perf_counter()
+
+        self.balance = float(balance)
+        self.leverage = int(leverage)
+        self.positions: Dict[int, _Position] = {}
+        self.deals: List[TradeDeal] = []
+        self._next_ticket = 100_000
+        self.connected = False
+        self.error = (RES_S_OK, "Success")
+        self.lock = threading.RLock()
+
+    # ---------- Clock ----------
+    def now(self) -> float:
+        if self._clock is not None:
+            return float(self._clock())
+        t = self.start + self._offset
+        if self.speed > 0:
+            t += (time.perf_counter() - self._wall0) * self.speed
+        return t
+
+    def advance(self, seconds: float):
+        with self.lock:
+            self._offset += float(seconds)
+            self._sync()
+
+    def set_time(self, t):
+        with self.lock:
+            self._offset += _to_seconds(t) - self.now()
+            self._sync()
+
+    def now_msc(self) -> int:
+        return int(round(self.now() * 1000))
+
+    # ---------- Lookups ----------
+    def feed(self, symbol: str) -> Optional[_Feed]:
+        f = self.feeds.get(self.aliases.get(symbol, symbol))
+        if f is None:
+            self.error = (RES_E_NOT_FOUND, f"Symbol {symbol} not found")
+        return f
+
+    def _ticket(self) -> int:
+        self._next_ticket += 1
+        return self._next_ticket
+
+    def _profit(self, pos: _Position, price: float, volume: Optional[float] = None) -> float:
+        sign = 1.0 if pos.type == POSITION_TYPE_BUY else -1.0
+        vol = pos.volume if volume is None else volume
+        return sign * (price - pos.price_open) * vol * self.feeds[pos.symbol].spec.contract_size
+
+    def _mark(self, pos: _Position) -> float:
+        f = self.feeds[pos.symbol]
+        i = f.index_at(self.now_msc())
+        t = f.ticks[max(i, 0)]
+        return float(t["bid"] if pos.type == POSITION_TYPE_BUY else t["ask"])
+
+    # ---------- Stops ----------
+    def _sync(self):
+        """Close positions whose SL/TP was touched by any tick the clock has passed."""
+        if not self.positions:
+            return
+        now = self.now_msc()
+        for pos in list(self.positions.values()):
+            if not (pos.sl or pos.tp):
+                continue
+            f = self.feeds[pos.symbol]
+            hi = f.index_at(now)
+            if hi <= pos.tick_idx:
+                continue
+            seg = f.ticks[pos.tick_idx + 1:hi + 1]
+            if pos.type == POSITION_TYPE_BUY:
+                px = seg["bid"]
+                sl_hit = (px <= pos.sl) if pos.sl else np.zeros(len(px), bool)
+                tp_hit = (px >= pos.tp) if pos.tp else np.zeros(len(px), bool)
+            else:
+                px = seg["ask"]
+                sl_hit = (px >= pos.sl) if pos.sl else np.zeros(len(px), bool)
+                tp_hit = (px <= pos.tp) if pos.tp else np.zeros(len(px), bool)
+            hits = np.flatnonzero(sl_hit | tp_hit)
+            if len(hits) == 0:
+                pos.tick_idx = hi
+                continue
+            k = int(hits[0])
+            is_sl = bool(sl_hit[k])
+            self._close(pos, pos.volume, pos.sl if is_sl else pos.tp,
+                        int(seg["time_msc"][k]), "[sl]" if is_sl else "[tp]")
+
+    def _close(self, pos: _Position, volume: float, price: float, time_msc: int, comment: str) -> TradeDeal:
+        profit = round(self._profit(pos, price, volume), 2)
+        self.balance += profit
+        ticket = self._ticket()
+        deal = TradeDeal(
+            ticket=ticket, order=ticket, time=time_msc // 1000, time_msc=time_msc,
+            type=DEAL_TYPE_SELL if pos.type == POSITION_TYPE_BUY else DEAL_TYPE_BUY,
+            entry=DEAL_ENTRY_OUT, magic=pos.magic, position_id=pos.ticket, volume=volume,
+            price=price, commission=0.0, swap=0.0, profit=profit, fee=0.0,
+            symbol=pos.symbol, comment=comment,
+        )
+        self.deals.append(deal)
+        pos.volume = round(pos.volume - volume, 8)
+        if pos.volume <= 0:
+            del self.positions[pos.ticket]
+        return deal
+
+    # ---------- Account ----------
+    def floating(self) -> float:
+        return sum(self._profit(p, self._mark(p)) for p in self.positions.values())
+
+    def margin(self) -> float:
+        return sum(
+            p.volume * self.feeds[p.symbol].spec.contract_size * p.price_open / self.leverage
+            for p in self.positions.values()
+        )
+
+    # ---------- Trading ----------
+    def order_send(self, request: dict) -> Optional[OrderSendResult]:
+        self._sync()
+        action = request.get("action")
+        f = self.feed(request.get("symbol", ""))
+        if f is None:
+            return None
+        i = f.index_at(self.now_msc())
+
+        def result(code, comment, deal=0, volume=0.0, price=0.0):
+            bid, ask = (float(f.ticks["bid"][i]), float(f.ticks["ask"][i])) if i >= 0 else (0.0, 0.0)
+            return OrderSendResult(code, deal, deal, volume, price, bid, ask, comment, 0, request)
+
+        if i < 0:
+            return result(TRADE_RETCODE_MARKET_CLOSED, "Market closed")
+        tick = f.ticks[i]
+
+        if action == TRADE_ACTION_SLTP:
+            pos = self.positions.get(int(request.get("position", 0)))
+            if pos is None:
+                return result(TRADE_RETCODE_POSITION_CLOSED, "Position doesn't exist")
+            pos.sl = float(request.get("sl") or 0.0)
+            pos.tp = float(request.get("tp") or 0.0)
+            pos.tick_idx = max(pos.tick_idx, i)
+            return result(TRADE_RETCODE_DONE, "Request executed")
+
+        if action != TRADE_ACTION_DEAL:
+            return result(TRADE_RETCODE_INVALID, "Invalid request")
+
+        volume = float(request.get("volume") or 0.0)
+        if volume < f.spec.volume_min or volume > f.spec.volume_max:
+            return result(TRADE_RETCODE_INVALID_VOLUME, "Invalid volume")
+        otype = request.get("type")
+        price = float(tick["ask"] if otype == ORDER_TYPE_BUY else tick["bid"])
+        now_msc = int(tick["time_msc"])
+
+        # closing (fully or partly) an existing position
+        if request.get("position"):
+            pos = self.positions.get(int(request["position"]))
+            if pos is None:
+                return result(TRADE_RETCODE_POSITION_CLOSED, "Position doesn't exist")
+            deal = self._close(pos, min(volume, pos.volume), price, now_msc, request.get("comment", ""))
+            return result(TRADE_RETCODE_DONE, "Request executed", deal.ticket, deal.volume, price)
+
+        if otype not in (ORDER_TYPE_BUY, ORDER_TYPE_SELL):
+            return result(TRADE_RETCODE_INVALID, "Invalid order type")
+        sl, tp = float(request.get("sl") or 0.0), float(request.get("tp") or 0.0)
+        if otype == ORDER_TYPE_BUY and ((sl and sl >= price) or (tp and tp <= price)):
+            return result(TRADE_RETCODE_INVALID_STOPS, "Invalid stops")
+        if otype == ORDER_TYPE_SELL and ((sl and sl <= price) or (tp and tp >= price)):
+            return result(TRADE_RETCODE_INVALID_STOPS, "Invalid stops")
+
+        need = volume * f.spec.contract_size * price / self.leverage
+        if self.balance + self.floating() - self.margin() < need:
+            return result(TRADE_RETCODE_NO_MONEY, "No money")
+
+        ticket = self._ticket()
+        self.positions[ticket] = _Position(
+            ticket=ticket, symbol=f.name, type=otype, volume=volume, price_open=price,
+            time_msc=now_msc, tick_idx=i, sl=sl, tp=tp,
+            magic=int(request.get("magic", 0)), comment=str(request.get("comment", "")),
+        )
+        self.deals.append(TradeDeal(
+            ticket=ticket, order=ticket, time=now_msc // 1000, time_msc=now_msc, type=otype,
+            entry=DEAL_ENTRY_IN, magic=int(request.get("magic", 0)), position_id=ticket,
+            volume=volume, price=price, commission=0.0, swap=0.0, profit=0.0, fee=0.0,
+            symbol=f.name, comment=str(request.get("comment", "")),
+        ))
+        return result(TRADE_RETCODE_DONE, "Request executed", ticket, volume, price)
+
+
+# ── Module-level API ────────────────────────────────────────────────────────
+_terminal: Optional[FakeTerminal] = None
+
+
+def install(symbols: Dict[str, object], **kwargs) -> FakeTerminal:
+    """
+    Create the terminal and register this module as `MetaTrader5`.
+    Call before importing any bot module that does `import MetaTrader5`.
+    kwargs go to FakeTerminal (start, speed, clock, balance, aliases, specs).
+    """
+    global _terminal
+    _terminal = FakeTerminal(symbols, **kwargs)
+    sys.modules["MetaTrader5"] = sys.modules[__name__]
+    return _terminal
+
+
+def terminal() -> FakeTerminal:
+    if _terminal is None:
+        raise RuntimeError("fake_mt5.install() has not been called")
+    return _terminal
+
+
+def _serialized(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with terminal().lock:
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def initialize(path=None, login=None, password=None, server=None, timeout=None, portable=False) -> bool:
+    t = terminal()
+    t.connected = True
+    t.error = (RES_S_OK, "Success")
+    return True
+
+
+def shutdown():
+    if _terminal is not None:
+        _terminal.connected = False
+
+
+def last_error():
+    return terminal().error
+
+
+def version():
+    return (500, 4000, "replay")
+
+
+def terminal_info() -> TerminalInfo:
+    t = terminal()
+    return TerminalInfo(t.connected, True, "XAU_Bot replay", "offline", "", 4000)
+
+
+@_serialized
+def account_info() -> Optional[AccountInfo]:
+    t = terminal()
+    t._sync()
+    floating = round(t.floating(), 2)
+    margin = round(t.margin(), 2)
+    equity = round(t.balance + floating, 2)
+    return AccountInfo(
+        login=1, trade_mode=0, leverage=t.leverage, balance=round(t.balance, 2), credit=0.0,
+        profit=floating, equity=equity, margin=margin, margin_free=round(equity - margin, 2),
+        margin_level=(equity / margin * 100.0) if margin else 0.0, currency="USD",
+        server="Replay", name="replay", company="offline",
+    )
+
+
+@_serialized
+def symbols_get(group=None):
+    return tuple(symbol_info(s) for s in terminal().feeds)
+
+
+@_serialized
+def symbol_select(symbol: str, enable: bool = True) -> bool:
+    return terminal().feed(symbol) is not None
+
+
+@_serialized
+def symbol_info(symbol: str) -> Optional[SymbolInfo]:
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    i = f.index_at(t.now_msc())
+    tk = f.ticks[i] if i >= 0 else np.zeros(1, TICK_DTYPE)[0]
+    s = f.spec
+    return SymbolInfo(
+        name=symbol, visible=True, select=True, digits=s.digits, point=s.point,
+        spread=int(round((tk["ask"] - tk["bid"]) / s.point)), trade_mode=SYMBOL_TRADE_MODE_FULL,
+        trade_contract_size=s.contract_size, volume_min=s.volume_min, volume_max=s.volume_max,
+        volume_step=s.volume_step, trade_tick_size=s.point, trade_tick_value=s.point * s.contract_size,
+        bid=float(tk["bid"]), ask=float(tk["ask"]), time=int(tk["time"]),
+    )
+
+
+@_serialized
+def symbol_info_tick(symbol: str) -> Optional[Tick]:
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    i = f.index_at(t.now_msc())
+    if i < 0:
+        return None
+    return Tick(*f.ticks[i].tolist())
+
+
+@_serialized
+def copy_ticks_range(symbol: str, date_from, date_to, flags: int = COPY_TICKS_ALL):
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    lo_ms = int(_to_seconds(date_from) * 1000)
+    hi_ms = min(int(_to_seconds(date_to) * 1000), t.now_msc())
+    lo = int(np.searchsorted(f.msc, lo_ms, side="left"))
+    hi = int(np.searchsorted(f.msc, hi_ms, side="right"))
+    return f.ticks[lo:max(lo, hi)].copy()
+
+
+@_serialized
+def copy_ticks_from(symbol: str, date_from, count: int, flags: int = COPY_TICKS_ALL):
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    lo = int(np.searchsorted(f.msc, int(_to_seconds(date_from) * 1000), side="left"))
+    hi = min(lo + int(count), f.index_at(t.now_msc()) + 1)
+    return f.ticks[lo:max(lo, hi)].copy()
+
+
+@_serialized
+def copy_rates_from(symbol: str, timeframe: int, date_from, count: int):
+    """`count` bars ending at the bar that contains date_from (capped at the clock)."""
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    rates = f.bars(timeframe, f.index_at(t.now_msc()))
+    cut = int(np.searchsorted(rates["time"], _to_seconds(date_from), side="right"))
+    return rates[max(0, cut - int(count)):cut].copy()
+
+
+@_serialized
+def copy_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int):
+    """`count` bars ending `start_pos` bars back from the current (forming) bar."""
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    rates = f.bars(timeframe, f.index_at(t.now_msc()))
+    end = len(rates) - int(start_pos)
+    return rates[max(0, end - int(count)):max(0, end)].copy()
+
+
+@_serialized
+def copy_rates_range(symbol: str, timeframe: int, date_from, date_to):
+    t = terminal()
+    f = t.feed(symbol)
+    if f is None:
+        return None
+    rates = f.bars(timeframe, f.index_at(t.now_msc()))
+    lo = int(np.searchsorted(rates["time"], _to_seconds(date_from), side="left"))
+    hi = int(np.searchsorted(rates["time"], _to_seconds(date_to), side="right"))
+    return rates[lo:max(lo, hi)].copy()
+
+
+@_serialized
+def order_send(request: dict) -> Optional[OrderSendResult]:
+    return terminal().order_send(request)
+
+
+def positions_total() -> int:
+    return len(positions_get())
+
+
+@_serialized
+def positions_get(symbol: str = None, ticket: int = None, group: str = None):
+    t = terminal()
+    t._sync()
+    if symbol is not None:
+        f = t.feed(symbol)
+        if f is None:
+            return ()
+    out = []
+    for p in t.positions.values():
+        if symbol is not None and p.symbol != f.name:
+            continue
+        if ticket is not None and p.ticket != ticket:
+            continue
+        px = t._mark(p)
+        out.append(TradePosition(
+            ticket=p.ticket, time=p.time_msc // 1000, time_msc=p.time_msc, type=p.type,
+            magic=p.magic, identifier=p.ticket, volume=p.volume, price_open=p.price_open,
+            sl=p.sl, tp=p.tp, price_current=px, swap=0.0, profit=round(t._profit(p, px), 2),
+            symbol=p.symbol, comment=p.comment,
+        ))
+    return tuple(out)
+
+
+def orders_get(symbol: str = None, ticket: int = None, group: str = None):
+    return ()
+
+
+@_serialized
+def history_deals_get(date_from=None, date_to=None, group: str = None, ticket: int = None, position: int = None):
+    t = terminal()
+    t._sync()
+    if ticket is not None:
+        return tuple(d for d in t.deals if d.order == ticket)
+    if position is not None:
+        return tuple(d for d in t.deals if d.position_id == position)
+    lo = _to_seconds(date_from) * 1000 if date_from is not None else 0
+    hi = _to_seconds(date_to) * 1000 if date_to is not None else float("inf")
+    return tuple(d for d in t.deals if lo <= d.time_msc <= hi)
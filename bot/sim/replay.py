@@ -0,0 +1,107 @@
+# ================================================================
+# File: bot/sim/replay.py
+# Purpose: Run scheduler_main on recorded ticks in simulated time
+# Usage:   python -m bot.sim.replay --ticks data/raw_ticks/XAUUSD_ticks.csv --speed 0
+#          python -m bot.sim.replay --ticks data/tick_store --symbol XAUUSD --speed 1000
+#          python -m bot.sim.replay --loop sleep      # legacy 120 s loop
+# ================================================================
+"""
+Installs the fake MetaTrader5 module, swaps in a SimulatedClock and then
+imports the real scheduler, so every `clock.sleep(120)` (or event-loop tick
+poll) advances replay time instead of blocking. speed=0 runs as fast as the CPU allows; the run ends with
+StopReplay when the clock passes the last recorded tick (or --hours).
+
+Note: the scheduler writes the same state/report files as a live session.
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bot.core.clock import SimulatedClock, StopReplay, set_clock
+from bot.data.tick_store import TickStore
+from bot.sim import fake_mt5
+
+
+class TimedClock(SimulatedClock):
+    """SimulatedClock that records the wall time spent between sleeps (= one cycle)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cycle_wall: list[float] = []
+        self._mark = time.perf_counter()
+
+    def sleep(self, seconds: float):
+        now = time.perf_counter()
+        self.cycle_wall.append(now - self._mark)
+        try:
+            super().sleep(seconds)
+        finally:
+            self._mark = time.perf_counter()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay scheduler_main on recorded ticks")
+    ap.add_argument("--ticks", default="data/raw_ticks/XAUUSD_ticks.csv", help="tick CSV or TickStore root")
+    ap.add_argument("--symbol", default="XAUUSD", help="recorded symbol name")
+    ap.add_argument("--alias", default="XAUUSD.sd", help="broker symbol the config trades")
+    ap.add_argument("--speed", type=float, default=0.0, help="x real time; 0 = unthrottled")
+    ap.add_argument("--warmup-min", type=float, default=60.0, help="history before the first cycle")
+    ap.add_argument("--hours", type=float, default=None, help="replay length (default: to last tick)")
+    ap.add_argument("--balance", type=float, default=10_000.0)
+    ap.add_argument("--loop", default="events", choices=["events", "sleep"],
+                    help="bar-close event loop or the legacy fixed-sleep loop")
+    args = ap.parse_args()
+
+    src = Path(args.ticks)
+    source = TickStore(src) if src.is_dir() else src
+    # the replay window comes from the data, so the terminal reads the clock lazily
+    term = fake_mt5.install(
+        {args.symbol: source}, clock=lambda: clock.time(), balance=args.balance,
+        aliases={args.alias: args.symbol},
+    )
+    msc = term.feeds[args.symbol].msc
+    start, last = msc[0] / 1000 + args.warmup_min * 60, msc[-1] / 1000
+    stop_at = min(last, start + args.hours * 3600) if args.hours else last
+    clock = set_clock(TimedClock(start=start, speed=args.speed, stop_at=stop_at))
+
+    # MT5ExecutorAdapter.connect() insists on an existing terminal path
+    os.environ.setdefault("MT5_TERMINAL_PATH", str(src.resolve()))
+    os.environ.setdefault("MT5_SYMBOL", args.alias)
+
+    sim_start = clock.time()
+    wall0 = time.perf_counter()
+    events = None
+    try:
+        from bot.scheduler import scheduler_main
+        if args.loop == "events":
+            events = scheduler_main.build_event_scheduler(clock)
+            events.run_forever()
+        else:
+            scheduler_main.run_scheduler(clock)
+    except StopReplay:
+        pass
+    wall = time.perf_counter() - wall0
+
+    sim = clock.time() - sim_start
+    cycles = np.array(clock.cycle_wall[1:] or [0.0]) * 1e3     # first entry includes imports
+    acc = fake_mt5.account_info()
+    print(f"\nSimulated {sim / 3600:.2f} h in {wall:.2f} s wall → {sim / max(wall, 1e-9):,.0f}x real time")
+    if events is not None:
+        print(f"Bars: {events.bars} | ticks seen: {events.ticks} | polls: {len(clock.cycle_wall)}")
+        for name, st in events.latency.summary().items():
+            print(f"  {name:<11} n={st['n']:<5} p50={st['p50']:.2f} ms  p95={st['p95']:.2f} ms  "
+                  f"p99={st['p99']:.2f} ms  max={st['max']:.2f} ms")
+    else:
+        print(f"Cycles: {len(clock.cycle_wall)} | cycle wall ms p50={np.percentile(cycles, 50):.2f} "
+              f"p95={np.percentile(cycles, 95):.2f} max={cycles.max():.2f}")
+    print(f"Deals: {len(term.deals)} | open positions: {len(term.positions)} | "
+          f"balance={acc.balance:.2f} equity={acc.equity:.2f}")
+
+
+if __name__ == "__main__":
+    main()
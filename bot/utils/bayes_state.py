@@ -0,0 +1,181 @@
+# D:\XAU_Bot\bot\utils\bayes_state.py
+"""
+One in-process owner for bayes_state.json.
+
+BayesianFusion, BayesianMemory, both AdaptiveFeedback classes, ThresholdTuner
+and BayesianConfidenceEngine all hold `svc.state` — the *same* dict — so reads
+are plain in-memory lookups and every module sees the others' updates.
+
+Writers wrap a read-modify-write in the symbol's lock and mark it dirty:
+
+    svc = get_bayes_state("bayes_state.json")
+    with svc.lock(symbol):
+        node = svc.state.setdefault(symbol, {...})
+        node["a"] += 1.0
+    svc.mark_dirty(symbol)
+
+Signal nodes (state[symbol]["signals"][name]) decay lazily with time and are
+flattened by drift epochs (BayesianMemory configures both). Every reader and
+writer of a signal goes through the service so they all see the same values:
+
+    a, b = svc.beta(symbol, node)             # read: decayed view
+    with svc.lock(symbol):
+        node = svc.materialize(symbol, node)  # write: fold decay in, stamp t/epoch
+        node["a"] += 1.0
+
+Dirty symbols are flushed together (one WAL record, see wal_store.py) after
+`flush_interval` seconds or once `max_dirty` symbols are pending, so a burst of
+updates to one symbol costs a single small append. flush() forces it; pending
+changes are also flushed at interpreter exit.
+"""
+
+from __future__ import annotations
+import atexit
+import copy
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from bot.core.clock import get_clock
+from bot.utils.wal_store import open_store
+
+logger = logging.getLogger(__name__)
+
+
+class BayesStateService:
+    def __init__(self, path: str = "bayes_state.json", flush_interval: float = 0.25, max_dirty: int = 64):
+        self.path = path
+        self.flush_interval = float(flush_interval)
+        self.max_dirty = int(max_dirty)
+        self._store = open_store(path)
+        self.state: Dict[str, dict] = self._store.load()
+
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self._dirty: set = set()
+        self._dirty_guard = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.decay = 1.0              # per decay_period_s; 1.0 = no time decay
+        self.decay_period_s = 3600.0
+        self._clock = None            # None → the process clock at call time
+        atexit.register(self.flush)
+
+    # ---------- Locking ----------
+    def _lock_for(self, symbol: str) -> threading.RLock:
+        lock = self._locks.get(symbol)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(symbol, threading.RLock())
+        return lock
+
+    @contextmanager
+    def lock(self, symbol: str):
+        """Exclusive access to state[symbol] for a read-modify-write."""
+        with self._lock_for(symbol):
+            yield self.state
+
+    # ---------- Signal decay / drift ----------
+    def configure_decay(self, decay: float, decay_period_s: float, clock=None) -> None:
+        self.decay = float(decay)
+        self.decay_period_s = float(decay_period_s)
+        if clock is not None:
+            self._clock = clock
+
+    def now(self) -> float:
+        return (self._clock or get_clock()).time()
+
+    def beta(self, symbol: str, node: dict, now: Optional[float] = None) -> Tuple[float, float]:
+        """(a, b) of a signal node as of `now`: pending drift flattening and time decay applied."""
+        now = self.now() if now is None else now
+        a, b = float(node["a"]), float(node["b"])
+        t = float(node.get("t", now))
+        drift = self.state.get(symbol, {}).get("drift_epoch") or {"n": 0, "t": now}
+        pending = int(drift["n"]) - int(node.get("epoch", 0))
+        if pending > 0:
+            # decay up to the (latest) drift, flatten once per missed epoch, then decay on
+            td = max(t, float(drift["t"]))
+            f = self.decay ** ((td - t) / self.decay_period_s)
+            flat = 0.5 ** pending
+            a = 50 + (a * f - 50) * flat
+            b = 50 + (b * f - 50) * flat
+            t = td
+        f = self.decay ** (max(0.0, now - t) / self.decay_period_s)
+        return a * f, b * f
+
+    def materialize(self, symbol: str, node: dict, now: Optional[float] = None) -> dict:
+        """Fold decay/drift into the stored a/b before a write (caller holds the symbol lock)."""
+        now = self.now() if now is None else now
+        node["a"], node["b"] = self.beta(symbol, node, now)
+        node["t"] = now
+        node["epoch"] = int((self.state.get(symbol, {}).get("drift_epoch") or {"n": 0})["n"])
+        return node
+
+    def bump_drift(self, symbol: str, now: Optional[float] = None) -> int:
+        """Flatten every signal of `symbol` once, lazily (caller holds the symbol lock)."""
+        sym = self.state[symbol]
+        n = int((sym.get("drift_epoch") or {"n": 0})["n"]) + 1
+        sym["drift_epoch"] = {"n": n, "t": self.now() if now is None else now}
+        return n
+
+    # ---------- Flushing ----------
+    def mark_dirty(self, symbol: str) -> None:
+        with self._dirty_guard:
+            self._dirty.add(symbol)
+            n = len(self._dirty)
+            if n < self.max_dirty and self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if n >= self.max_dirty or self.flush_interval <= 0:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all dirty symbols as one delta record; returns how many."""
+        with self._dirty_guard:
+            dirty, self._dirty = self._dirty, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not dirty:
+            return 0
+        updates = []
+        for symbol in sorted(dirty):
+            with self._lock_for(symbol):
+                if symbol in self.state:
+                    updates.append(([symbol], copy.deepcopy(self.state[symbol])))
+        try:
+            self._store.record_many(updates)
+        except Exception as e:
+            logger.error("❌ Failed to flush %s → %s", self.path, e)
+            with self._dirty_guard:
+                self._dirty |= dirty
+        return len(updates)
+
+    def save_all(self) -> None:
+        """Full snapshot of the in-memory state (drops the update log)."""
+        with self._dirty_guard:
+            self._dirty.clear()
+        with self._locks_guard:
+            symbols = list(self.state)
+        snapshot = {}
+        for symbol in symbols:
+            with self._lock_for(symbol):
+                if symbol in self.state:
+                    snapshot[symbol] = copy.deepcopy(self.state[symbol])
+        self._store.replace_all(snapshot)
+
+
+_services: Dict[str, BayesStateService] = {}
+_services_lock = threading.Lock()
+
+
+def get_bayes_state(path="bayes_state.json", **kwargs) -> BayesStateService:
+    """Process-wide BayesStateService for `path` (kwargs only apply on first use)."""
+    key = os.path.abspath(path)
+    with _services_lock:
+        svc = _services.get(key)
+        if svc is None:
+            svc = _services[key] = BayesStateService(str(path), **kwargs)
+        return svc
@@ -0,0 +1,125 @@
+# D:\XAU_Bot\bot\utils\jsonl_tail.py
+"""
+Constant-cost access to the end of append-only JSONL logs.
+
+tail_lines()/tail_jsonl() seek backwards from EOF in blocks, so reading the
+last N records costs O(N) whatever the file size (reports/feedback_log.jsonl
+grows forever).
+
+JsonlRing keeps the last `maxlen` records of a log in memory. Writers append
+through it (one file append + one deque append); readers take recent(n)
+without touching the disk. If the file grows behind its back (another
+process, a plain open(..., "a")), the next read re-seeds from the tail.
+
+    ring = get_jsonl_ring("reports/feedback_log.jsonl")
+    ring.append({"win": True, "confidence": 0.61})
+    last30 = ring.recent(30)
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List
+
+def tail_lines(path, n: int, block_size: int = 64 * 1024) -> List[str]:
+    """Last `n` lines of `path` (a torn last line without newline included)."""
+    if n <= 0:
+        return []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks: List[bytes] = []
+        newlines = 0
+        while pos > 0 and newlines <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+    data = b"".join(reversed(chunks))
+    lines = data.splitlines()
+    if pos > 0:
+        lines = lines[1:]  # first piece may start mid-line
+    return [ln.decode("utf-8", errors="replace") for ln in lines[-n:]]
+
+
+def tail_jsonl(path, n: int, block_size: int = 64 * 1024) -> List[dict]:
+    """Last `n` parseable JSON records of `path` (blank/corrupt lines skipped)."""
+    out = []
+    for line in tail_lines(path, n, block_size):
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(rec, dict):
+            out.append(rec)
+    return out
+
+
+class JsonlRing:
+    def __init__(self, path, maxlen: int = 1024):
+        self.path = Path(path)
+        self.maxlen = int(maxlen)
+        self._lock = threading.Lock()
+        self._buf: deque = deque(maxlen=self.maxlen)
+        self._size = -1  # file size the buffer reflects
+        self._reseed()
+
+    def _file_size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _reseed(self) -> None:
+        size = self._file_size()
+        self._buf.clear()
+        self._buf.extend(tail_jsonl(self.path, self.maxlen))
+        self._size = size
+
+    def append(self, rec: dict) -> None:
+        """Append one record to the log file and to the ring."""
+        line = json.dumps(rec) + "\n"
+        with self._lock:
+            if self._file_size() != self._size:
+                self._reseed()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                self._size = f.tell()
+            self._buf.append(rec)
+
+    def recent(self, n: int) -> List[dict]:
+        """Last `n` records, oldest first (falls back to a tail read beyond maxlen)."""
+        if n > self.maxlen:
+            return tail_jsonl(self.path, n)
+        with self._lock:
+            if self._file_size() != self._size:
+                self._reseed()
+            if n >= len(self._buf):
+                return list(self._buf)
+            return list(self._buf)[-n:] if n > 0 else []
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+
+_rings: Dict[str, JsonlRing] = {}
+_rings_lock = threading.Lock()
+
+
+def get_jsonl_ring(path, **kwargs) -> JsonlRing:
+    """Process-wide JsonlRing for `path` (kwargs only apply on first use)."""
+    key = os.path.abspath(path)
+    with _rings_lock:
+        ring = _rings.get(key)
+        if ring is None:
+            ring = _rings[key] = JsonlRing(path, **kwargs)
+        return ring
@@ -0,0 +1,317 @@
+# D:\XAU_Bot\bot\utils\tracing.py
+"""
+In-process latency tracing: spans feed per-stage log-linear (HDR-style)
+histograms, dumped periodically to a compact JSON file for the dashboard.
+
+    from bot.utils.tracing import span, traced
+
+    with span("mt5.order_send"):
+        result = mt5.order_send(request)
+
+    @traced("ai.confidence")
+    def compute_confidence(self, symbol): ...
+
+Durations come from time.perf_counter_ns() (monotonic, unaffected by
+SimulatedClock). Buckets are linear up to 128 ns, then 64 sub-buckets per
+power of two: ≤1.6% relative error from nanoseconds to years, in 3776
+counters per histogram. A span is two clock reads, a bit_length and a list
+increment – no locks, no allocation beyond the span object – so it stays on
+in production. Budget: < 1 µs per span; `python -m bot.utils.tracing`
+measures it and exits non-zero when over.
+
+Counters are not locked: two threads recording into the *same* histogram at
+the same instant can lose one increment. Stages run concurrently are distinct
+histograms, so in practice counts are exact.
+
+Dump format (reports/latency_histograms.json):
+    {"t": <epoch>, "up_s": ..., "stages": {name: {"n", "err", "mean_us", "p50_us",
+     "p90_us", "p99_us", "p999_us", "max_us", "b": [[bucket, count], ...]}}}
+"b" holds the non-empty buckets, so dumps from several processes can be merged.
+"""
+
+from __future__ import annotations
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from time import perf_counter_ns as _now
+from typing import Callable, Dict, Optional
+
+SUB_BITS = 7                                 # 2**7 linear buckets, then 2**6 per octave
+_HALF = 1 << (SUB_BITS - 1)
+N_BUCKETS = (64 - SUB_BITS) * _HALF + (1 << SUB_BITS)
+PERCENTILES = (("p50", 50.0), ("p90", 90.0), ("p99", 99.0), ("p999", 99.9))
+
+
+def bucket_index(ns: int) -> int:
+    shift = ns.bit_length() - SUB_BITS
+    return (shift << (SUB_BITS - 1)) + (ns >> shift) if shift > 0 else ns
+
+
+def bucket_upper(idx: int) -> int:
+    """Highest value (ns) that lands in bucket `idx`."""
+    shift = max(0, (idx >> (SUB_BITS - 1)) - 1)
+    return ((idx - (shift << (SUB_BITS - 1))) << shift) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    __slots__ = ("name", "counts", "total_ns", "errors")
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.counts = [0] * N_BUCKETS
+        self.total_ns = 0
+        self.errors = 0
+
+    def record(self, ns: int) -> None:
+        if ns < 0:
+            ns = 0
+        shift = ns.bit_length() - SUB_BITS
+        # bucket_index() inlined here and in Span.__exit__ (6 == SUB_BITS - 1)
+        self.counts[(shift << 6) + (ns >> shift) if shift > 0 else ns] += 1
+        self.total_ns += ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentiles(self, qs=(50.0,)) -> list:
+        """Values (ns) at percentiles `qs` (ascending), bucket upper bounds."""
+        n = self.count
+        out = []
+        if not n:
+            return [0] * len(qs)
+        targets = [max(1, -(-n * q // 100)) for q in qs]
+        seen, k = 0, 0
+        for idx, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while k < len(targets) and seen >= targets[k]:
+                out.append(bucket_upper(idx))
+                k += 1
+            if k == len(targets):
+                break
+        return out
+
+    def max_ns(self) -> int:
+        for idx in range(N_BUCKETS - 1, -1, -1):
+            if self.counts[idx]:
+                return bucket_upper(idx)
+        return 0
+
+    def merge(self, buckets) -> None:
+        """Add [[bucket, count], ...] as written by snapshot()."""
+        for idx, c in buckets:
+            self.counts[int(idx)] += int(c)
+
+    def reset(self) -> None:
+        self.counts = [0] * N_BUCKETS
+        self.total_ns = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict:
+        counts = list(self.counts)   # one consistent copy while writers keep going
+        n = sum(counts)
+        h = LatencyHistogram(self.name)
+        h.counts = counts
+        pct = h.percentiles([q for _, q in PERCENTILES])
+        out = {"n": n, "err": self.errors, "mean_us": round(self.total_ns / n / 1e3, 3) if n else 0.0}
+        out.update({f"{k}_us": round(v / 1e3, 3) for (k, _), v in zip(PERCENTILES, pct)})
+        out["max_us"] = round(h.max_ns() / 1e3, 3)
+        out["b"] = [[i, c] for i, c in enumerate(counts) if c]
+        return out
+
+
+class Span:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: LatencyHistogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = _now()
+        return self
+
+    def __exit__(self, et, ev, tb):
+        ns = _now() - self.t0
+        h = self.hist
+        shift = ns.bit_length() - SUB_BITS
+        h.counts[(shift << 6) + (ns >> shift) if shift > 0 else ns] += 1
+        h.total_ns += ns
+        if et is not None:
+            h.errors += 1
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, et, ev, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, path="reports/latency_histograms.json", dump_every_s: float = 30.0, enabled: bool = True):
+        self.path = Path(path)
+        self.dump_every_s = float(dump_every_s)
+        self.enabled = bool(enabled)
+        self.hists: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._last_dump = time.monotonic()
+        self.dumps = 0
+
+    def configure(self, path=None, dump_every_s=None, enabled=None) -> "Tracer":
+        if path is not None:
+            self.path = Path(path)
+        if dump_every_s is not None:
+            self.dump_every_s = float(dump_every_s)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        return self
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        h = self.hists.get(name)
+        if h is None:
+            with self._lock:
+                h = self.hists.setdefault(name, LatencyHistogram(name))
+        return h
+
+    def span(self, name: str):
+        h = self.hists.get(name)
+        if h is None:
+            h = self.histogram(name)
+        return Span(h) if self.enabled else _NULL_SPAN
+
+    def trace(self, name: Optional[str] = None) -> Callable:
+        """Decorator: time every call of fn under `name` (default module.qualname)."""
+        def deco(fn):
+            h = self.histogram(name or f"{fn.__module__}.{fn.__qualname__}")
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                t0 = _now()
+                try:
+                    return fn(*args, **kwargs)
+                except BaseException:
+                    h.errors += 1
+                    raise
+                finally:
+                    h.record(_now() - t0)
+            return wrapper
+        return deco
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a duration measured elsewhere (e.g. StageGraph timings)."""
+        if self.enabled:
+            self.histogram(name).record(int(seconds * 1e9))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hists = list(self.hists.items())
+        return {"t": round(time.time(), 3), "up_s": round(time.time() - self._started, 1),
+                "stages": {name: h.snapshot() for name, h in sorted(hists) if h.count}}
+
+    def dump(self, path=None) -> Path:
+        path = Path(path or self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        self._last_dump = time.monotonic()
+        self.dumps += 1
+        return path
+
+    def maybe_dump(self) -> bool:
+        """Dump if `dump_every_s` has passed since the last one."""
+        if not self.enabled or time.monotonic() - self._last_dump < self.dump_every_s:
+            return False
+        self.dump()
+        return True
+
+    def reset(self) -> None:
+        with self._lock:
+            for h in self.hists.values():
+                h.reset()
+
+
+def load_dump(path="reports/latency_histograms.json") -> dict:
+    """Read a dump written by Tracer.dump(); {} if missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_tracer = Tracer()
+
+
+@atexit.register
+def _final_dump() -> None:
+    # only processes that have been dumping (the scheduler), not every importer
+    if _tracer.enabled and _tracer.dumps:
+        _tracer.dump()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide Tracer."""
+    return _tracer
+
+
+# bound methods of the process-wide tracer: one call per span
+span = _tracer.span
+traced = _tracer.trace
+
+
+if __name__ == "__main__":
+    # per-span overhead on this machine, best of 5 rounds; the budget is 1 µs
+    # per span (checked here, not in pytest: timings on shared CI are noise)
+    budget_ns = 1000
+    n = 200_000
+    t = Tracer()          # not the process-wide one: nothing is dumped
+    sp = t.span
+
+    @t.trace("bench.fn")
+    def fn():
+        pass
+
+    def plain():
+        pass
+
+    cm = dec = float("inf")
+    for _ in range(5):
+        base = time.perf_counter()
+        for _ in range(n):
+            pass
+        base = time.perf_counter() - base
+        t0 = time.perf_counter()
+        for _ in range(n):
+            with sp("bench"):
+                pass
+        cm = min(cm, (time.perf_counter() - t0 - base) / n * 1e9)
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            plain()
+        call = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        dec = min(dec, (time.perf_counter() - t0 - call) / n * 1e9)
+    print(f"span {cm:.0f} ns | decorator {dec:.0f} ns | "
+          f"p50 of an empty span {t.hists['bench'].snapshot()['p50_us'] * 1e3:.0f} ns")
+    print(f"budget {budget_ns} ns per span: {'ok' if cm < budget_ns else 'OVER'}")
+    raise SystemExit(cm >= budget_ns)
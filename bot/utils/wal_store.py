@@ -0,0 +1,227 @@
+# D:\XAU_Bot\bot\utils\wal_store.py
+"""
+Write-ahead log + snapshot persistence for JSON state files.
+
+    bayes_state.json        snapshot (same format as before, readable by anyone)
+    bayes_state.json.wal    append-only deltas, one compact JSON line each:
+                            {"u": [[["XAUUSD", "signals", "kf_trend"], {"a": 51.0, "b": 50.0}], ...]}
+
+Every delta *sets* a key path to an absolute value (or deletes it: "d"), so
+replaying a record twice is harmless: recovery is simply snapshot + replay of the log(s). One line per
+record() call means a batch is applied all-or-nothing; a torn last line from a
+crash is cut off on the next load.
+
+Compaction runs on a background thread: it rotates the log to `.wal.1` (O(1),
+writers only wait for the rename) and folds snapshot + `.wal.1` into a new
+snapshot written via tmp file + os.replace. Compactions are serialized, so a
+rotation never touches `.wal.1` while a fold is reading it. Readers of the plain JSON file therefore lag by at most
+`compact_every` records; close() (also run at exit) compacts synchronously.
+
+Components sharing a file (bayes_state.json has several owners) must share
+one store: use open_store(path), which returns one instance per resolved path.
+"""
+
+from __future__ import annotations
+import atexit
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+KeyPath = Sequence[str]
+
+
+def _set_path(state: dict, path: KeyPath, value: Any) -> None:
+    node = state
+    for key in path[:-1]:
+        nxt = node.get(key)
+        if not isinstance(nxt, dict):
+            nxt = node[key] = {}
+        node = nxt
+    node[path[-1]] = value
+
+
+def _del_path(state: dict, path: KeyPath) -> None:
+    node = state
+    for key in path[:-1]:
+        node = node.get(key)
+        if not isinstance(node, dict):
+            return
+    node.pop(path[-1], None)
+
+
+class WalJsonStore:
+    def __init__(self, path, compact_every: int = 256, indent: Optional[int] = 2,
+                 fsync: bool = False, background: bool = True):
+        self.path = Path(path)
+        self.wal_path = Path(f"{self.path}.wal")
+        self.old_wal_path = Path(f"{self.path}.wal.1")
+        self.compact_every = int(compact_every)
+        self.indent = indent
+        self.fsync = fsync
+        self.background = background
+
+        self._lock = threading.Lock()          # guards the active log
+        self._compact_lock = threading.Lock()  # one compaction at a time
+        self._thread: Optional[threading.Thread] = None
+        self._fh = None
+        self._pending = 0
+        atexit.register(self.close)
+
+    # ---------- Recovery ----------
+    def _read_snapshot(self) -> dict:
+        try:
+            if self.path.exists():
+                return json.loads(self.path.read_text(encoding="utf-8")) or {}
+        except Exception as e:
+            logger.error("❌ Failed to load %s → %s", self.path, e)
+        return {}
+
+    @staticmethod
+    def _replay(state: dict, wal: Path, repair: bool = False) -> int:
+        """Apply every complete record in `wal`; optionally cut off a torn tail."""
+        if not wal.exists():
+            return 0
+        data = wal.read_bytes()
+        end = data.rfind(b"\n") + 1
+        n = 0
+        for line in data[:end].splitlines():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            for path, value in rec.get("u", ()):
+                _set_path(state, path, value)
+            for path in rec.get("d", ()):
+                _del_path(state, path)
+            n += 1
+        if repair and end < len(data):
+            logger.warning("⚠️ Truncating torn record at the end of %s", wal)
+            with open(wal, "r+b") as f:
+                f.truncate(end)
+        return n
+
+    def load(self) -> dict:
+        """Snapshot + replay of rotated and active logs."""
+        with self._lock:
+            state = self._read_snapshot()
+            self._replay(state, self.old_wal_path)
+            self._pending = self._replay(state, self.wal_path, repair=True)
+        return state
+
+    # ---------- Writes ----------
+    def record(self, path: KeyPath, value: Any) -> None:
+        self.record_many([(path, value)])
+
+    def delete(self, *paths: KeyPath) -> None:
+        self.record_many((), deletes=paths)
+
+    def record_many(self, updates: Iterable[Tuple[KeyPath, Any]], deletes: Iterable[KeyPath] = ()) -> None:
+        """Append one delta line setting each key path to its (JSON) value, then deleting `deletes`."""
+        rec = {"u": [[list(p), v] for p, v in updates]}
+        deletes = [list(p) for p in deletes]
+        if deletes:
+            rec["d"] = deletes
+        line = json.dumps(rec, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = open(self.wal_path, "a", encoding="utf-8")
+            self._fh.write(line)
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            self._pending += 1
+            due = self._pending >= self.compact_every
+        if due:
+            self.compact(wait=not self.background)
+
+    # ---------- Compaction ----------
+    def _rotate(self) -> bool:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self._pending = 0
+            if not self.wal_path.exists():
+                return False
+            if self.old_wal_path.exists():
+                # an earlier compaction died half-way: fold its log in first
+                with open(self.old_wal_path, "ab") as dst:
+                    dst.write(self.wal_path.read_bytes())
+                self.wal_path.unlink()
+            else:
+                os.replace(self.wal_path, self.old_wal_path)
+            return True
+
+    def _fold(self) -> None:
+        """Snapshot + `.wal.1` → new snapshot. Caller holds _compact_lock."""
+        if not self.old_wal_path.exists():
+            return
+        state = self._read_snapshot()
+        self._replay(state, self.old_wal_path)
+        self.write_snapshot(state)
+        self.old_wal_path.unlink()
+
+    def write_snapshot(self, state: dict) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(state, indent=self.indent), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _compact(self) -> None:
+        # rotate and fold under one lock: a rotation during a fold would append
+        # to `.wal.1` after _fold() replayed it, and the unlink would drop those records
+        with self._compact_lock:
+            if not self._rotate() and not self.old_wal_path.exists():
+                return
+            self._fold()
+
+    def compact(self, wait: bool = True) -> None:
+        """Fold the log into the snapshot (in the background unless wait=True)."""
+        if wait:
+            self._compact()
+        elif self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._safe_compact, name="wal-compact", daemon=True)
+            self._thread.start()
+
+    def _safe_compact(self):
+        try:
+            self._compact()
+        except Exception as e:
+            logger.error("❌ Compaction of %s failed → %s", self.path, e)
+
+    def replace_all(self, state: dict) -> None:
+        """Persist a full state (e.g. after a bulk rewrite) and drop the logs."""
+        with self._compact_lock, self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self.write_snapshot(state)
+            for p in (self.wal_path, self.old_wal_path):
+                if p.exists():
+                    p.unlink()
+            self._pending = 0
+
+    def close(self) -> None:
+        try:
+            self.compact(wait=True)
+        except Exception as e:
+            logger.error("❌ Final compaction of %s failed → %s", self.path, e)
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path, **kwargs) -> WalJsonStore:
+    """Process-wide WalJsonStore for `path` (kwargs only apply on first open)."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = WalJsonStore(path, **kwargs)
+        return store
@@ -0,0 +1,60 @@
+import math
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from bot.models.bayes_confidence import BayesianConfidenceEngine
+
+
+def _engine():
+    eng = BayesianConfidenceEngine(Path(tempfile.mkdtemp()) / "bayes_state.json")
+    eng._ensure_symbol("XAUUSD")
+    eng.state["XAUUSD"]["prior"]["b"] = 41.0
+    eng.state["XAUUSD"]["signals"]["kf_trend"]["a"] = 63.5
+    eng.state["XAUUSD"]["signals"]["stoch_momo"]["b"] = 57.25
+    return eng
+
+
+def _features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    slope, z = rng.normal(0, 5, n), rng.normal(0, 1.5, n)
+    fast, slow = rng.uniform(0, 100, n), rng.uniform(0, 100, n)
+    slope[::7], z[::11], fast[::13] = np.nan, np.nan, np.nan
+    slope[5], fast[6] = 0.0, slow[6]
+    dirs = np.where(rng.random(n) < 0.5, "buy", "sell")
+    return dirs, slope, z, fast, slow
+
+
+def test_batch_equals_scalar_exactly():
+    eng = _engine()
+    dirs, slope, z, fast, slow = _features(5000)
+    presence, strength, signals = eng.build_evidence_arrays(dirs, slope, 5.0, z, 1.0, fast, slow)
+    out = eng.compute_confidence_batch("XAUUSD", dirs, presence, strength, signals)
+
+    opt = lambda v: None if math.isnan(v) else float(v)
+    for i in range(len(dirs)):
+        ev = eng.build_evidence_from_features(dirs[i], opt(slope[i]), 5.0, opt(z[i]), 1.0,
+                                              opt(fast[i]), opt(slow[i]))
+        ref = eng.compute_confidence("XAUUSD", dirs[i], ev)
+        assert ref["confidence"] == out["confidence"][i]
+        assert ref["log_odds"] == out["log_odds"][i]
+        assert ref["prior"] == out["prior"][i]
+
+
+def test_scalar_direction_and_fast_mode():
+    eng = _engine()
+    _, slope, z, fast, slow = _features(1000, seed=1)
+    presence, strength, signals = eng.build_evidence_arrays("SELL", slope, 5.0, z, 1.0, fast, slow)
+    exact = eng.compute_confidence_batch("XAUUSD", "sell", presence, strength, signals)
+    fast_out = eng.compute_confidence_batch("XAUUSD", "sell", presence, strength, signals, exact=False)
+    assert np.abs(exact["confidence"] - fast_out["confidence"]).max() < 1e-15
+    # a missing feature column is ignored entirely
+    presence, strength, _ = eng.build_evidence_arrays("buy", kf_slope=slope)
+    assert (presence[:, 1:] == 0).all() and (strength[:, 1:] == 0).all()
+
+
+if __name__ == "__main__":
+    test_batch_equals_scalar_exactly()
+    test_scalar_direction_and_fast_mode()
+    print("✅ bayes_confidence batch tests passed")
@@ -0,0 +1,95 @@
+import tempfile
+from pathlib import Path
+
+from bot.core.clock import SimulatedClock
+from bot.engines.bayes_memory import BayesianMemory
+from bot.utils.bayes_state import get_bayes_state
+from bot.ai_core.adaptive_feedback import AdaptiveFeedback
+from bot.models.bayes_confidence import BayesianConfidenceEngine
+
+
+def _memory(**kw):
+    path = Path(tempfile.mkdtemp()) / "bayes_state.json"
+    svc = get_bayes_state(path, flush_interval=60.0)
+    svc.state["XAUUSD"] = {"prior": {"a": 50.0, "b": 50.0},
+                           "signals": {"kf_trend": {"a": 80.0, "b": 40.0}, "ou_revert": {"a": 30.0, "b": 70.0}}}
+    clock = SimulatedClock(start=1_700_000_000.0)
+    return BayesianMemory(state_file=str(path), clock=clock, **kw), svc, clock
+
+
+def test_decay_is_lazy_and_time_based():
+    mem, svc, clock = _memory(decay=0.99, decay_period_s=60.0)
+    mem.update_memory("XAUUSD", "kf_trend", 1)
+    assert mem.posterior("XAUUSD", "kf_trend") == (81.0, 40.0)
+
+    clock.advance(600)                                   # 10 periods, nothing written meanwhile
+    node = svc.state["XAUUSD"]["signals"]["kf_trend"]
+    assert (node["a"], node["b"]) == (81.0, 40.0)
+    a, b = mem.posterior("XAUUSD", "kf_trend")
+    assert abs(a - 81.0 * 0.99 ** 10) < 1e-9 and abs(b - 40.0 * 0.99 ** 10) < 1e-9
+
+    mem.update_memory("XAUUSD", "kf_trend", 0)
+    assert abs(node["a"] - 81.0 * 0.99 ** 10) < 1e-9 and abs(node["b"] - (40.0 * 0.99 ** 10 + 1)) < 1e-9
+    assert svc.flush() == 1                              # updates coalesce into one record
+
+
+def test_drift_flattening_is_an_epoch_marker():
+    mem, svc, clock = _memory(decay=0.99, decay_period_s=60.0)
+    mem.update_memory("XAUUSD", "kf_trend", 1)           # a=81, b=40 at t0
+    ou = dict(svc.state["XAUUSD"]["signals"]["ou_revert"])
+
+    clock.advance(120)
+    mem.apply_drift_correction("XAUUSD")
+    assert svc.state["XAUUSD"]["signals"]["ou_revert"] == ou   # no signal rewritten
+    assert svc.state["XAUUSD"]["drift_epoch"]["n"] == 1
+
+    # ou_revert predates decay tracking: flattened only
+    assert mem.posterior("XAUUSD", "ou_revert") == (40.0, 60.0)
+
+    # kf_trend: decay to the drift, flatten, decay on
+    clock.advance(60)
+    f1, f2 = 0.99 ** 2, 0.99
+    a, b = mem.posterior("XAUUSD", "kf_trend")
+    assert abs(a - (50 + (81.0 * f1 - 50) * 0.5) * f2) < 1e-9
+    assert abs(b - (50 + (40.0 * f1 - 50) * 0.5) * f2) < 1e-9
+
+    mem.update_memory("XAUUSD", "kf_trend", 1)           # materializes and records the epoch
+    clock.advance(0)
+    assert mem.posterior("XAUUSD", "kf_trend")[0] == svc.state["XAUUSD"]["signals"]["kf_trend"]["a"]
+
+
+def test_other_owners_read_and_write_through_the_same_decay():
+    mem, svc, clock = _memory(decay=0.99, decay_period_s=86400.0)
+    path = Path(mem.state_file)
+    engine = BayesianConfidenceEngine(state_path=path)
+    fb = AdaptiveFeedback({"feedback": {"update_strength": 1.0, "confidence_gain": 0.0}},
+                          bayes_path=str(path), log_path=str(path.parent / "fb.jsonl"))
+
+    mem.update_memory("XAUUSD", "ou_revert", 0)         # stamped at t0: a=30, b=71
+
+    # drift correction reaches live confidence, not only posterior()
+    p_before = engine._signal_p("XAUUSD", "kf_trend")
+    mem.apply_drift_correction("XAUUSD")
+    a, b = mem.posterior("XAUUSD", "kf_trend")
+    assert (a, b) == (65.0, 45.0)
+    assert engine._signal_p("XAUUSD", "kf_trend") == a / (a + b) < p_before
+
+    # a feedback nudge 30 days later is stamped when made, not decayed as 30 days old
+    clock.advance(30 * 86400)
+    a0, b0 = mem.posterior("XAUUSD", "ou_revert")
+    assert abs(a0 - 40.0 * 0.99 ** 30) < 1e-9                 # flattened 30 → 40, then 30 days of decay
+    fb.register_trade_outcome(symbol="XAUUSD", action="BUY", pnl=1.0, confidence=0.5,
+                              components={"ou_revert": 0.5})
+    a, b = mem.posterior("XAUUSD", "ou_revert")
+    assert abs(a - (a0 + 0.5)) < 1e-9 and abs(b - (b0 + 0.5)) < 1e-9
+
+    # and an outcome resolved by the confidence engine is applied on top of the decayed value
+    engine._apply_outcome("XAUUSD", {"evidence": {"ou_revert": {"present": True, "strength": 1.0}}}, True)
+    assert abs(mem.posterior("XAUUSD", "ou_revert")[0] - (a + 1.0)) < 1e-9
+
+
+if __name__ == "__main__":
+    test_decay_is_lazy_and_time_based()
+    test_drift_flattening_is_an_epoch_marker()
+    test_other_owners_read_and_write_through_the_same_decay()
+    print("✅ Bayesian memory tests passed")
@@ -0,0 +1,82 @@
+import contextlib
+import tempfile
+import threading
+from pathlib import Path
+
+from bot.ai_core.adaptive_feedback import AdaptiveFeedback
+from bot.engines import adaptive_feedback as engines_feedback
+from bot.models.bayes_confidence import BayesianConfidenceEngine
+from bot.engines.bayes_memory import BayesianMemory
+from bot.engines.threshold_tuner import ThresholdTuner
+from bot.utils.bayes_state import get_bayes_state
+from bot.utils.wal_store import WalJsonStore
+
+
+def test_modules_share_one_live_state():
+    path = Path(tempfile.mkdtemp()) / "bayes_state.json"
+    fb = AdaptiveFeedback({}, bayes_path=str(path), log_path=str(path.parent / "fb.jsonl"))
+    mem = BayesianMemory(state_file=str(path))
+    tuner = ThresholdTuner(bayes_state_path=str(path))
+    assert fb.state is mem.state is tuner.bayes_state
+
+    fb.register_trade_outcome(symbol="XAUUSD", action="BUY", pnl=10.0, confidence=0.7,
+                              components={"kf_trend": 0.6})
+    # memory sees the node feedback just created, without touching disk
+    path.unlink(missing_ok=True)
+    before = mem.state["XAUUSD"]["signals"]["kf_trend"]["a"]
+    mem.update_memory("XAUUSD", "kf_trend", 1)
+    # stamped by feedback a moment ago: next to nothing to decay
+    assert abs(tuner.bayes_state["XAUUSD"]["signals"]["kf_trend"]["a"] - (before + 1)) < 1e-6
+
+
+def test_flat_and_nested_owners_share_one_path():
+    root = Path(tempfile.mkdtemp())
+    path = root / "bayes_state.json"
+    flat = engines_feedback.AdaptiveFeedback(state_path=path)   # scheduler_main builds one at import
+    assert flat.state == {}                                     # no flat default seeded into shared state
+
+    engine = BayesianConfidenceEngine(state_path=path)
+    assert engine.compute_confidence("XAUUSD", "buy", {})["confidence"] == 0.5
+    fb = AdaptiveFeedback({}, bayes_path=str(path), log_path=str(root / "fb.jsonl"))
+    fb.register_trade_outcome(symbol="XAUUSD", action="BUY", pnl=5.0, confidence=0.6)
+
+    # the flat owner adds its a/b next to prior/signals instead of replacing the node
+    with contextlib.chdir(root):
+        flat.update("XAUUSD", win=True, conf=0.7)
+        flat.update("EURUSD", win=False, conf=0.4)
+    node = flat.state["XAUUSD"]
+    assert {"a", "b", "prior", "signals"} <= set(node) and node["a"] > 50.0
+    assert engine.compute_confidence("EURUSD", "sell", {})["confidence"] == 0.5
+    assert flat.state["EURUSD"]["b"] > 50.0 and "prior" in flat.state["EURUSD"]
+
+
+def test_concurrent_writers_lose_nothing_and_flushes_coalesce():
+    path = Path(tempfile.mkdtemp()) / "bayes_state.json"
+    svc = get_bayes_state(path, flush_interval=60.0)
+    fbs = [AdaptiveFeedback({"feedback": {"update_strength": 1.0, "confidence_gain": 0.0}},
+                            bayes_path=str(path), log_path=str(path.parent / "fb.jsonl"))
+           for _ in range(4)]
+
+    def worker(fb):
+        for _ in range(250):
+            fb.register_trade_outcome(symbol="XAUUSD", action="BUY", pnl=1.0, confidence=0.5)
+
+    threads = [threading.Thread(target=worker, args=(fb,)) for fb in fbs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    prior = svc.state["XAUUSD"]["prior"]
+    # every outcome adds 0.5 to a and to b (confidence_gain=0 → weights 0.5/0.5)
+    assert prior["a"] == 50.0 + 1000 * 0.5 and prior["b"] == 50.0 + 1000 * 0.5
+    assert svc.flush() == 1
+    assert len(Path(f"{path}.wal").read_text().splitlines()) == 1   # 1000 updates → one record
+    assert WalJsonStore(path).load()["XAUUSD"]["prior"] == prior
+
+
+if __name__ == "__main__":
+    test_modules_share_one_live_state()
+    test_flat_and_nested_owners_share_one_path()
+    test_concurrent_writers_lose_nothing_and_flushes_coalesce()
+    print("✅ bayes_state service tests passed")
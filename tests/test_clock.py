@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from bot.core.clock import SimulatedClock, StopReplay
+from bot.core.scheduler import ContinuousScheduler
+from bot.risk.dynamic_governor import DynamicRiskGovernor
+from bot.sim import fake_mt5
+
+
+def test_simulated_sleep_advances_time():
+    clock = SimulatedClock(start=1_761_553_961.0)
+    clock.sleep(120)
+    assert clock.time() == 1_761_554_081.0
+    assert clock.utcnow() == datetime(2025, 10, 27, 8, 34, 41)
+
+
+def test_continuous_scheduler_runs_on_replay_time(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)              # SessionLogger writes reports/logs/ under cwd
+    clock = SimulatedClock(start=0.0, stop_at=3600.0)
+    seen = []
+    sched = ContinuousScheduler(task_fn=lambda: seen.append(clock.time()), interval_sec=300, clock=clock)
+    try:
+        sched.start()
+    except StopReplay:
+        pass
+    assert seen == [i * 300.0 for i in range(12)]
+
+
+def test_trade_executor_cooldown_uses_clock(monkeypatch):
+    clock = SimulatedClock(start=1_000.0)
+    ticks = pd.DataFrame({"time_msc": [900_000], "bid": [4000.0], "ask": [4000.2]})
+    monkeypatch.setitem(sys.modules, "MetaTrader5", fake_mt5)   # install() swaps it; restored after the test
+    fake_mt5.install({"XAUUSD": ticks}, clock=clock.time)
+    from bot.execution.smart_trade_executor import SmartTradeExecutor
+
+    with tempfile.TemporaryDirectory() as d:
+        ste = SmartTradeExecutor(cooldown_sec=300, log_path=os.path.join(d, "trade_log.json"), clock=clock)
+        ste.update_cooldown("XAUUSD")
+        clock.advance(299)
+        assert ste.can_trade("XAUUSD") is False
+        clock.advance(1)
+        assert ste.can_trade("XAUUSD") is True
+
+
+def test_risk_governor_cooldown_uses_clock(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)              # risk_state.json is written under cwd
+    clock = SimulatedClock(start=0.0)
+    drg = DynamicRiskGovernor({"risk": {"max_dd_pct": 10.0, "cooldown_minutes": 30}}, clock=clock)
+    assert drg.can_trade("XAUUSD") is True
+
+    drg.update_metrics(equity=85_000.0, start_equity=100_000.0)
+    assert drg.paused and drg.cooldown_remaining() == 1800.0
+    drg.update_metrics(equity=99_000.0, start_equity=100_000.0)     # recovered, still cooling down
+    clock.advance(1799)
+    assert drg.can_trade("XAUUSD") is False
+    clock.advance(1)
+    assert drg.can_trade("XAUUSD") is True and not drg.paused
+
+    # drawdown still over the limit when the cooldown ends: a new one starts
+    drg.update_metrics(equity=80_000.0, start_equity=100_000.0)
+    clock.advance(1800)
+    assert drg.can_trade("XAUUSD") is False
+    assert drg.paused and drg.cooldown_remaining() == 1800.0
+
+
+if __name__ == "__main__":
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ Clock tests passed")
@@ -0,0 +1,117 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.data.indicator_engine import IndicatorEngine
+from bot.sim import fake_mt5
+
+START_MS = 1_761_553_800_000
+CFG = {"mt5": {"symbols": ["XAUUSD"], "fetch_minutes": 24 * 60, "incremental_ticks": True},
+       "resample_rule": "1min", "indicators": {"atr_period": 14}}
+
+
+def _ticks(n=20_000, seed=11):
+    rng = np.random.default_rng(seed)
+    gaps = rng.integers(0, 900, n)
+    gaps[::7] = 0                                # bursts sharing one time_msc
+    msc = START_MS + 500 + np.cumsum(gaps)
+    bid = 4000 + np.cumsum(rng.normal(0, 0.05, n))
+    return pd.DataFrame({"time_msc": msc, "bid": bid, "ask": bid + 0.2, "last": 0.0,
+                         "volume": 0, "flags": 134, "volume_real": 0.0})
+
+
+def _upto_server_second(df, term):
+    """Ticks a snapshot can see: ranges end at the last tick's whole second."""
+    last = int(df["time_msc"][df["time_msc"] <= term.now_msc()].iloc[-1])
+    return df[df["time_msc"] <= last // 1000 * 1000]
+
+
+def _feed(monkeypatch, df):
+    """MT5Feed over fake_mt5; MetaTrader5 and data_feed.mt5 are restored after the test."""
+    monkeypatch.setitem(sys.modules, "MetaTrader5", fake_mt5)   # install() swaps it
+    term = fake_mt5.install({"XAUUSD": df})
+    from bot import data_feed
+    monkeypatch.setattr(data_feed, "mt5", fake_mt5)
+    return term, data_feed.MT5Feed(CFG)
+
+
+def test_incremental_snapshots_match_full_refetch(monkeypatch):
+    df = _ticks()
+    term, feed = _feed(monkeypatch, df)
+    term.advance(0.5)
+    for step in (400.0, 37.3, 0.9, 125.0, 61.0, 300.0, 1800.0, 59.5, 2400.0):
+        term.advance(step)
+        inc = feed.snapshot_symbol("XAUUSD", incremental=True)
+        full = feed.snapshot_symbol("XAUUSD", incremental=False)
+
+        assert inc.index.equals(full.index)
+        bar_cols = ["open", "high", "low", "close", "volume", "tick_count"]
+        pd.testing.assert_frame_equal(inc[bar_cols], full[bar_cols], check_dtype=False)
+        cols = IndicatorEngine.COLUMNS
+        pd.testing.assert_frame_equal(inc[cols], full[cols], check_dtype=False, rtol=1e-9)
+
+
+def test_trimmed_window_keeps_the_same_bars(monkeypatch):
+    # window shorter than the history: the incremental buffer is trimmed, the
+    # full refetch starts mid-bar, so only its first (partial) bar may differ
+    df = _ticks()
+    term, feed = _feed(monkeypatch, df)
+    feed.fetch_minutes = 30
+    for step in (400.0, 900.0, 1800.0, 59.5, 2400.0, 30.0):
+        term.advance(step)
+        inc = feed.snapshot_symbol("XAUUSD", incremental=True)
+        full = feed.snapshot_symbol("XAUUSD", incremental=False)
+        assert inc.index.equals(full.index)
+        bar_cols = ["open", "high", "low", "close", "volume", "tick_count"]
+        pd.testing.assert_frame_equal(inc[bar_cols].iloc[1:], full[bar_cols].iloc[1:], check_dtype=False)
+
+
+def test_watermark_advances_without_duplicate_ticks(monkeypatch):
+    df = _ticks()
+    term, feed = _feed(monkeypatch, df)
+    # park the clock on a millisecond that several ticks share
+    dup_ms = int(df["time_msc"][df["time_msc"].duplicated()].iloc[40])
+    term.set_time(dup_ms / 1000 + 1.0)
+    marks = []
+    for step in (0.0, 0.0, 2.5, 0.001, 45.0, 0.0, 90.0):
+        term.advance(step)
+        bars = feed.snapshot_symbol("XAUUSD", incremental=True)
+        cur = feed._cursors["XAUUSD"]
+        seen = _upto_server_second(df, term)
+        assert cur.last_msc == int(seen["time_msc"].iloc[-1])
+        assert cur.seen_at_last == int((seen["time_msc"] == cur.last_msc).sum())
+        assert int(bars["tick_count"].sum()) == len(seen)       # boundary ticks counted once
+        marks.append(cur.last_msc)
+    assert marks == sorted(marks) and marks[-1] > marks[0]
+
+
+def test_reset_forces_full_refetch(monkeypatch):
+    df = _ticks()
+    term, feed = _feed(monkeypatch, df)
+    calls = []
+    fetch = fake_mt5.copy_ticks_range
+    monkeypatch.setattr(fake_mt5, "copy_ticks_range",
+                        lambda s, frm, to, flags=fake_mt5.COPY_TICKS_ALL: calls.append((frm, to)) or fetch(s, frm, to, flags))
+
+    term.advance(900)
+    feed.snapshot_symbol("XAUUSD")
+    term.advance(30)
+    feed.snapshot_symbol("XAUUSD")
+    window = pd.Timedelta(minutes=CFG["mt5"]["fetch_minutes"])
+    assert calls[0][1] - calls[0][0] == window
+    assert calls[1][1] - calls[1][0] < pd.Timedelta(minutes=1)          # only new ticks
+
+    before = feed._cursors["XAUUSD"]
+    feed.reset_cursor("XAUUSD")
+    term.advance(30)
+    again = feed.snapshot_symbol("XAUUSD")
+    assert calls[2][1] - calls[2][0] == window
+    assert feed._cursors["XAUUSD"] is not before
+    assert int(again["tick_count"].sum()) == len(_upto_server_second(df, term))
+
+
+if __name__ == "__main__":
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ Data feed tests passed")
@@ -0,0 +1,103 @@
+import tempfile
+from math import exp
+from pathlib import Path
+
+from bot.core.clock import SimulatedClock
+from bot.engines.bayes_fusion import BayesianFusion
+from bot.engines.dynamic_weights import REGIME_BIAS, VOL_CAP, VOL_PENALTY, DynamicWeighting
+
+SIGNALS = ["kf_trend", "kf_slope", "stoch_momo", "ou_revert", "ou_zscore", "lstm"]
+
+
+def _tmp(name="weights_state.json") -> Path:
+    return Path(tempfile.mkdtemp()) / name
+
+
+def _reference(dw, symbol, names, regime, vol):
+    """The scalar per-call formula compute() replaced."""
+    st = dw.state[symbol]
+    z = {}
+    for sig in names:
+        s = st[sig]
+        score = (3.0 * (s["ema_acc"] - 0.5) * 2.0 - 2.0 * min(1.0, max(0.0, s["ema_var"]))
+                 + REGIME_BIAS.get(regime, {}).get(sig, 0.0)
+                 - 0.5 * VOL_PENALTY.get(sig, 0.2) * max(0.0, min(0.05, vol)) / 0.05)
+        z[sig] = max(dw.min_weight, s["base"] * exp(score))
+    ssum = sum(z.values())
+    return {k: v / ssum for k, v in z.items()}
+
+
+def test_cache_matches_reference_and_invalidates():
+    dw = DynamicWeighting(str(_tmp()))
+    for k in range(7):
+        dw.register_outcome("XAUUSD", SIGNALS[k % 4], k % 3 != 0)
+
+    w = dw.compute("XAUUSD", SIGNALS, "trend", 0.0125)   # bucket center: exact
+    ref = _reference(dw, "XAUUSD", SIGNALS, "trend", 0.0125)
+    assert all(abs(w[k] - ref[k]) < 1e-12 for k in SIGNALS)
+    assert abs(sum(w.values()) - 1.0) < 1e-12
+
+    assert dw.compute("XAUUSD", SIGNALS, "trend", 0.0126) is w   # same vol bucket → cache hit
+    assert dw.compute("XAUUSD", SIGNALS, "range", 0.0125) is not w
+    other = dw.compute("EURUSD", SIGNALS, "trend", 0.0125)
+
+    dw.register_outcome("XAUUSD", "kf_trend", True)
+    w2 = dw.compute("XAUUSD", SIGNALS, "trend", 0.0125)
+    assert w2 is not w and w2["kf_trend"] > w["kf_trend"]
+    assert dw.compute("EURUSD", SIGNALS, "trend", 0.0125) is other   # other symbols keep their cache
+
+
+def test_batched_persistence():
+    path = _tmp()
+    dw = DynamicWeighting(str(path), flush_every=4)
+    wal = Path(f"{path}.wal")
+    for k in range(3):
+        dw.register_outcome("XAUUSD", "kf_trend", bool(k % 2))
+    assert not wal.exists()
+    dw.register_outcome("XAUUSD", "ou_revert", False)
+    assert len(wal.read_text().splitlines()) == 1          # one record for the batch
+    dw.register_outcome("XAUUSD", "kf_slope", True)
+    assert dw.flush() == 1
+
+    again = DynamicWeighting(str(path))
+    assert again.state["XAUUSD"]["kf_trend"] == dw.state["XAUUSD"]["kf_trend"]
+    assert again.state["XAUUSD"]["kf_trend"]["count"] == 3
+    assert again.compute("XAUUSD", SIGNALS, "trend", 0.02) == dw.compute("XAUUSD", SIGNALS, "trend", 0.02)
+
+
+def test_fusion_uses_learned_weights():
+    dw = DynamicWeighting(str(_tmp()))
+    fusion = BayesianFusion(str(_tmp("bayes_state.json")), dynamic_weights=dw)
+    comps = {"kf_trend": 0.7, "ou_revert": 0.3}
+    static = fusion.fused_decision(comps, regime="trend")
+    for _ in range(10):
+        dw.register_outcome("XAUUSD", "kf_trend", True)
+        dw.register_outcome("XAUUSD", "ou_revert", False)
+    learned = fusion.fused_decision(comps, regime="trend", symbol="XAUUSD")
+    assert learned["weights"]["kf_trend"] > static["weights"]["kf_trend"]
+    assert learned["combined_conf"] > static["combined_conf"]
+
+
+def test_fusion_scales_normalized_vol_and_uses_clock():
+    clock = SimulatedClock(1_700_000_000.0)
+    dw = DynamicWeighting(str(_tmp()), clock=clock)
+    dw.register_outcome("XAUUSD", "ou_revert", True)
+    assert dw.state["XAUUSD"]["ou_revert"]["last_update"] == 1_700_000_000.0
+
+    fusion = BayesianFusion(str(_tmp("bayes_state.json")), dynamic_weights=dw)
+    comps = {"kf_trend": 0.6, "ou_revert": 0.4}
+    calm = fusion.fused_decision(comps, regime="trend", vol=0.0, symbol="XAUUSD")
+    mid = fusion.fused_decision(comps, regime="trend", vol=0.5, symbol="XAUUSD")
+    wild = fusion.fused_decision(comps, regime="trend", vol=1.0, symbol="XAUUSD")
+    # vol 0..1 maps onto 0..VOL_CAP: the penalty grows across the range, not at 0.05
+    assert calm["weights"]["ou_revert"] > mid["weights"]["ou_revert"] > wild["weights"]["ou_revert"]
+    ref = dw.compute("XAUUSD", SIGNALS, "trend", 0.5 * VOL_CAP)
+    assert abs(mid["weights"]["ou_revert"] - ref["ou_revert"] / (ref["ou_revert"] + ref["kf_trend"])) < 1e-12
+
+
+if __name__ == "__main__":
+    test_cache_matches_reference_and_invalidates()
+    test_batched_persistence()
+    test_fusion_uses_learned_weights()
+    test_fusion_scales_normalized_vol_and_uses_clock()
+    print("✅ Dynamic weighting tests passed")
@@ -0,0 +1,95 @@
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.sim import fake_mt5
+
+
+def _ticks(n=3000, start=1761553961293, seed=5):
+    rng = np.random.default_rng(seed)
+    msc = start + np.cumsum(rng.integers(50, 2000, n))
+    bid = 4000 + np.cumsum(rng.normal(0, 0.05, n))
+    return pd.DataFrame({"time_msc": msc, "bid": bid, "ask": bid + 0.2, "last": 0.0,
+                         "volume": 0, "flags": 134, "volume_real": 0.0})
+
+
+def _install(monkeypatch, df):
+    monkeypatch.setitem(sys.modules, "MetaTrader5", fake_mt5)   # install() swaps it; restored after the test
+    return fake_mt5.install({"XAUUSD": df}, aliases={"XAUUSD.sd": "XAUUSD"})
+
+
+def test_market_data_never_runs_ahead_of_clock(monkeypatch):
+    df = _ticks()
+    term = _install(monkeypatch, df)
+    mt5 = __import__("MetaTrader5")
+    assert mt5 is fake_mt5 and mt5.initialize()
+
+    term.advance(600)
+    now_ms = term.now_msc()
+    tick = mt5.symbol_info_tick("XAUUSD.sd")
+    expected = df[df["time_msc"] <= now_ms].iloc[-1]
+    assert tick.time_msc == expected["time_msc"] and tick.bid == expected["bid"]
+
+    now = datetime.fromtimestamp(tick.time)
+    ticks = mt5.copy_ticks_range("XAUUSD", datetime.fromtimestamp(0), datetime(2100, 1, 1), mt5.COPY_TICKS_ALL)
+    assert len(ticks) == (df["time_msc"] <= now_ms).sum()
+    assert ticks.dtype.names == fake_mt5.TICK_DTYPE.names
+
+    rates = mt5.copy_rates_from_pos("XAUUSD", mt5.TIMEFRAME_M1, 0, 5)
+    assert len(rates) == 5
+    assert rates["time"][-1] == (tick.time_msc // 60_000) * 60
+    assert rates["close"][-1] == tick.bid
+    older = mt5.copy_rates_from("XAUUSD", mt5.TIMEFRAME_M1, now, 3)
+    assert np.array_equal(older, rates[-3:])
+
+
+def test_orders_positions_and_stops(monkeypatch):
+    df = _ticks()
+    term = _install(monkeypatch, df)
+    mt5 = fake_mt5
+    term.advance(60)
+    tick = mt5.symbol_info_tick("XAUUSD")
+    res = mt5.order_send({
+        "action": mt5.TRADE_ACTION_DEAL, "symbol": "XAUUSD", "volume": 0.1,
+        "type": mt5.ORDER_TYPE_BUY, "price": tick.ask,
+        "sl": tick.ask - 0.5, "tp": tick.ask + 0.5, "magic": 7,
+    })
+    assert res.retcode == mt5.TRADE_RETCODE_DONE and res.price == tick.ask
+    assert len(mt5.positions_get(symbol="XAUUSD")) == 1
+
+    # run the clock to the end of the recording: one of the stops must fire
+    term.advance(10 ** 6)
+    assert mt5.positions_get() == ()
+    deals = mt5.history_deals_get(datetime.fromtimestamp(0), datetime(2100, 1, 1))
+    assert [d.entry for d in deals] == [mt5.DEAL_ENTRY_IN, mt5.DEAL_ENTRY_OUT]
+    exit_deal = deals[-1]
+    assert exit_deal.comment in ("[sl]", "[tp]")
+    assert abs(exit_deal.profit - (exit_deal.price - res.price) * 0.1 * 100) < 0.01
+    assert abs(mt5.account_info().balance - (10_000 + exit_deal.profit)) < 1e-6
+
+
+def test_manual_close_and_modify(monkeypatch):
+    term = _install(monkeypatch, _ticks())
+    mt5 = fake_mt5
+    term.advance(30)
+    res = mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": "XAUUSD.sd",
+                          "volume": 0.2, "type": mt5.ORDER_TYPE_SELL})
+    ok = mt5.order_send({"action": mt5.TRADE_ACTION_SLTP, "symbol": "XAUUSD", "position": res.deal,
+                         "sl": res.price + 50, "tp": res.price - 50})
+    assert ok.retcode == mt5.TRADE_RETCODE_DONE
+    assert mt5.positions_get(ticket=res.deal)[0].sl == res.price + 50
+
+    term.advance(30)
+    close = mt5.order_send({"action": mt5.TRADE_ACTION_DEAL, "symbol": "XAUUSD", "volume": 0.2,
+                            "type": mt5.ORDER_TYPE_BUY, "position": res.deal})
+    assert close.retcode == mt5.TRADE_RETCODE_DONE
+    assert mt5.positions_get() == ()
+    assert mt5.history_deals_get(position=res.deal)[-1].entry == mt5.DEAL_ENTRY_OUT
+
+
+if __name__ == "__main__":
+    if pytest.main(["-q", __file__]) == 0:
+        print("✅ fake MetaTrader5 tests passed")
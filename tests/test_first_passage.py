@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.models.first_passage import Brackets, FirstPassageEngine
+from bot.models.ou_model import OUModel
+from bot.models.stochastic import GBMSimulator
+from bot.utils.config_loader import load_config
+
+
+SIM = GBMSimulator(mu_annual=0.0, sigma_annual=0.18, dt=5 / (252 * 24 * 60))
+
+
+def test_brackets_from_config():
+    b = Brackets.from_config(load_config("config.yaml"))
+    assert (b.sl_atr, b.tp_atr, b.be_trigger_atr, b.trail_atr) == (2.0, 3.0, 1.0, 0.5)
+
+
+def test_bridge_keeps_coarse_steps_accurate():
+    # fixed SL/TP only: coarse steps with the bridge must agree with fine steps
+    eng = FirstPassageEngine(Brackets(be_trigger_atr=1e9, trail_atr=0.0), n_paths=20_000)
+    fine = eng.gbm(SIM, 2400.0, 3.0, horizon_bars=48, bars_per_step=1)
+    coarse = eng.gbm(SIM, 2400.0, 3.0, horizon_bars=48, bars_per_step=8)
+    assert abs(fine.p_tp + fine.p_stop + fine.p_open - 1.0) < 1e-9
+    assert abs(fine.p_tp - coarse.p_tp) < 0.01
+    assert abs(fine.exp_bars - coarse.exp_bars) < 0.5
+    # driftless, long horizon: P(TP first) → sl / (sl + tp) = 0.4
+    long = eng.gbm(SIM, 2400.0, 3.0, horizon_bars=600, bars_per_step=10)
+    assert abs(long.p_tp / (long.p_tp + long.p_stop) - 0.4) < 0.02
+
+
+def test_ou_side_and_breakeven():
+    rng = np.random.default_rng(0)
+    x = np.empty(3000)
+    x[0] = 2400.0
+    for t in range(1, len(x)):
+        x[t] = x[t - 1] + 0.05 * (2400.0 - x[t - 1]) + rng.normal(0, 1.5)
+    model = OUModel(pd.Series(x))
+    model.fit()
+    eng = FirstPassageEngine()
+    # entry well below the mean: BUY should profit, SELL should mostly hit its SL
+    buy = eng.ou(model, 2385.0, 3.0, "BUY")
+    sell = eng.ou(model, 2385.0, 3.0, "SELL")
+    assert buy.p_tp > sell.p_tp
+    assert buy.p_loss_stop < 0.1 and sell.p_loss_stop > 0.8
+    assert buy.exp_r > 0 > sell.exp_r
+    # break-even/trailing stops never lose, so loss stops ≤ all stops
+    assert buy.p_loss_stop <= buy.p_stop
+
+
+def test_non_positive_atr_is_rejected():
+    eng = FirstPassageEngine(n_paths=64)
+    model = OUModel(pd.Series(2400.0 + np.random.default_rng(1).normal(0, 1.0, 500)))
+    model.fit()
+    for atr in (0.0, -1.0, float("nan")):
+        with pytest.raises(ValueError):
+            eng.gbm(SIM, 2400.0, atr)
+        with pytest.raises(ValueError):
+            eng.ou(model, 2400.0, atr)
+
+
+if __name__ == "__main__":
+    test_brackets_from_config()
+    test_bridge_keeps_coarse_steps_accurate()
+    test_ou_side_and_breakeven()
+    test_non_positive_atr_is_rejected()
+    print("✅ first_passage tests passed")
@@ -0,0 +1,61 @@
+import json
+import tempfile
+from pathlib import Path
+
+from bot.ai_core.adaptive_feedback import AdaptiveFeedback
+from bot.engines.threshold_tuner import ThresholdTuner
+from bot.utils.jsonl_tail import JsonlRing, get_jsonl_ring, tail_jsonl, tail_lines
+
+
+def _tmp(name="feedback_log.jsonl") -> Path:
+    return Path(tempfile.mkdtemp()) / name
+
+
+def test_tail_matches_readlines_across_blocks():
+    path = _tmp()
+    rows = [json.dumps({"i": i, "pad": "x" * (i % 13)}) for i in range(500)]
+    path.write_text("\n".join(rows) + "\n")
+    for block in (1, 7, 64, 4096):
+        for n in (0, 1, 30, 499, 500, 800):
+            expected = path.read_text().splitlines()[-n:] if n else []
+            assert tail_lines(path, n, block_size=block) == expected
+    assert tail_lines(_tmp("missing.jsonl"), 5) == []
+
+    with open(path, "a") as f:
+        f.write('{"i": 500, "to')                    # torn last record
+    assert [r["i"] for r in tail_jsonl(path, 3, block_size=16)] == [498, 499]
+
+
+def test_ring_tracks_writers():
+    path = _tmp()
+    ring = JsonlRing(path, maxlen=8)
+    for i in range(20):
+        ring.append({"i": i})
+    assert [r["i"] for r in ring.recent(3)] == [17, 18, 19]
+    assert len(ring) == 8 and len(ring.recent(50)) == 20    # beyond maxlen: read from disk
+
+    with open(path, "a") as f:                            # writer that bypasses the ring
+        f.write(json.dumps({"i": 20}) + "\n")
+    assert [r["i"] for r in ring.recent(2)] == [19, 20]
+
+
+def test_tuner_reads_feedback_appends():
+    root = Path(tempfile.mkdtemp())
+    log = root / "feedback_log.jsonl"
+    fb = AdaptiveFeedback({}, bayes_path=str(root / "bayes_state.json"), log_path=str(log))
+    tuner = ThresholdTuner(bayes_state_path=str(root / "bayes_state.json"), feedback_path=str(log))
+    for k in range(40):
+        fb.register_trade_outcome(symbol="XAUUSD", action="BUY", pnl=1.0, confidence=0.6 + (k % 2) * 0.1)
+        log_rows = [json.loads(x) for x in log.read_text().splitlines()[-30:]]
+        ref_conf = sum(r["confidence"] for r in log_rows) / len(log_rows)
+        win_rate, avg_conf = tuner.recent_feedback_stats()
+        assert abs(avg_conf - ref_conf) < 1e-12
+    assert tuner.feedback is get_jsonl_ring(log)           # same ring the feedback engine writes through
+    assert tuner.feedback.recent(1)[0]["confidence"] == 0.7
+
+
+if __name__ == "__main__":
+    test_tail_matches_readlines_across_blocks()
+    test_ring_tracks_writers()
+    test_tuner_reads_feedback_appends()
+    print("✅ JSONL tail reader tests passed")
@@ -0,0 +1,129 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bot.models.kalman_filter import KalmanTrend, KFParams
+
+
+def _prices(n=800, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.Series(2400 + np.linspace(0, 25, n) + np.cumsum(rng.normal(0, 0.8, n)))
+
+
+def _forecast_rmse(y, params):
+    f = KalmanTrend(params).filter(y)
+    err = y.values - f["forecast_1"].values
+    return np.sqrt(np.mean(err[1:] ** 2))
+
+
+def test_grid_rmse_matches_per_candidate_filter():
+    y = _prices()
+    qL, qT, r = (1e-4, 1e-2), (1e-6, 1e-4), (1e-2, 1.0)
+    grid = KalmanTrend.grid_rmse(y.values, qL, qT, r)
+    for i, a in enumerate(qL):
+        for j, b in enumerate(qT):
+            for k, c in enumerate(r):
+                ref = _forecast_rmse(y, KFParams(a, b, c))
+                assert abs(grid[i, j, k] - ref) <= 1e-9 * ref
+
+
+def test_auto_tune_picks_grid_minimum():
+    y = _prices()
+    kf = KalmanTrend()
+    best = kf.auto_tune(y)
+    score = _forecast_rmse(y, best)
+    for qL in (1e-6, 1e-5, 1e-4, 1e-3):
+        for qT in (1e-7, 1e-6, 1e-5, 1e-4):
+            for r in (1e-4, 1e-3, 1e-2, 1e-1):
+                assert score <= _forecast_rmse(y, KFParams(qL, qT, r)) + 1e-12
+    assert kf.params == best
+
+
+def test_filter_is_a_loop_over_update():
+    y = _prices(300)
+    params = KFParams(1e-3, 1e-5, 1e-2)
+    batch = KalmanTrend(params).filter(y)
+    kf = KalmanTrend(params)
+    for i, price in enumerate(y):
+        row = kf.update(price)
+        for col in KalmanTrend.OUTPUTS:
+            assert row[col] == batch[col].iloc[i], (i, col)
+
+
+def test_restart_resumes_from_snapshot():
+    y = _prices(400)
+    params = KFParams(1e-4, 1e-6, 1e-1)
+    full = KalmanTrend(params).filter(y)
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "kf_state.json")
+        kf = KalmanTrend(params, state_path=path)
+        for price in y[:250]:
+            kf.update(price)
+        kf.save_state()
+
+        resumed = KalmanTrend(state_path=path)        # params come back from the snapshot
+        assert resumed.params == params
+        for i, price in enumerate(y[250:], start=250):
+            row = resumed.update(price)
+            assert row["filtered"] == full["filtered"].iloc[i]
+            assert row["trend"] == full["trend"].iloc[i]
+
+
+def _rts_reference(y, p):
+    F = np.array([[1.0, 1.0], [0.0, 1.0]])
+    Q = np.diag([p.q_level, p.q_trend])
+    n = len(y)
+    xf, Pf = np.zeros((n, 2)), np.zeros((n, 2, 2))
+    xp, Pp = np.zeros((n, 2)), np.zeros((n, 2, 2))
+    xf[0], Pf[0] = [y[0], 0.0], np.eye(2)
+    for t in range(1, n):
+        xp[t], Pp[t] = F @ xf[t - 1], F @ Pf[t - 1] @ F.T + Q
+        S = Pp[t][0, 0] + p.r_obs
+        K = Pp[t][:, 0] / S
+        xf[t] = xp[t] + K * (y[t] - xp[t][0])
+        Pf[t] = (np.eye(2) - np.outer(K, [1.0, 0.0])) @ Pp[t]
+    xs = xf.copy()
+    for t in range(n - 2, -1, -1):
+        C = Pf[t] @ F.T @ np.linalg.inv(Pp[t + 1])
+        xs[t] = xf[t] + C @ (xs[t + 1] - xp[t + 1])
+    return xs
+
+
+def test_smooth_matches_matrix_rts_and_reuses_forward_pass():
+    y = _prices(500)
+    params = KFParams(1e-4, 1e-6, 1e-1)
+    kf = KalmanTrend(params)
+    kf.filter(y)
+    cached = kf._fwd
+    sm = kf.smooth(y)
+    assert kf._fwd is cached                        # no second forward pass
+    ref = _rts_reference(y.values, params)
+    assert np.allclose(sm["level_smooth"], ref[:, 0], rtol=0, atol=1e-9)
+    assert np.allclose(sm["trend_smooth"], ref[:, 1], rtol=0, atol=1e-9)
+
+
+def test_smooth_leaves_streaming_state_alone():
+    y = _prices(500)
+    params = KFParams(1e-4, 1e-6, 1e-1)
+    kf = KalmanTrend(params)
+    for price in y.iloc[:200]:
+        kf.update(price)
+    state = kf.get_state()
+    sm = kf.smooth(y)                               # cache miss: replays y
+    assert kf.get_state() == state
+    ref = _rts_reference(y.values, params)
+    assert np.allclose(sm["level_smooth"], ref[:, 0], rtol=0, atol=1e-9)
+    assert kf.update(y.iloc[200]) == KalmanTrend(params).filter(y.iloc[:201]).iloc[-1].to_dict()
+
+
+if __name__ == "__main__":
+    test_grid_rmse_matches_per_candidate_filter()
+    test_auto_tune_picks_grid_minimum()
+    test_filter_is_a_loop_over_update()
+    test_restart_resumes_from_snapshot()
+    test_smooth_matches_matrix_rts_and_reuses_forward_pass()
+    test_smooth_leaves_streaming_state_alone()
+    print("✅ KalmanTrend tests passed")
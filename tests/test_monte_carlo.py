@@ -0,0 +1,75 @@
+import math
+
+from bot.models.stochastic import GBMSimulator
+from bot.models.monte_carlo import MonteCarloEngine, TerminalQuantiles, PathVaR, BarrierHit
+
+
+def _reducers(s0):
+    return {
+        "q": TerminalQuantiles((0.05, 0.5, 0.95)),
+        "var": PathVaR(0.95),
+        "worst": PathVaR(0.95, mode="worst"),
+        "bar": BarrierHit(tp=s0 * 1.01, sl=s0 * 0.99),
+    }
+
+
+def test_worker_count_invariance():
+    sim = GBMSimulator(mu_annual=0.05, sigma_annual=0.2, dt=1 / 252 / 24)
+    single = MonteCarloEngine(sim, block_paths=1000, workers=1, seed=7).run(2000.0, 48, 5500, _reducers(2000.0))
+    multi = MonteCarloEngine(sim, block_paths=1000, workers=2, seed=7).run(2000.0, 48, 5500, _reducers(2000.0))
+    assert single == multi
+
+
+def test_repeatable_and_terminal_moments():
+    sim = GBMSimulator(mu_annual=0.0, sigma_annual=0.2, dt=1 / 252)
+    eng = MonteCarloEngine(sim, block_paths=4096, seed=1)
+    a = eng.run(100.0, 20, 40_000, {"q": TerminalQuantiles((0.5,))})
+    b = eng.run(100.0, 20, 40_000, {"q": TerminalQuantiles((0.5,))})
+    assert a == b
+    # median of S_T = s0 * exp((mu - σ²/2) T)
+    T = 20 / 252
+    expected = 100.0 * math.exp(-0.5 * 0.2 ** 2 * T)
+    assert abs(a["q"][0.5] - expected) < 0.15
+
+
+def test_barrier_probabilities_consistent():
+    sim = GBMSimulator(mu_annual=0.0, sigma_annual=0.3, dt=1 / 252 / 24)
+    out = MonteCarloEngine(sim, block_paths=2048, seed=3).run(100.0, 500, 10_000, _reducers(100.0))
+    bar = out["bar"]
+    assert bar["n_paths"] == 10_000
+    assert abs(bar["p_tp"] + bar["p_sl"] + bar["p_none"] - 1.0) < 1e-12
+    # symmetric-ish barriers without drift → similar hit probabilities
+    assert abs(bar["p_tp"] - bar["p_sl"]) < 0.05
+    assert out["worst"]["var"] >= out["var"]["var"]
+    assert out["var"]["cvar"] >= out["var"]["var"]
+
+
+def test_variance_reduction_and_reported_se():
+    sim = GBMSimulator(mu_annual=0.05, sigma_annual=0.2, dt=1 / 252 / 24)
+    red = {"var": PathVaR(0.99)}
+    plain = MonteCarloEngine(sim, block_paths=4096, seed=2).run(2000.0, 24, 32768, red)
+    vr = MonteCarloEngine(sim, block_paths=4096, seed=2, sobol=True, antithetic=True,
+                          control_variate=True).run(2000.0, 24, 32768, red)
+    assert vr["var"]["cvar_se"] < plain["var"]["cvar_se"] / 3
+    # both estimate the same quantity
+    assert abs(vr["var"]["cvar"] - plain["var"]["cvar"]) < 4 * plain["var"]["cvar_se"]
+
+
+def test_run_to_precision():
+    sim = GBMSimulator(mu_annual=0.0, sigma_annual=0.2, dt=1 / 252 / 24)
+    eng = MonteCarloEngine(sim, block_paths=2048, seed=4)
+    out = eng.run_to_precision(2000.0, 24, {"var": PathVaR(0.95)}, target_se=2e-4,
+                               metric=("var", "cvar_se"), min_paths=4096)
+    assert out["converged"] and out["var"]["cvar_se"] <= 2e-4
+    # same blocks as a fixed-size run with the final path count
+    ref = eng.run(2000.0, 24, out["n_paths"], {"var": PathVaR(0.95)})
+    assert ref["var"] == out["var"]
+
+
+if __name__ == "__main__":
+    test_worker_count_invariance()
+    test_repeatable_and_terminal_moments()
+    test_barrier_probabilities_consistent()
+    test_variance_reduction_and_reported_se()
+    test_run_to_precision()
+    print("✅ monte_carlo tests passed")
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from bot.models.ou_model import OUModel, OnlineOU
+
+
+def _ou_prices(n=3000, theta=0.05, mu=2400.0, sigma=2.0, seed=1):
+    rng = np.random.default_rng(seed)
+    x = np.empty(n)
+    x[0] = mu + 10
+    for t in range(1, n):
+        x[t] = x[t - 1] + theta * (mu - x[t - 1]) + sigma * rng.normal()
+    return pd.Series(x)
+
+
+def test_online_equals_batch_fit_without_forgetting():
+    s = _ou_prices()
+    online = OnlineOU(lam=1.0)
+    for i, p in enumerate(s):
+        online.update(p)
+        if i in (50, 999, len(s) - 1):
+            ref = OUModel(s.iloc[:i + 1]).fit()
+            assert math.isclose(online.params.theta, ref.theta, rel_tol=1e-9)
+            assert math.isclose(online.params.mu, ref.mu, rel_tol=1e-9)
+            assert math.isclose(online.params.sigma, ref.sigma, rel_tol=1e-9)
+
+
+def test_running_zscore_and_half_life():
+    s = _ou_prices(600)
+    online = OnlineOU.from_prices(s, z_window=100)
+    model = OUModel(s)
+    model.fit()
+    assert math.isclose(online.zscore, model.zscore(s.iloc[-1], window=100), rel_tol=1e-9)
+    assert math.isclose(online.half_life, math.log(2) / online.params.theta)
+
+
+def test_forgetting_tracks_regime_change():
+    calm = _ou_prices(2000, mu=2400.0, seed=2)
+    shifted = _ou_prices(2000, mu=2500.0, seed=3)
+    s = pd.concat([calm, shifted], ignore_index=True)
+    fast = OnlineOU.from_prices(s, lam=0.99)
+    assert abs(fast.params.mu - 2500.0) < 10.0
+    assert OnlineOU(lam=0.99).update(2400.0) is None
+
+
+def test_bar_length_dt_rescales_rates_not_levels():
+    s = _ou_prices()
+    per_bar = OnlineOU.from_prices(s)
+    for dt in (2.0, 1 / 1440):
+        est = OnlineOU.from_prices(s, dt=dt)
+        assert math.isclose(est.params.mu, per_bar.params.mu, rel_tol=1e-9)
+        assert abs(est.params.mu - 2400.0) < 5.0
+        assert math.isclose(est.params.theta, per_bar.params.theta / dt, rel_tol=1e-9)
+        assert math.isclose(est.params.sigma, per_bar.params.sigma / math.sqrt(dt), rel_tol=1e-9)
+        assert math.isclose(est.half_life, per_bar.half_life * dt, rel_tol=1e-9)
+
+
+def test_simulate_exact_transition_moments():
+    model = OUModel(_ou_prices(1500))
+    th, mu, sg = model.fit().theta, model.params.mu, model.params.sigma
+    paths = model.simulate(60, n_paths=40_000, seed=11, chunk_paths=9_000)
+    assert paths.shape == (40_000, 60)
+    x0, t = model.prices.iloc[-1], 40
+    mean = mu + (x0 - mu) * math.exp(-th * t)
+    var = sg ** 2 * (1 - math.exp(-2 * th * t)) / (2 * th)
+    assert abs(paths[:, t].mean() - mean) < 4 * math.sqrt(var / len(paths))
+    assert abs(paths[:, t].var() / var - 1) < 0.03
+
+
+def test_simulate_seeded_chunking_and_dtype():
+    model = OUModel(_ou_prices(500))
+    model.fit()
+    a = model.simulate(30, n_paths=1000, seed=5)
+    b = model.simulate(30, n_paths=1000, seed=5, chunk_paths=128)
+    assert np.array_equal(a, b)
+    assert model.simulate(30, n_paths=10, seed=5, dtype=np.float32).dtype == np.float32
+    single = model.simulate(30, seed=5)
+    assert single.shape == (30,) and single[0] == model.prices.iloc[-1]
+
+
+if __name__ == "__main__":
+    test_online_equals_batch_fit_without_forgetting()
+    test_running_zscore_and_half_life()
+    test_forgetting_tracks_regime_change()
+    test_bar_length_dt_rescales_rates_not_levels()
+    test_simulate_exact_transition_moments()
+    test_simulate_seeded_chunking_and_dtype()
+    print("✅ OU model tests passed")
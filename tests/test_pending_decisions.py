@@ -0,0 +1,103 @@
+import json
+import tempfile
+from pathlib import Path
+
+from bot.core.clock import SimulatedClock
+from bot.models.bayes_confidence import BayesianConfidenceEngine, SignalEvidence
+from bot.models.pending_decisions import PendingDecisionIndex
+from bot.utils.wal_store import WalJsonStore
+from bot.sim.fake_mt5 import TradeDeal
+
+
+def _tmp(name="state.json") -> Path:
+    return Path(tempfile.mkdtemp()) / name
+
+
+def _deal(ticket, position_id, profit, entry=1, order=0, volume=0.1):
+    return TradeDeal(ticket=ticket, order=order, time=0, time_msc=0, type=1, entry=entry, magic=0,
+                     position_id=position_id, volume=volume, price=2000.0, commission=-0.5, swap=0.0,
+                     profit=profit, fee=0.0, symbol="XAUUSD", comment="")
+
+
+def test_wal_delete_replays():
+    path = _tmp()
+    store = WalJsonStore(path)
+    store.record(["a"], {"x": 1})
+    store.record(["b"], 2)
+    store.delete(["a"], ["missing", "deep"])
+    assert WalJsonStore(path).load() == {"b": 2}
+    store.close()
+    assert json.loads(path.read_text()) == {"b": 2}
+
+
+def test_ttl_and_size_eviction_survive_restart():
+    path = _tmp("pending.json")
+    clock = SimulatedClock(start=1_700_000_000.0)
+    idx = PendingDecisionIndex(path, ttl_seconds=3600, max_size=3, clock=clock)
+    for t in range(5):
+        idx[1000 + t] = {"symbol": "XAUUSD", "direction": "buy", "evidence": {}}
+        clock.advance(60)
+    assert len(idx) == 3 and 1000 not in idx and 1004 in idx
+
+    clock.advance(3600 - 150)  # 1002 is now older than the TTL
+    assert idx.evict() == 1
+    assert list(idx) == ["1003", "1004"]
+
+    again = PendingDecisionIndex(Path(str(path)), ttl_seconds=3600, max_size=3, clock=clock)
+    assert again is not idx and list(again) == ["1003", "1004"]
+
+    # no explicit evict(): adding and matching drop what has expired meanwhile
+    clock.advance(60)                          # 1003 expired, 1004 not yet
+    again[2000] = {"symbol": "XAUUSD", "direction": "sell", "evidence": {}}
+    assert list(again) == ["1004", "2000"]
+    clock.advance(60)
+    assert again.match_deals([]) == [] and list(again) == ["2000"]
+
+
+def test_engine_resolves_deals_in_bulk():
+    state = _tmp("bayes_state.json")
+    eng = BayesianConfidenceEngine(state_path=str(state))
+    ev = {"kf_trend": SignalEvidence(present=True, strength=1.0)}
+    eng.register_decision(501, "XAUUSD", "BUY", ev)
+    eng.register_decision("502", "XAUUSD", "SELL", ev)
+    before = dict(eng.state["XAUUSD"]["signals"]["kf_trend"])
+
+    deals = [_deal(9001, 501, 0.0, entry=0, volume=0.2),   # opening deal: 0.2 lots
+             _deal(9002, 501, 4.0),                        # two partial closes of 501
+             _deal(9003, 501, 3.0),
+             _deal(9006, 777, 0.0, entry=0, order=502),     # 502 opened position 777 ...
+             _deal(9004, 777, -5.0),                        # ... closed by position id
+             _deal(9005, 12345, 1.0)]                       # unknown position
+    assert eng.update_outcomes_from_deals(deals) == 2
+    assert len(eng.decisions) == 0
+    after = eng.state["XAUUSD"]["signals"]["kf_trend"]
+    assert after["a"] == before["a"] + 1.0 and after["b"] == before["b"] + 1.0
+    assert eng.update_outcomes_from_deals(deals) == 0
+
+
+def test_partial_close_waits_for_the_rest_across_polls():
+    path = _tmp("pending.json")
+    idx = PendingDecisionIndex(path)
+    idx[601] = {"symbol": "XAUUSD", "direction": "buy", "evidence": {}}
+    idx[602] = {"symbol": "XAUUSD", "direction": "buy", "evidence": {}}
+
+    poll1 = [_deal(1, 601, 0.0, entry=0, volume=0.3), _deal(2, 601, 6.0, volume=0.1)]
+    assert idx.match_deals(poll1) == []                 # 0.1 of 0.3 lots closed
+    # a restart in between keeps the partial progress
+    idx = PendingDecisionIndex(Path(str(path)))
+    poll2 = [_deal(2, 601, 6.0, volume=0.1),           # overlapping poll window: counted once
+             _deal(3, 601, -2.0, volume=0.2),
+             _deal(4, 602, 1.5, volume=0.1)]           # opening deal never seen ...
+    assert idx.match_deals(poll2) == [("601", 6.0 - 0.5 - 2.0 - 0.5)]
+    assert "602" in idx
+    # ... so its opened volume is looked up
+    assert idx.match_deals([_deal(4, 602, 1.5, volume=0.1)], opened_volume=lambda pid: 0.1) == []
+    assert idx.match_deals([_deal(5, 602, 1.0, volume=0.05)], opened_volume=lambda pid: 0.15) == [("602", 1.5 - 0.5 + 1.0 - 0.5)]
+
+
+if __name__ == "__main__":
+    test_wal_delete_replays()
+    test_ttl_and_size_eviction_survive_restart()
+    test_engine_resolves_deals_in_bulk()
+    test_partial_close_waits_for_the_rest_across_polls()
+    print("✅ Pending decision index tests passed")
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from bot.core.stage_graph import StageGraph
+
+
+def _sleeper(seconds, value=None):
+    def fn(*args):
+        time.sleep(seconds)
+        return value if value is not None else args
+    return fn
+
+
+def test_independent_stages_overlap_and_critical_path():
+    g = StageGraph(max_workers=4)
+    g.add("positions", _sleeper(0.05, []))
+    g.add("confidence", _sleeper(0.15, 0.62))
+    g.add("volatility", _sleeper(0.10, 0.01))
+    g.add("deals", _sleeper(0.05, 0))
+    g.add("decide", lambda pos, conf, vol: ("BUY", conf, vol), deps=("positions", "confidence", "volatility"))
+    try:
+        rep = g.run()
+        assert rep.results["decide"] == ("BUY", 0.62, 0.01)
+        assert rep.critical_path == ["confidence", "decide"]
+        # four stages sleep 0.35 s back to back; the cycle is bound by the slowest one
+        assert rep.serial_s >= 0.34
+        assert rep.wall < 0.25
+        assert rep.timings["decide"].ready == pytest.approx(rep.timings["confidence"].end)
+        assert "confidence" in rep.summary()
+
+        # the pool is reused across runs
+        rep2 = g.run()
+        assert rep2.results["decide"] == ("BUY", 0.62, 0.01) and rep2.wall < 0.25
+    finally:
+        g.close()
+
+
+def test_failed_stage_skips_dependents_only():
+    def boom():
+        raise RuntimeError("terminal offline")
+
+    g = StageGraph(max_workers=2)
+    g.add("positions", boom)
+    g.add("account", lambda: 1000.0)
+    g.add("decide", lambda pos: "BUY", deps=("positions",))
+    g.add("execute", lambda d: "sent", deps=("decide",))
+    g.add("target", lambda acc: acc > 1050.0, deps=("account",))
+    try:
+        rep = g.run()
+        assert isinstance(rep.errors["positions"], RuntimeError)
+        assert sorted(rep.skipped) == ["decide", "execute"]
+        assert rep.results == {"account": 1000.0, "target": False}
+        assert "failed: positions" in rep.summary()
+    finally:
+        g.close()
+
+
+def test_add_rejects_unknown_and_duplicate_stages():
+    g = StageGraph()
+    g.add("a", lambda: 1)
+    with pytest.raises(ValueError):
+        g.add("b", lambda x: x, deps=("missing",))
+    with pytest.raises(ValueError):
+        g.add("a", lambda: 2)
+    assert g.run().results == {"a": 1}
+    g.close()
+
+
+if __name__ == "__main__":
+    test_independent_stages_overlap_and_critical_path()
+    test_failed_stage_skips_dependents_only()
+    test_add_rejects_unknown_and_duplicate_stages()
+    print("✅ Stage graph tests passed")
@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from bot.models.stochastic import EWMAVol, VolEstimator
+
+
+def _loop_ewma_curve(r, lam):
+    var = float(np.var(r, ddof=1))
+    out = []
+    for x in r:
+        var = lam * var + (1 - lam) * x ** 2
+        out.append(var)
+    return np.array(out)
+
+
+def _returns(n=5000, seed=4):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.normal(0, 1e-3, n) * (1 + np.sin(np.arange(n) / 300)))
+
+
+def test_ewma_curve_matches_loop():
+    r = _returns()
+    for lam in (0.94, 0.97, 0.5, 1.0):
+        curve = VolEstimator.ewma_var_curve(r, lam=lam)
+        assert np.allclose(curve, _loop_ewma_curve(r.values, lam), rtol=1e-12, atol=0)
+    ann = VolEstimator.ewma_vol(r, steps_per_year=252, lam=0.94)
+    assert math.isclose(ann, math.sqrt(_loop_ewma_curve(r.values, 0.94)[-1] * 252), rel_tol=1e-12)
+    flat = VolEstimator.ewma_vol(r, steps_per_year=252, lam=1.0)
+    assert math.isclose(flat, VolEstimator.realized_vol(r, steps_per_year=252), rel_tol=1e-12)
+
+
+def test_streaming_ewma_continues_batch():
+    r = _returns()
+    ref = _loop_ewma_curve(r.values, 0.94)
+    est = EWMAVol.from_returns(r.iloc[:4000], lam=0.94, steps_per_year=252)
+    for x in r.iloc[4000:]:
+        est.update(x)
+    assert math.isclose(est.var, ref[-1], rel_tol=1e-12)
+    assert math.isclose(est.vol_annual, math.sqrt(ref[-1] * 252), rel_tol=1e-12)
+
+
+def test_update_price_uses_log_returns():
+    prices = pd.Series(2400 * np.exp(np.cumsum(_returns(300).values)))
+    est = EWMAVol.from_prices(prices.iloc[:200])
+    for p in prices.iloc[200:]:
+        est.update_price(p)
+    full = VolEstimator.ewma_var_curve(VolEstimator.log_returns(prices.iloc[:200]))[-1]
+    tail = np.log(prices).diff().iloc[200:].values
+    expected = VolEstimator.ewma_var_curve(tail, var0=full)[-1]
+    assert math.isclose(est.var, expected, rel_tol=1e-12)
+
+
+if __name__ == "__main__":
+    test_ewma_curve_matches_loop()
+    test_streaming_ewma_continues_batch()
+    test_update_price_uses_log_returns()
+    print("✅ Stochastic tests passed")
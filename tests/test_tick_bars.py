@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from bot.data.tick_bars import ticks_to_ohlcv, resample_ticks, rule_to_ms
+
+
+def test_keeps_sub_second_ticks():
+    # three ticks inside the same second, two bars
+    msc = np.array([60_000, 60_100, 60_900, 119_999, 120_000])
+    bid = np.array([1.0, 3.0, 0.5, 2.0, 9.0])
+    ask = bid + 0.2
+    bars = ticks_to_ohlcv(msc, bid, bar_ms=60_000, bid=bid, ask=ask)
+
+    assert list(bars["tick_count"]) == [4, 1]
+    first = bars.iloc[0]
+    assert (first["open"], first["high"], first["low"], first["close"]) == (1.0, 3.0, 0.5, 2.0)
+    assert np.isclose(first["spread_mean"], 0.2)
+    assert bars.index[0] == pd.Timestamp(60_000, unit="ms", tz="UTC")
+
+
+def test_unsorted_input_is_ordered_stably():
+    msc = np.array([120_500, 60_000, 60_000, 61_000])
+    px = np.array([5.0, 1.0, 2.0, 3.0])
+    bars = ticks_to_ohlcv(msc, px, bar_ms=60_000)
+    assert list(bars["open"]) == [1.0, 5.0]
+    assert list(bars["close"]) == [3.0, 5.0]
+
+
+def test_matches_legacy_on_whole_second_ticks():
+    rng = np.random.default_rng(1)
+    sec = np.sort(rng.choice(np.arange(0, 3600), 500, replace=False))
+    bid = 2400 + np.cumsum(rng.normal(0, 0.1, len(sec)))
+    df = pd.DataFrame({"bid": bid, "volume": 1.0}, index=pd.to_datetime(sec, unit="s"))
+    legacy = resample_ticks(df.copy(), "1min")
+    fast = ticks_to_ohlcv(sec * 1000, bid, bar_ms=rule_to_ms("1min"), volume=np.ones(len(sec)))
+    cols = ["open", "high", "low", "close", "volume"]
+    assert np.allclose(legacy[cols].to_numpy(), fast[cols].to_numpy())
+
+
+if __name__ == "__main__":
+    test_keeps_sub_second_ticks()
+    test_unsorted_input_is_ordered_stably()
+    test_matches_legacy_on_whole_second_ticks()
+    print("✅ tick aggregation tests passed")
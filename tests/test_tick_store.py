@@ -0,0 +1,179 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bot.data.tick_store import DAY_MS, TickStore
+
+
+def _ticks(n=5000, start=1761553961293, seed=1):
+    rng = np.random.default_rng(seed)
+    msc = start + np.cumsum(rng.integers(0, 120_000, n))
+    bid = 4000 + np.cumsum(rng.normal(0, 0.1, n))
+    return pd.DataFrame({
+        "time_msc": msc, "bid": bid, "ask": bid + 0.2, "last": 0.0,
+        "volume": 0, "flags": 134, "volume_real": rng.random(n),
+    })
+
+
+def test_append_and_range_query():
+    df = _ticks()
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root)
+        store.append("XAUUSD", df.iloc[:2000])
+        store.append("XAUUSD", df.iloc[2000:])
+        assert store.count("XAUUSD") == len(df)
+        assert len(store.days("XAUUSD")) > 1
+
+        full = store.read("XAUUSD")
+        assert np.array_equal(full["time_msc"], df["time_msc"].to_numpy())
+        assert np.array_equal(full["bid"], df["bid"].to_numpy())
+        assert np.array_equal(full["volume"], df["volume_real"].to_numpy())
+
+        lo, hi = int(df["time_msc"].iloc[1200]), int(df["time_msc"].iloc[3900])
+        got = store.read("XAUUSD", lo, hi, columns=["time_msc", "ask"])
+        ref = df[(df["time_msc"] >= lo) & (df["time_msc"] < hi)]
+        assert np.array_equal(got["time_msc"], ref["time_msc"].to_numpy())
+        assert np.array_equal(got["ask"], ref["ask"].to_numpy())
+
+        frame = store.read_frame("XAUUSD", pd.Timestamp(lo, unit="ms", tz="UTC"))
+        assert len(frame) == (df["time_msc"] >= lo).sum()
+
+
+def test_single_partition_read_is_memmap_view():
+    df = _ticks()
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root)
+        store.append("XAUUSD", df)
+        day0 = int(df["time_msc"].iloc[0]) // DAY_MS
+        got = store.read("XAUUSD", day0 * DAY_MS, (day0 + 1) * DAY_MS)
+        assert isinstance(got["bid"], np.memmap)
+
+
+def test_out_of_order_append_and_torn_write():
+    df = _ticks(1000)
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root, price_dtype="float32")
+        store.append("XAUUSD", df.iloc[500:])
+        store.append("XAUUSD", df.iloc[:500])
+        got = store.read("XAUUSD")
+        assert np.array_equal(got["time_msc"], df["time_msc"].to_numpy())
+        assert got["bid"].dtype == np.float32
+
+        # simulate a crash after only the time column was appended
+        part = store._data_dir(store.root / "XAUUSD" / store.days("XAUUSD")[-1])
+        rows = store.count("XAUUSD")
+        with open(part / "time_msc.bin", "ab") as f:
+            np.array([2**62], dtype="<i8").tofile(f)
+        assert store.count("XAUUSD") == rows
+        extra = _ticks(3, start=int(df["time_msc"].iloc[-1]) + 1)
+        store.append("XAUUSD", extra)
+        assert store.count("XAUUSD") == rows + 3
+        assert store.read("XAUUSD")["time_msc"][-1] == extra["time_msc"].iloc[-1]
+
+
+def test_import_csv():
+    df = _ticks(2000)
+    with tempfile.TemporaryDirectory() as root:
+        path = f"{root}/ticks.csv"
+        df.to_csv(path, index=False)
+        store = TickStore(f"{root}/store")
+        assert store.import_csv("XAUUSD", path, chunksize=700) == len(df)
+        got = store.read("XAUUSD")
+        assert np.array_equal(got["time_msc"], df["time_msc"].to_numpy())
+        assert np.allclose(got["bid"], df["bid"].to_numpy())
+
+
+def test_reimport_and_overlap_are_deduplicated():
+    df = _ticks(2000)
+    with tempfile.TemporaryDirectory() as root:
+        path = f"{root}/ticks.csv"
+        df.to_csv(path, index=False)
+        store = TickStore(f"{root}/store")
+        assert store.import_csv("XAUUSD", path, chunksize=700) == len(df)
+        assert store.import_csv("XAUUSD", path, chunksize=700) == 0
+        assert store.count("XAUUSD") == len(df)
+
+        # an overlapping fetch: re-sends the last stored ms plus new ticks
+        # (the stored row itself: CSV parsing may move a price by one ulp)
+        tail = _ticks(4, start=int(df["time_msc"].iloc[-1]) + 1, seed=2)
+        stored = store.read_frame("XAUUSD").iloc[-1:].reset_index(drop=True)
+        overlap = pd.concat([stored, tail], ignore_index=True)
+        assert store.append("XAUUSD", overlap) == len(tail)
+        assert store.append("XAUUSD", overlap) == 0
+
+        # same ms, different price: a distinct tick, kept
+        other = stored.copy()
+        other["bid"] += 0.5
+        assert store.append("XAUUSD", other) == 1
+        got = store.read("XAUUSD")
+        assert len(got["time_msc"]) == len(df) + len(tail) + 1
+        assert np.all(np.diff(got["time_msc"]) >= 0)
+
+
+def test_repeated_prints_in_one_batch_are_kept():
+    base = _ticks(1000)
+    df = pd.concat([base, base.iloc[::50], base.iloc[::150]]).sort_values("time_msc", kind="stable")
+    df = df.reset_index(drop=True)              # identical same-ms ticks, up to 3 copies
+    assert df.duplicated(subset=["time_msc", "bid", "ask", "flags"]).sum() > 0
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(f"{root}/a")
+        assert store.append("XAUUSD", df) == len(df)
+        assert store.append("XAUUSD", df) == 0
+        assert np.array_equal(store.read("XAUUSD")["time_msc"], df["time_msc"].to_numpy())
+
+        # out-of-order re-send of a tick stored twice, now printed three times
+        x = base.iloc[[100, 100, 100]]
+        assert store.append("XAUUSD", x) == 1
+        assert store.count("XAUUSD") == len(df) + 1
+
+        # repeats split across CSV chunks are still kept, once
+        path = f"{root}/ticks.csv"
+        df.to_csv(path, index=False)
+        split = int(np.flatnonzero(np.diff(df["time_msc"].to_numpy()) == 0)[3]) + 1
+        other = TickStore(f"{root}/b")
+        assert other.import_csv("XAUUSD", path, chunksize=split) == len(df)
+        assert other.import_csv("XAUUSD", path, chunksize=37) == 0
+        assert other.count("XAUUSD") == len(df)
+
+
+def test_rewrite_switches_generations_atomically():
+    df = _ticks(1000, start=1761553961293 - 1761553961293 % DAY_MS)
+    with tempfile.TemporaryDirectory() as root:
+        store = TickStore(root)
+        store.append("XAUUSD", df.iloc[500:])
+        day = store.days("XAUUSD")[0]
+        part = store.root / "XAUUSD" / day
+        held = store.read("XAUUSD", columns=["time_msc"])["time_msc"]   # a live reader
+
+        store.append("XAUUSD", df.iloc[:500])       # out of order → new generation
+        assert (part / "CURRENT").read_text().strip() == "g1"
+        assert store.days("XAUUSD") == [day]
+        assert len(held) == 500 and held[0] == df["time_msc"].iloc[500]
+
+        # crash after writing the next generation but before the switch
+        before = {c: np.array(v) for c, v in store.read("XAUUSD").items()}
+        (part / "g2").mkdir()
+        np.array([1, 2, 3], dtype="<i8").tofile(part / "g2" / "time_msc.bin")
+        after = store.read("XAUUSD")
+        assert all(np.array_equal(before[c], after[c]) for c in before)
+        assert store.count("XAUUSD") == 1000
+
+        # the next rewrite reuses the slot and cleans up behind itself
+        late = df.iloc[:1].copy()
+        late["bid"] -= 1.0
+        assert store.append("XAUUSD", late) == 1
+        assert (part / "CURRENT").read_text().strip() == "g2"
+        assert sorted(p.name for p in part.iterdir()) == ["CURRENT", "g2"]
+        assert store.count("XAUUSD") == 1001
+
+
+if __name__ == "__main__":
+    test_append_and_range_query()
+    test_single_partition_read_is_memmap_view()
+    test_out_of_order_append_and_torn_write()
+    test_import_csv()
+    test_reimport_and_overlap_are_deduplicated()
+    test_repeated_prints_in_one_batch_are_kept()
+    test_rewrite_switches_generations_atomically()
+    print("✅ TickStore tests passed")
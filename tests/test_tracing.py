@@ -0,0 +1,91 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from bot.utils.tracing import LatencyHistogram, Tracer, bucket_index, bucket_upper, load_dump
+
+
+def test_buckets_are_contiguous_with_bounded_error():
+    rng = np.random.default_rng(1)
+    for ns in [0, 1, 127, 128, 129, 255, 256, 10**3, 10**6, 10**9, 3600 * 10**9] + rng.integers(0, 2**40, 500).tolist():
+        idx = bucket_index(int(ns))
+        assert (bucket_upper(idx - 1) if idx else -1) < ns <= bucket_upper(idx)
+        assert bucket_upper(idx) - ns <= max(1, ns / 64)
+
+
+def test_percentiles_match_numpy():
+    rng = np.random.default_rng(7)
+    samples = rng.lognormal(mean=np.log(2e6), sigma=1.0, size=50_000).astype(np.int64)   # ~2 ms
+    h = LatencyHistogram("x")
+    for ns in samples.tolist():
+        h.record(ns)
+    snap = h.snapshot()
+    assert snap["n"] == len(samples)
+    for key, q in (("p50_us", 50), ("p99_us", 99), ("p999_us", 99.9)):
+        assert snap[key] == pytest.approx(np.percentile(samples, q) / 1e3, rel=0.03)
+    assert snap["max_us"] == pytest.approx(samples.max() / 1e3, rel=0.02)
+    assert snap["mean_us"] == pytest.approx(samples.mean() / 1e3, rel=1e-6)
+
+    merged = LatencyHistogram("y")
+    merged.merge(snap["b"])
+    assert merged.count == len(samples) and merged.percentiles([50.0]) == h.percentiles([50.0])
+
+
+def test_span_and_decorator_record_and_count_errors(tmp_path):
+    t = Tracer(path=tmp_path / "lat.json")
+    with t.span("sleep"):
+        time.sleep(0.01)
+    with pytest.raises(KeyError):
+        with t.span("sleep"):
+            raise KeyError("x")
+
+    @t.trace("fn")
+    def fn(x):
+        if x < 0:
+            raise ValueError(x)
+        return x * 2
+
+    assert fn(2) == 4 and fn.__name__ == "fn"
+    with pytest.raises(ValueError):
+        fn(-1)
+    t.record("stage.decide", 0.25)
+
+    path = t.dump()
+    assert path.read_text().count("\n") == 0          # compact, one line
+    stages = load_dump(path)["stages"]
+    assert stages["sleep"]["n"] == 2 and stages["sleep"]["err"] == 1
+    assert stages["sleep"]["max_us"] >= 10_000
+    assert stages["fn"]["n"] == 2 and stages["fn"]["err"] == 1
+    assert stages["stage.decide"]["p50_us"] == pytest.approx(250_000, rel=0.02)
+    assert load_dump(tmp_path / "missing.json") == {}
+
+    assert not t.maybe_dump()                           # just dumped
+    t.dump_every_s = 0.0
+    assert t.maybe_dump()
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    t = Tracer(path=tmp_path / "lat.json", enabled=False)
+
+    @t.trace("fn")
+    def fn():
+        return 1
+
+    with t.span("x"):
+        fn()
+    t.record("y", 1.0)
+    assert t.snapshot()["stages"] == {}
+    assert not t.maybe_dump() and not (tmp_path / "lat.json").exists()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_buckets_are_contiguous_with_bounded_error()
+    test_percentiles_match_numpy()
+    with tempfile.TemporaryDirectory() as d:
+        test_span_and_decorator_record_and_count_errors(Path(d))
+        test_disabled_tracer_records_nothing(Path(d))
+    print("✅ Tracing tests passed")
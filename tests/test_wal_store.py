@@ -0,0 +1,110 @@
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+from bot.engines.dynamic_weights import DynamicWeighting
+from bot.models.bayes_confidence import BayesianConfidenceEngine, SignalEvidence
+from bot.utils.wal_store import WalJsonStore
+
+
+def _tmp(name="state.json") -> Path:
+    return Path(tempfile.mkdtemp()) / name
+
+
+def test_log_replay_and_compaction():
+    path = _tmp()
+    path.write_text(json.dumps({"XAUUSD": {"prior": {"a": 50.0, "b": 50.0}}}, indent=2))
+    store = WalJsonStore(path, compact_every=1000)
+    store.record(["XAUUSD", "prior"], {"a": 51.0, "b": 50.0})
+    store.record_many([(["XAUUSD", "signals", "kf_trend"], {"a": 1.0, "b": 2.0}),
+                       (["EURUSD"], {"prior": {"a": 3.0, "b": 4.0}})])
+
+    # snapshot untouched, log replayed on load
+    assert json.loads(path.read_text())["XAUUSD"]["prior"]["a"] == 50.0
+    state = WalJsonStore(path).load()
+    assert state["XAUUSD"]["prior"]["a"] == 51.0
+    assert state["XAUUSD"]["signals"]["kf_trend"] == {"a": 1.0, "b": 2.0}
+    assert state["EURUSD"]["prior"]["b"] == 4.0
+
+    store.close()
+    assert not store.wal_path.exists() and not store.old_wal_path.exists()
+    assert json.loads(path.read_text()) == state
+
+
+def test_torn_tail_and_interrupted_compaction():
+    path = _tmp()
+    store = WalJsonStore(path)
+    store.record(["s"], 1)
+    store.record(["s"], 2)
+    store.close()
+    # compaction died after rotating: rotated log + new active log with a torn last line
+    Path(f"{path}.wal.1").write_text('{"u":[[["s"],3]]}\n')
+    Path(f"{path}.wal").write_text('{"u":[[["t"],4]]}\n{"u":[[["s"],9')
+
+    store = WalJsonStore(path)
+    assert store.load() == {"s": 3, "t": 4}
+    assert Path(f"{path}.wal").read_text().endswith("}\n")      # torn tail cut off
+    store.record(["u"], 5)
+    assert WalJsonStore(path).load() == {"s": 3, "t": 4, "u": 5}
+    store.close()
+    assert json.loads(path.read_text()) == {"s": 3, "t": 4, "u": 5}
+
+
+def test_writer_compacting_during_a_fold_loses_nothing():
+    path = _tmp()
+    store = WalJsonStore(path, background=False)
+    store.record(["A"], 1)
+    replay, other = store._replay, []
+
+    def replay_then_interleave(state, wal, repair=False):
+        n = replay(state, wal, repair)
+        if wal == store.old_wal_path and not other:
+            # a second writer records and compacts while this fold sits
+            # between reading .wal.1 and unlinking it
+            def writer():
+                store.record(["B"], 2)
+                store.compact()
+            other.append(threading.Thread(target=writer))
+            other[0].start()
+            other[0].join(0.2)
+        return n
+
+    store._replay = replay_then_interleave
+    store.compact()
+    other[0].join()
+    assert json.loads(path.read_text()) == {"A": 1, "B": 2}
+    assert WalJsonStore(path).load() == {"A": 1, "B": 2}
+
+
+def test_engines_append_constant_size_records():
+    path = _tmp("bayes_state.json")
+    eng = BayesianConfidenceEngine(path)
+    for i in range(200):
+        eng._ensure_symbol(f"SYM{i}")
+    eng._save()                                                     # full snapshot once
+    size0 = path.stat().st_size
+
+    ev = {"kf_trend": SignalEvidence(True, 0.8), "ou_revert": SignalEvidence(False, 0.5)}
+    for k in range(3):
+        eng.register_decision(f"t{k}", "SYM7", "buy", ev)
+        eng.update_outcome(f"t{k}", realized_pnl=1.0)
+    eng._svc.flush()
+    lines = Path(f"{path}.wal").read_text().splitlines()
+    assert len(lines) == 1 and len(lines[0]) < 400                  # coalesced, independent of 200 symbols
+    assert path.stat().st_size == size0
+    assert WalJsonStore(path).load()["SYM7"] == eng.state["SYM7"]
+
+    dw_path = _tmp("weights_state.json")
+    dw = DynamicWeighting(str(dw_path))
+    dw.register_outcome("XAUUSD", "kf_trend", True)
+    dw.flush()
+    assert DynamicWeighting(str(dw_path)).state["XAUUSD"]["kf_trend"]["count"] == 1
+
+
+if __name__ == "__main__":
+    test_log_replay_and_compaction()
+    test_torn_tail_and_interrupted_compaction()
+    test_writer_compacting_during_a_fold_loses_nothing()
+    test_engines_append_constant_size_records()
+    print("✅ wal_store tests passed")